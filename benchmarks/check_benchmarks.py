@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks for parselmouth.utils.check
+
+Run with:
+    `python benchmarks/check_benchmarks.py`
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import timeit
+
+# Parselmouth Imports
+from parselmouth.utils.check import check_equal
+
+
+NUM_ITEMS = 10000
+"""
+int, number of items in each benchmarked list
+"""
+
+NUM_REPEATS = 5
+"""
+int, number of times each benchmark is run
+"""
+
+
+def bench_check_equal(list1, list2):
+    """
+    @param list1: list
+    @param list2: list
+    @return: float, best time in seconds
+    """
+    return min(timeit.repeat(
+        lambda: check_equal(list1, list2),
+        repeat=NUM_REPEATS,
+        number=1,
+    ))
+
+
+def main():
+    scalars = list(range(NUM_ITEMS))
+    print('check_equal ({0} scalars): {1:.4f}s'.format(
+        NUM_ITEMS, bench_check_equal(scalars, list(reversed(scalars))),
+    ))
+
+    # Shaped like DFP targeting dictionaries
+    docs = [
+        {'adUnitId': str(i), 'includeDescendants': i % 2 == 0}
+        for i in range(NUM_ITEMS)
+    ]
+    print('check_equal ({0} dicts): {1:.4f}s'.format(
+        NUM_ITEMS, bench_check_equal(docs, list(reversed(docs))),
+    ))
+
+    nested = [
+        {'valueIds': [str(i), str(i + 1)], 'keyId': str(i % 10)}
+        for i in range(NUM_ITEMS)
+    ]
+    print('check_equal ({0} nested dicts): {1:.4f}s'.format(
+        NUM_ITEMS, bench_check_equal(nested, list(reversed(nested))),
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Generators of synthetic DFP networks for benchmarks
+
+Records are shaped like the responses of DFP once converted with
+recursive_asdict, so that they can be fed to the transform functions,
+or served by a parselmouth.adapters.dfp.fake.FakeDFPBackend. Generators
+are seeded, so that every run benchmarks the same network.
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import random
+
+# Third Party Library Imports
+from suds.sudsobject import Factory
+
+# Parselmouth Imports
+from parselmouth.targeting import AdUnit
+
+
+COUNTRIES = [
+    (2840, 'United States', 'US'),
+    (2124, 'Canada', 'CA'),
+    (2826, 'United Kingdom', 'GB'),
+    (2276, 'Germany', 'DE'),
+    (2250, 'France', 'FR'),
+]
+"""
+list(tuple), (id, name, country code) of the geographies line items
+target
+"""
+
+
+def _make_dfp_datetime(year, month, day, hour=0, minute=0):
+    """
+    @return: dict, DFP DateTime
+    """
+    return {
+        'date': {'year': year, 'month': month, 'day': day},
+        'hour': hour,
+        'minute': minute,
+        'second': 0,
+        'timeZoneID': 'America/New_York',
+    }
+
+
+def make_adunits(num_adunits, depth, seed=0):
+    """
+    Ad units forming a tree of the given depth, with the same number of
+    ad units at each level
+
+    @param num_adunits: int
+    @param depth: int, number of levels of the tree
+    @param seed: int
+    @return: list(dict), ad units as returned by PQL table Ad_Unit
+    """
+    rand = random.Random(seed)
+    per_level = max(1, num_adunits // depth)
+    adunits = []
+    previous_level = [None]
+    for level in range(depth):
+        size = per_level if level < depth - 1 else num_adunits - len(adunits)
+        current_level = []
+        for _ in range(size):
+            adunit_id = 1000 + len(adunits)
+            adunits.append({
+                'id': adunit_id,
+                'name': 'adunit_{0}_{1}'.format(level, adunit_id),
+                'parentId': rand.choice(previous_level),
+            })
+            current_level.append(adunit_id)
+        previous_level = current_level
+    return adunits
+
+
+def make_adunit_targets(adunits):
+    """
+    @param adunits: list(dict), see make_adunits
+    @return: list(AdUnit), as returned by DFPInterface.get_adunit_targets
+    """
+    return [
+        AdUnit(
+            id=unicode(adunit['id']),
+            parent_id=unicode(adunit['parentId']) if adunit['parentId'] else None,
+            name=adunit['name'],
+            external_name=unicode(adunit['id']),
+        )
+        for adunit in adunits
+    ]
+
+
+def make_custom_targeting(num_keys, num_values):
+    """
+    @param num_keys: int
+    @param num_values: int, number of values of each key
+    @return: tuple(list(dict), list(dict)), custom targeting keys and
+        values
+    """
+    keys = []
+    values = []
+    for i in range(num_keys):
+        key_id = 100 + i
+        keys.append({
+            'id': key_id,
+            'name': 'key_{0}'.format(i),
+            'displayName': 'Key {0}'.format(i),
+            'type': 'PREDEFINED',
+        })
+        for j in range(num_values):
+            values.append({
+                'id': 100000 + i * num_values + j,
+                'customTargetingKeyId': key_id,
+                'name': 'value_{0}_{1}'.format(i, j),
+                'displayName': 'Value {0} {1}'.format(i, j),
+                'matchType': 'EXACT',
+            })
+    return keys, values
+
+
+def _make_custom_criteria(rand, values_by_key):
+    """
+    Custom targeting of the form (k1 IS a OR b) AND (k2 IS_NOT c) OR ...
+
+    @param rand: random.Random
+    @param values_by_key: dict, key id -> list of value ids
+    @return: dict|None, DFP CustomCriteriaSet
+    """
+    if not values_by_key:
+        return None
+    key_ids = sorted(values_by_key)
+    groups = []
+    for _ in range(rand.randint(1, 3)):
+        criteria = []
+        for key_id in rand.sample(key_ids, min(len(key_ids), rand.randint(1, 3))):
+            criteria.append({
+                'xsi_type': 'CustomCriteria',
+                'keyId': key_id,
+                'valueIds': rand.sample(
+                    values_by_key[key_id],
+                    min(len(values_by_key[key_id]), rand.randint(1, 5)),
+                ),
+                'operator': rand.choice(['IS', 'IS', 'IS_NOT']),
+            })
+        groups.append({
+            'xsi_type': 'CustomCriteriaSet',
+            'logicalOperator': 'AND',
+            'children': criteria,
+        })
+    return {
+        'xsi_type': 'CustomCriteriaSet',
+        'logicalOperator': 'OR',
+        'children': groups,
+    }
+
+
+def make_line_items(num_line_items,
+                    adunits=None,
+                    custom_values=None,
+                    num_orders=None,
+                    seed=0):
+    """
+    Line items with inventory, geography and nested custom targeting
+
+    @param num_line_items: int
+    @param adunits: list(dict)|None, ad units targeted, see make_adunits
+    @param custom_values: list(dict)|None, custom targeting values
+        targeted, see make_custom_targeting
+    @param num_orders: int|None, number of orders the line items belong
+        to, defaults to one per 10 line items
+    @param seed: int
+    @return: list(dict)
+    """
+    rand = random.Random(seed)
+    adunit_ids = [adunit['id'] for adunit in adunits or []]
+    values_by_key = {}
+    for value in custom_values or []:
+        values_by_key.setdefault(
+            value['customTargetingKeyId'], [],
+        ).append(value['id'])
+    num_orders = num_orders or max(1, num_line_items // 10)
+
+    line_items = []
+    for i in range(num_line_items):
+        line_item_id = 10000000 + i
+        order_id = 500000 + i % num_orders
+        targeting = {}
+        if adunit_ids:
+            targeting['inventoryTargeting'] = {
+                'targetedAdUnits': [
+                    {'adUnitId': adunit_id, 'includeDescendants': True}
+                    for adunit_id in rand.sample(
+                        adunit_ids, min(len(adunit_ids), rand.randint(1, 10)),
+                    )
+                ],
+                'excludedAdUnits': [
+                    {'adUnitId': rand.choice(adunit_ids), 'includeDescendants': False}
+                ],
+            }
+        targeting['geoTargeting'] = {
+            'targetedLocations': [
+                {'id': geo_id, 'type': 'COUNTRY', 'displayName': name}
+                for geo_id, name, _ in rand.sample(COUNTRIES, rand.randint(1, 3))
+            ],
+        }
+        custom_criteria = _make_custom_criteria(rand, values_by_key)
+        if custom_criteria:
+            targeting['customTargeting'] = custom_criteria
+
+        impressions = rand.randint(0, 1000000)
+        line_items.append({
+            'id': line_item_id,
+            'name': 'Line Item {0}'.format(i),
+            'orderId': order_id,
+            'orderName': 'Order {0}'.format(order_id),
+            'lineItemType': rand.choice(['STANDARD', 'SPONSORSHIP', 'HOUSE']),
+            'costType': 'CPM',
+            'status': rand.choice(['DELIVERING', 'READY', 'COMPLETED']),
+            'startDateTime': _make_dfp_datetime(2015, 1, 1 + i % 28),
+            'endDateTime': _make_dfp_datetime(2015, 12, 1 + i % 28, 23, 59),
+            'lastModifiedDateTime': _make_dfp_datetime(2015, 6, 1, i % 24),
+            'lastModifiedByApp': 'Goog_DFPUI',
+            'budget': {'microAmount': 0, 'currencyCode': 'USD'},
+            'costPerUnit': {'microAmount': 2000000, 'currencyCode': 'USD'},
+            'valueCostPerUnit': {'microAmount': 0, 'currencyCode': 'USD'},
+            'primaryGoal': {
+                'goalType': 'LIFETIME',
+                'unitType': 'IMPRESSIONS',
+                'units': 1000000,
+            },
+            'stats': {
+                'impressionsDelivered': impressions,
+                'clicksDelivered': impressions // 1000,
+                'videoStartsDelivered': 0,
+                'videoCompletionsDelivered': 0,
+            },
+            'deliveryIndicator': {
+                'expectedDeliveryPercentage': 50.0,
+                'actualDeliveryPercentage': impressions / 10000,
+            },
+            'deliveryRateType': 'EVENLY',
+            'creativePlaceholders': [{
+                'creativeSizeType': 'PIXEL',
+                'expectedCreativeCount': 1,
+                'size': {'width': 300, 'height': 250, 'isAspectRatio': False},
+            }],
+            'targetPlatform': 'ANY',
+            'targeting': targeting,
+        })
+    return line_items
+
+
+def make_orders(line_items):
+    """
+    @param line_items: list(dict), see make_line_items
+    @return: list(dict), the orders of the line items
+    """
+    orders = {}
+    for line_item in line_items:
+        orders.setdefault(line_item['orderId'], {
+            'id': line_item['orderId'],
+            'name': line_item['orderName'],
+            'advertiserId': 1,
+            'creatorId': 1,
+            'currencyCode': 'USD',
+            'externalOrderId': 0,
+            'status': 'APPROVED',
+            'startDateTime': line_item['startDateTime'],
+            'endDateTime': line_item['endDateTime'],
+            'lastModifiedDateTime': line_item['lastModifiedDateTime'],
+            'lastModifiedByApp': 'Goog_DFPUI',
+            'totalBudget': {'microAmount': 0, 'currencyCode': 'USD'},
+            'totalImpressionsDelivered': 0,
+            'totalClicksDelivered': 0,
+        })
+    return [orders[order_id] for order_id in sorted(orders)]
+
+
+def make_network(num_adunits,
+                 depth,
+                 num_keys,
+                 num_values,
+                 num_line_items,
+                 seed=0):
+    """
+    @param num_adunits: int
+    @param depth: int, depth of the ad unit tree
+    @param num_keys: int, number of custom targeting keys
+    @param num_values: int, number of values of each key
+    @param num_line_items: int
+    @param seed: int
+    @return: dict, fixtures of a FakeDFPBackend
+    """
+    adunits = make_adunits(num_adunits, depth, seed)
+    keys, values = make_custom_targeting(num_keys, num_values)
+    line_items = make_line_items(num_line_items, adunits, values, seed=seed)
+    return {
+        'ad_units': adunits,
+        'custom_targeting_keys': keys,
+        'custom_targeting_values': values,
+        'line_items': line_items,
+        'orders': make_orders(line_items),
+        'geo_targets': [
+            {'id': geo_id, 'name': name, 'countryCode': code,
+             'type': 'COUNTRY', 'targetable': True}
+            for geo_id, name, code in COUNTRIES
+        ],
+    }
+
+
+def to_suds(obj, class_name='Object'):
+    """
+    Convert records to SUDS objects, as googleads returns them
+
+    @param obj: dict|list|object
+    @param class_name: str
+    @return: SUDS object|list|object
+    """
+    if isinstance(obj, dict):
+        return Factory.object(class_name, dict(
+            (key, to_suds(value, key)) for key, value in obj.iteritems()
+        ))
+    if isinstance(obj, list):
+        return [to_suds(item, class_name) for item in obj]
+    return obj
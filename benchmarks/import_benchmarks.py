@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks for the time taken to import parselmouth
+
+Each import is timed in a fresh interpreter. Importing parselmouth
+should not import the adapters' third party libraries, see
+Parselmouth.ProviderInterfaceMap.
+
+Run with:
+    `python benchmarks/import_benchmarks.py`
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import subprocess
+import sys
+
+
+NUM_REPEATS = 5
+"""
+int, number of times each benchmark is run
+"""
+
+HEAVY_MODULES = ['googleads', 'suds', 'yaml']
+"""
+list(str), modules which should only be imported when an adapter is used
+"""
+
+TIMING_SCRIPT = (
+    'import sys, time\n'
+    'start = time.time()\n'
+    'import {module}\n'
+    'print(time.time() - start)\n'
+    'print(" ".join(sys.modules))\n'
+)
+"""
+str, script printing the import time of a module and the loaded modules
+"""
+
+
+def bench_import(module):
+    """
+    @param module: str, dotted path of the module to import
+    @return: (float, set(str)), best time in seconds, and the modules
+        loaded by the import
+    """
+    times = []
+    for _ in range(NUM_REPEATS):
+        output = subprocess.check_output([
+            sys.executable, '-c', TIMING_SCRIPT.format(module=module),
+        ]).decode('utf-8').splitlines()
+        times.append(float(output[0]))
+        modules = set(output[1].split())
+    return min(times), modules
+
+
+def main():
+    regressions = []
+    for module in ['parselmouth', 'parselmouth.adapters.dfp.interface']:
+        seconds, modules = bench_import(module)
+        heavy_modules = [m for m in HEAVY_MODULES if m in modules]
+        print('import {0}: {1:.4f}s (loads {2})'.format(
+            module, seconds, ', '.join(heavy_modules) or 'no adapter libraries',
+        ))
+        if module == 'parselmouth':
+            regressions = heavy_modules
+
+    if regressions:
+        sys.exit('import parselmouth loads {0}'.format(', '.join(regressions)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks for parselmouth.targeting_index
+
+Run with:
+    `python benchmarks/index_benchmarks.py`
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import random
+import timeit
+
+# Parselmouth Imports
+from parselmouth.constants import ParselmouthTargetTypes
+from parselmouth.delivery import LineItem
+from parselmouth.targeting import AdUnit
+from parselmouth.targeting import Custom
+from parselmouth.targeting import TargetingCriterion
+from parselmouth.targeting import TargetingData
+from parselmouth.targeting_index import TargetingIndex
+from parselmouth.tree_builder import TreeBuilder
+
+
+NUM_LINE_ITEMS = 100000
+"""
+int, number of indexed line items
+"""
+
+NUM_ADUNITS = 1000
+"""
+int, number of ad units in the network, 10 children per parent
+"""
+
+NUM_CUSTOM_VALUES = 5000
+"""
+int, number of custom targeting values in the network
+"""
+
+NUM_LOOKUPS = 1000
+"""
+int, number of lookups timed
+"""
+
+
+def make_line_items(num_line_items):
+    """
+    @param num_line_items: int
+    @return: list(LineItem)
+    """
+    rand = random.Random(0)
+    line_items = []
+    for i in range(num_line_items):
+        adunits = [
+            AdUnit(id=str(rand.randrange(NUM_ADUNITS))) for _ in range(3)
+        ]
+        customs = [
+            Custom(id=str(rand.randrange(NUM_CUSTOM_VALUES))) for _ in range(3)
+        ]
+        line_items.append(LineItem(
+            id=str(i),
+            targeting=TargetingData(
+                inventory=TargetingCriterion(adunits, TargetingCriterion.OPERATOR.OR),
+                custom=TargetingCriterion(customs, TargetingCriterion.OPERATOR.OR),
+            ),
+        ))
+    return line_items
+
+
+def main():
+    adunit_tree = TreeBuilder(None, None).build_tree([
+        AdUnit(id=str(i), parent_id=str(i // 10) if i else None)
+        for i in range(NUM_ADUNITS)
+    ])
+    line_items = make_line_items(NUM_LINE_ITEMS)
+
+    start = timeit.default_timer()
+    index = TargetingIndex(
+        line_items, trees={ParselmouthTargetTypes.adunit: adunit_tree},
+    )
+    print('build index ({0} line items): {1:.4f}s'.format(
+        NUM_LINE_ITEMS, timeit.default_timer() - start,
+    ))
+
+    targets = [
+        AdUnit(id=str(i)) for i in range(0, NUM_ADUNITS, NUM_ADUNITS // NUM_LOOKUPS)
+    ]
+    for include_ancestors in [False, True]:
+        elapsed = min(timeit.repeat(
+            lambda: [
+                index.get_line_item_ids(t, include_ancestors) for t in targets
+            ],
+            repeat=5,
+            number=1,
+        ))
+        print('lookup (include_ancestors={0}): {1:.4f}ms per target'.format(
+            include_ancestors, 1000 * elapsed / len(targets),
+        ))
+
+    updated = make_line_items(NUM_LINE_ITEMS // 100)
+    start = timeit.default_timer()
+    index.add_line_items(updated)
+    print('update index ({0} line items): {1:.4f}s'.format(
+        len(updated), timeit.default_timer() - start,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+End-to-end benchmark suite, run against a synthetic network
+
+Times tree building and queries, the conversion of line items from and
+to DFP, recursive_asdict, serialization, report parsing, targeting
+algebra, and fetching line items through a DFPInterface backed by the
+offline DFP stand-in. Results can be written to JSON, and compared with
+the results of a previous commit to catch regressions.
+
+Run with:
+    `python benchmarks/suite.py --output results.json`
+    `python benchmarks/suite.py --compare baseline.json`
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import timeit
+
+# Parselmouth Imports
+from parselmouth.adapters.dfp.client import DFPClient
+from parselmouth.adapters.dfp.delivery_utils import transform_line_item_from_dfp
+from parselmouth.adapters.dfp.delivery_utils import transform_line_item_to_dfp
+from parselmouth.adapters.dfp.fake import FakeDFPBackend
+from parselmouth.adapters.dfp.fake import FakeDFPClient
+from parselmouth.adapters.dfp.interface import DFPInterface
+from parselmouth.adapters.dfp.utils import recursive_asdict
+from parselmouth.delivery import LineItem
+from parselmouth.tree_builder import TreeBuilder
+
+# Benchmark Imports
+from generators import make_adunit_targets
+from generators import make_network
+from generators import to_suds
+
+
+NETWORK_SIZES = {
+    'num_adunits': 2000,
+    'depth': 4,
+    'num_keys': 50,
+    'num_values': 40,
+    'num_line_items': 2000,
+}
+"""
+dict, sizes of the synthetic network, see generators.make_network
+"""
+
+NUM_REPEATS = 3
+"""
+int, number of times each benchmark is run
+"""
+
+REGRESSION_THRESHOLD = 1.25
+"""
+float, ratio of the time of a benchmark to its baseline above which it
+is reported as a regression
+"""
+
+
+def _get_credentials():
+    """
+    @return: list(str), positional arguments of DFPClient and
+        DFPInterface for the stand-in network, which ignores them
+    """
+    return ['client_id', 'client_secret', 'refresh_token', 'application_name', '1234']
+
+
+class BenchmarkData(object):
+    """
+    Synthetic network and the objects derived from it, built once and
+    shared by the benchmarks
+    """
+
+    def __init__(self, sizes):
+        """
+        @param sizes: dict, see NETWORK_SIZES
+        """
+        self.fixtures = make_network(**sizes)
+        self.dfp_line_items = self.fixtures['line_items']
+        self.suds_line_items = to_suds(self.dfp_line_items, 'LineItem')
+        self.line_items = [
+            transform_line_item_from_dfp(line_item)
+            for line_item in self.dfp_line_items
+        ]
+        self.line_item_docs = [
+            line_item.to_doc() for line_item in self.line_items
+        ]
+        self.adunits = make_adunit_targets(self.fixtures['ad_units'])
+        self.tree = TreeBuilder(None).build_tree(self.adunits)
+        self.leaf_name = self.fixtures['ad_units'][-1]['name']
+        self.criteria = [
+            line_item.targeting.inventory for line_item in self.line_items
+        ]
+
+
+def bench_build_tree(data):
+    TreeBuilder(None).build_tree(data.adunits)
+
+
+def bench_tree_get_subtree(data):
+    data.tree.get_subtree('name', data.leaf_name)
+
+
+def bench_tree_flatten(data):
+    data.tree.flatten()
+
+
+def bench_tree_get_parent_map(data):
+    data.tree.get_parent_map()
+
+
+def bench_tree_filter(data):
+    data.tree.filter_tree_by_key('id', set(
+        adunit.id for adunit in data.adunits[::50]
+    ))
+
+
+def bench_recursive_asdict(data):
+    for line_item in data.suds_line_items:
+        recursive_asdict(line_item)
+
+
+def bench_transform_line_item_from_dfp(data):
+    for line_item in data.dfp_line_items:
+        # Targeting is decoded on first access
+        transform_line_item_from_dfp(line_item).targeting
+
+
+def bench_transform_line_item_to_dfp(data):
+    for line_item in data.line_items:
+        transform_line_item_to_dfp(line_item)
+
+
+def bench_to_doc(data):
+    for line_item in data.line_items:
+        line_item.to_doc()
+
+
+def bench_from_doc(data):
+    for doc in data.line_item_docs:
+        LineItem.from_doc(doc)
+
+
+def bench_targeting_algebra(data):
+    criteria = data.criteria
+    for criterion1, criterion2, criterion3 in zip(
+            criteria, criteria[1:], criteria[2:]):
+        ((criterion1 | criterion2) & ~criterion3).get_includes_and_excludes()
+
+
+def bench_targeting_equality(data):
+    for criterion1, criterion2 in zip(data.criteria, reversed(data.criteria)):
+        criterion1 == criterion2
+
+
+def bench_report(data):
+    client = DFPClient(
+        *_get_credentials(),
+        native_client=FakeDFPClient(FakeDFPBackend(data.fixtures))
+    )
+    client.generate_report(
+        ['LINE_ITEM_ID', 'LINE_ITEM_NAME'], ['AD_SERVER_IMPRESSIONS'], 'LAST_WEEK',
+    )
+
+
+def bench_get_line_items(data):
+    interface = DFPInterface(
+        *_get_credentials(),
+        native_client=FakeDFPClient(FakeDFPBackend(data.fixtures))
+    )
+    interface.get_line_items()
+
+
+def bench_get_line_item_rows(data):
+    interface = DFPInterface(
+        *_get_credentials(),
+        native_client=FakeDFPClient(FakeDFPBackend(data.fixtures))
+    )
+    interface.get_line_item_rows()
+
+
+BENCHMARKS = [
+    ('build_tree', bench_build_tree),
+    ('tree_get_subtree', bench_tree_get_subtree),
+    ('tree_flatten', bench_tree_flatten),
+    ('tree_get_parent_map', bench_tree_get_parent_map),
+    ('tree_filter', bench_tree_filter),
+    ('recursive_asdict', bench_recursive_asdict),
+    ('transform_line_item_from_dfp', bench_transform_line_item_from_dfp),
+    ('transform_line_item_to_dfp', bench_transform_line_item_to_dfp),
+    ('to_doc', bench_to_doc),
+    ('from_doc', bench_from_doc),
+    ('targeting_algebra', bench_targeting_algebra),
+    ('targeting_equality', bench_targeting_equality),
+    ('report', bench_report),
+    ('get_line_items', bench_get_line_items),
+    ('get_line_item_rows', bench_get_line_item_rows),
+]
+"""
+list(tuple), (name, function(BenchmarkData)) of each benchmark
+"""
+
+
+def _get_commit():
+    """
+    @return: str|None, git commit benchmarked
+    """
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.STDOUT,
+        ).strip().decode('utf-8')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes=NETWORK_SIZES, repeats=NUM_REPEATS, only=None):
+    """
+    @param sizes: dict, see NETWORK_SIZES
+    @param repeats: int
+    @param only: list(str)|None, names of the benchmarks to run
+    @return: dict, results of the benchmarks
+    """
+    data = BenchmarkData(sizes)
+    results = {}
+    for name, function in BENCHMARKS:
+        if only and name not in only:
+            continue
+        timings = timeit.repeat(
+            lambda: function(data), repeat=repeats, number=1,
+        )
+        results[name] = {
+            'best': min(timings),
+            'mean': sum(timings) / len(timings),
+        }
+        print('{0}: {1:.4f}s'.format(name, results[name]['best']))
+
+    return {
+        'commit': _get_commit(),
+        'python': platform.python_version(),
+        'timestamp': int(time.time()),
+        'sizes': sizes,
+        'repeats': repeats,
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    @param report: dict, see run
+    @param baseline: dict, report of a previous run
+    @param threshold: float, see REGRESSION_THRESHOLD
+    @return: list(str), names of the benchmarks which regressed
+    """
+    if report['sizes'] != baseline.get('sizes'):
+        print('Warning: the baseline was run on a network of another size')
+    regressions = []
+    for name, result in sorted(report['results'].items()):
+        base = baseline['results'].get(name)
+        if not base:
+            continue
+        ratio = result['best'] / base['best'] if base['best'] else 1
+        flag = ''
+        if ratio > threshold:
+            regressions.append(name)
+            flag = ' REGRESSION'
+        print('{0}: {1:.4f}s vs {2:.4f}s ({3:.2f}x){4}'.format(
+            name, result['best'], base['best'], ratio, flag,
+        ))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the benchmark suite')
+    parser.add_argument('--output', help='write the results to a JSON file')
+    parser.add_argument('--compare', help='JSON results of a baseline run')
+    parser.add_argument(
+        '--threshold', type=float, default=REGRESSION_THRESHOLD,
+        help='slowdown ratio reported as a regression',
+    )
+    parser.add_argument(
+        '--scale', type=float, default=1,
+        help='multiply the size of the synthetic network',
+    )
+    parser.add_argument('--repeats', type=int, default=NUM_REPEATS)
+    parser.add_argument('benchmarks', nargs='*', help='benchmarks to run')
+    args = parser.parse_args()
+
+    sizes = dict(NETWORK_SIZES)
+    for key in ['num_adunits', 'num_keys', 'num_line_items']:
+        sizes[key] = max(1, int(sizes[key] * args.scale))
+
+    report = run(sizes, args.repeats, args.benchmarks)
+    if args.output:
+        with open(args.output, 'wb') as outfile:
+            json.dump(report, outfile, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, 'rb') as infile:
+            baseline = json.load(infile)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
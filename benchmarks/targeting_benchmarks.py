@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks for TargetingCriterion algebra
+
+Run with:
+    `python benchmarks/targeting_benchmarks.py`
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import timeit
+
+# Parselmouth Imports
+from parselmouth.targeting import AdUnit
+from parselmouth.targeting import TargetingCriterion
+
+
+NUM_TARGETS = 10000
+"""
+int, number of targets in each benchmarked criterion
+"""
+
+NUM_REPEATS = 5
+"""
+int, number of times each benchmark is run
+"""
+
+
+def make_criterion(num_targets, reverse=False):
+    """
+    Build a criterion of the form (OR: [...]) & (NOT: OR: [...]) with
+    num_targets ad units split evenly between includes and excludes
+
+    @param num_targets: int
+    @param reverse: bool, list the targets in reverse order
+    @return: TargetingCriterion
+    """
+    half = num_targets // 2
+    adunits = [
+        AdUnit(id=str(i), name='adunit/{0}'.format(i))
+        for i in range(num_targets)
+    ]
+    include_list = adunits[:half]
+    exclude_list = adunits[half:]
+    if reverse:
+        include_list.reverse()
+        exclude_list.reverse()
+
+    includes = TargetingCriterion(
+        include_list, TargetingCriterion.OPERATOR.OR,
+    )
+    excludes = TargetingCriterion(
+        exclude_list, TargetingCriterion.OPERATOR.OR,
+    )
+    return includes & ~excludes
+
+
+def bench_get_includes_and_excludes(num_targets=NUM_TARGETS):
+    """
+    @param num_targets: int
+    @return: float, best time in seconds
+    """
+    criterion = make_criterion(num_targets)
+    return min(timeit.repeat(
+        criterion.get_includes_and_excludes,
+        repeat=NUM_REPEATS,
+        number=1,
+    ))
+
+
+def bench_criterion_equality(num_targets=NUM_TARGETS):
+    """
+    Compare two freshly built (uncached) criteria holding the same
+    targets in reverse order
+
+    @param num_targets: int
+    @return: float, best time in seconds
+    """
+    timings = []
+    for _ in range(NUM_REPEATS):
+        criterion1 = make_criterion(num_targets)
+        criterion2 = make_criterion(num_targets, reverse=True)
+
+        start = timeit.default_timer()
+        assert criterion1 == criterion2
+        timings.append(timeit.default_timer() - start)
+    return min(timings)
+
+
+def main():
+    print('get_includes_and_excludes ({0} targets): {1:.4f}s'.format(
+        NUM_TARGETS, bench_get_includes_and_excludes(),
+    ))
+    print('criterion equality ({0} targets): {1:.4f}s'.format(
+        NUM_TARGETS, bench_criterion_equality(),
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -62,6 +62,10 @@ class AbstractInterface(object):
     def get_line_items(self):
         pass
 
+    @abstractmethod
+    def get_line_item_rows(self):
+        pass
+
     @abstractmethod
     def get_campaign_line_items(self, campaign_id):
         pass
@@ -13,10 +13,18 @@ from __future__ import unicode_literals
 # Standard Library Imports
 import csv
 import logging
+import shutil
+import threading
+import time
+import urllib2
+from Queue import Queue
+from contextlib import contextmanager
+from datetime import datetime
 from gzip import GzipFile
 from tempfile import NamedTemporaryFile
 
 # Third Party Library Imports
+import pytz
 from googleads import DfpClient as GoogleDFPClient
 from googleads.oauth2 import GoogleRefreshTokenClient
 from googleads.dfp import FilterStatement
@@ -24,18 +32,63 @@ from googleads.dfp import SUGGESTED_PAGE_LIMIT
 from googleads.errors import DfpReportError
 
 # Parselmouth Imports
+from parselmouth.constants import QUERY_OPERATORS
 from parselmouth.exceptions import ParselmouthException
+from parselmouth.exceptions import ParselmouthNetworkError
+from parselmouth.metrics import METRICS
+from parselmouth.retry import RetryingService
+from parselmouth.retry import RetryPolicy
+from parselmouth.utils.timeout import Timeout
+from parselmouth.utils.timeout import check_deadline
+from parselmouth.utils.timeout import get_remaining_time
 
 # Parselmouth Imports - Local DFP Adapter Imports
 from parselmouth.adapters.dfp.constants import DFP_API_VERSION
 from parselmouth.adapters.dfp.constants import DFP_CUSTOM_TARGETING_KEY_TYPES
+from parselmouth.adapters.dfp.constants import DFP_DATETIME_FORMAT
+from parselmouth.adapters.dfp.constants import DFP_IN_LIST_CONCURRENCY
+from parselmouth.adapters.dfp.constants import DFP_LINE_ITEM_COLUMNS
+from parselmouth.adapters.dfp.constants import DFP_MAX_IN_LIST_SIZE
+from parselmouth.adapters.dfp.constants import DFP_PAGINATION_MODES
 from parselmouth.adapters.dfp.constants import DFP_QUERY_DEFAULTS
+from parselmouth.adapters.dfp.constants import DFP_REPORT_POLL_INTERVAL
+from parselmouth.adapters.dfp.constants import DFP_REQUEST_TIMEOUT
 from parselmouth.adapters.dfp.constants import DFP_VALUE_MATCH_TYPES
-from parselmouth.adapters.dfp.utils import format_pql_response
+from parselmouth.adapters.dfp.instrumentation import InstrumentedService
+from parselmouth.adapters.dfp.pql import get_query_columns
+from parselmouth.adapters.dfp.pql import get_row_type
+from parselmouth.adapters.dfp.pql import parse_pql_value
+from parselmouth.adapters.dfp.rate_limiter import RATE_LIMITERS
+from parselmouth.adapters.dfp.rate_limiter import RateLimitedService
+from parselmouth.adapters.dfp.service_pool import ServicePool
+from parselmouth.adapters.dfp.statements import KeysetStatement
+from parselmouth.adapters.dfp.transport import DeadlineService
+from parselmouth.adapters.dfp.transport import NetworkErrorService
+from parselmouth.adapters.dfp.transport import call_with_network_errors
 from parselmouth.adapters.dfp.utils import format_report_list
+from parselmouth.adapters.dfp.utils import is_idempotent_method
+from parselmouth.adapters.dfp.utils import is_retryable_error
 from parselmouth.adapters.dfp.utils import sanitize_report_response
 
 
+def get_oauth2_client(client_id, client_secret, refresh_token):
+    """
+    Create the OAuth2 client used to authenticate DFP requests. One
+    OAuth2 client can be shared by the DFP clients of every network
+    accessed with the same credentials.
+
+    @param client_id: str
+    @param client_secret: str
+    @param refresh_token: str
+    @return: googleads.oauth2.GoogleRefreshTokenClient
+    """
+    return GoogleRefreshTokenClient(
+        client_id,
+        client_secret,
+        refresh_token,
+    )
+
+
 class DFPClient(object):
     """
     Class retrieving and submitting data to the DFP API
@@ -50,7 +103,16 @@ class DFPClient(object):
                  refresh_token,
                  application_name,
                  network_code,
-                 version=DFP_API_VERSION):
+                 version=DFP_API_VERSION,
+                 oauth2_client=None,
+                 rate_limiters=None,
+                 retry_policy=None,
+                 request_timeout=DFP_REQUEST_TIMEOUT,
+                 metrics=None,
+                 native_client=None,
+                 pagination=DFP_PAGINATION_MODES.keyset,
+                 network_timezone=None,
+                 retry_mutations=False):
         """
         https://developers.google.com/doubleclick-publishers/docs/authentication
 
@@ -60,14 +122,56 @@ class DFPClient(object):
         @param application_name: str
         @param network_code: str
         @param version: str
+        @param oauth2_client: GoogleRefreshTokenClient|None, OAuth2
+            client shared with other DFP clients, see get_oauth2_client
+        @param rate_limiters: RateLimiterRegistry|None, limiters of the
+            requests to each service, defaults to the limiters shared by
+            all clients of the process
+        @param retry_policy: RetryPolicy|None, policy for retrying failed
+            requests, defaults to retrying transient DFP errors
+        @param request_timeout: float, socket timeout in seconds of
+            requests made outside of a parselmouth.utils.timeout.Timeout
+        @param metrics: MetricsRegistry|None, registry the requests are
+            reported to, defaults to parselmouth.metrics.METRICS
+        @param native_client: googleads.DfpClient|None, client making
+            the requests, created from the credentials if not given,
+            e.g. a parselmouth.adapters.dfp.fake.FakeDFPClient to run
+            offline
+        @param pagination: DFP_PAGINATION_MODES, how queries for all
+            the results ordered by id page through them. Queries with a
+            limit, an offset or another order always page with offset.
+        @param network_timezone: pytz.timezone|None, timezone of the
+            network, fetched from DFP when first needed if not given
+        @param retry_mutations: bool, retry the requests which change
+            objects, e.g. createLineItems, when they fail. They may have
+            taken effect, so are not retried by default.
         """
         self.version = DFP_API_VERSION
-        self.native_dfp_client = self._get_client(
+        self.network_code = network_code
+        self.rate_limiters = rate_limiters or RATE_LIMITERS
+        self.retry_policy = retry_policy or RetryPolicy(
+            is_retryable=is_retryable_error,
+        )
+        self.request_timeout = request_timeout
+        self.metrics = metrics or METRICS
+        self.pagination = pagination
+        self.max_in_list_size = DFP_MAX_IN_LIST_SIZE
+        self.in_list_concurrency = DFP_IN_LIST_CONCURRENCY
+        self.report_poll_interval = DFP_REPORT_POLL_INTERVAL
+        self._network_timezone = network_timezone
+        self.retry_mutations = retry_mutations
+        self.native_dfp_client = native_client or self._get_client(
             client_id,
             client_secret,
             refresh_token,
             application_name,
             network_code,
+            oauth2_client,
+        )
+        self.service_pool = ServicePool(
+            lambda name, version: self.native_dfp_client.GetService(
+                name, version=version,
+            )
         )
 
     def __repr__(self):
@@ -90,14 +194,17 @@ class DFPClient(object):
                     client_secret,
                     refresh_token,
                     application_name,
-                    network_code):
+                    network_code,
+                    oauth2_client=None):
         """
         Create a client to connect the Google DFP API
 
         @param headers: dict, Oauth2 authorization header
+        @param oauth2_client: GoogleRefreshTokenClient|None, created
+            from the credentials if not given
         @return: googleads.DfpClient
         """
-        client_token = GoogleRefreshTokenClient(
+        client_token = oauth2_client or get_oauth2_client(
             client_id,
             client_secret,
             refresh_token,
@@ -108,6 +215,76 @@ class DFPClient(object):
             network_code,
         )
 
+    def _get_limiter(self, service_name):
+        """
+        @param service_name: str, e.g. 'LineItemService'
+        @return: AdaptiveLimiter, limiter of the requests made to this
+            client's network, see RateLimiterRegistry.get_limiter
+        """
+        return self.rate_limiters.get_limiter(self.network_code, service_name)
+
+    @contextmanager
+    def _get_service(self, service_name):
+        """
+        Borrow a googleads service from this client's pool for the
+        duration of a with block. Services are built once and reused,
+        their requests are rate limited, time out at the deadline of the
+        current thread, are retried when they fail unless they change
+        objects, see retry_mutations, and are reported to this client's
+        metrics. Requests failing with a transport error once retried
+        raise a ParselmouthNetworkError.
+
+        @param service_name: str, e.g. 'LineItemService'
+        @return: context manager yielding a SUDS service
+        """
+        with self.service_pool.get_service(service_name, self.version) as service:
+            yield NetworkErrorService(RetryingService(
+                RateLimitedService(
+                    DeadlineService(
+                        InstrumentedService(service, self.metrics, service_name),
+                        self.request_timeout,
+                        service,
+                    ),
+                    self._get_limiter(service_name),
+                ),
+                self.retry_policy,
+                {'service': service_name},
+                None if self.retry_mutations else is_idempotent_method,
+            ))
+
+    def _call(self, service_name, function, *args, **kwargs):
+        """
+        Call a function making a request to a DFP service outside of
+        _get_service, e.g. through a data downloader
+
+        @param service_name: str, service the request counts against
+        @param function: function
+        @return: result of the function
+        """
+        return call_with_network_errors(
+            self.retry_policy.run,
+            self._get_limiter(service_name).call,
+            (function,) + args,
+            kwargs,
+            {'service': service_name, 'method': function.__name__},
+        )
+
+    def _format_value(self, val):
+        """
+        Format a filter value for a PQL statement. DFP compares
+        datetimes in the timezone of the network, so timezone aware
+        datetimes are converted to it, and naive ones are assumed to be
+        in it.
+
+        @param val: datetime|object
+        @return: str
+        """
+        if isinstance(val, datetime):
+            if val.tzinfo is not None:
+                val = val.astimezone(self.get_network_timezone())
+            return "'{0}'".format(val.strftime(DFP_DATETIME_FORMAT))
+        return str(val)
+
     def _format_query(self,
                       order=DFP_QUERY_DEFAULTS['order'],
                       limit=None,
@@ -122,8 +299,12 @@ class DFPClient(object):
         @param limit: int, number of PQL results to return
         @param offset: int, page in a stream of PQL results to return
         @param filter_kwargs: dict, keyword arguments on which to filter
-            PQL results
-        @return: FilterStatement, PQL statement
+            PQL results. Keywords can end with one of the suffixes in
+            QUERY_OPERATORS to compare with an operator other than
+            equality, e.g. `lastModifiedDateTime__gt=datetime(...)`
+        @return: FilterStatement|KeysetStatement, PQL statement, paging
+            by id if all results ordered by id are queried, see
+            DFP_PAGINATION_MODES
 
         ## TODO: We probably want to do some checking of `filter_kwargs`
             against available column names in DFP PQL tables
@@ -133,15 +314,12 @@ class DFPClient(object):
         else:
             query = ""
 
-        filters = []
-        for key, val in filter_kwargs.iteritems():
-            if isinstance(val, list):
-                # gotta format that in query
-                _dfp_list = ", ".join([str(x) for x in val])
-                filters.append("{0} IN ({1})".format(key, _dfp_list))
-                pass
-            else:
-                filters.append("{0}={1}".format(key, val))
+        filters = self._format_filters(**filter_kwargs)
+        if self.pagination == DFP_PAGINATION_MODES.keyset \
+                and order and order.lower() == 'id' \
+                and not limit and not offset:
+            return KeysetStatement(filters)
+
         if filters:
             # Prepend the where parameters to the base query
             where_query = " AND ".join(filters)
@@ -159,19 +337,100 @@ class DFPClient(object):
 
         return statement
 
-    def _run_service_query(self, query, query_function):
+    def _format_filters(self, **filter_kwargs):
         """
-        Run a series of chunked DFP queries until all results
-        are acquired
+        Format filter keyword arguments as PQL conditions
+
+        @param filter_kwargs: dict, see _format_query
+        @return: list(str), conditions which must all match
+        """
+        filters = []
+        for key, val in filter_kwargs.iteritems():
+            # Keywords may end with an operator suffix, e.g.
+            # lastModifiedDateTime__gt=datetime(...)
+            key, _, suffix = key.partition('__')
+            if suffix and suffix not in QUERY_OPERATORS:
+                raise ParselmouthException(
+                    "Unknown query operator: {0}".format(suffix)
+                )
+
+            if isinstance(val, list):
+                if suffix and suffix != 'eq':
+                    raise ParselmouthException(
+                        "Cannot use operator {0} with a list of values".format(
+                            suffix
+                        )
+                    )
+                # gotta format that in query
+                _dfp_list = ", ".join([self._format_value(x) for x in val])
+                filters.append("{0} IN ({1})".format(key, _dfp_list))
+            elif suffix:
+                filters.append("{0} {1} {2}".format(
+                    key, QUERY_OPERATORS[suffix], self._format_value(val),
+                ))
+            else:
+                filters.append("{0}={1}".format(key, self._format_value(val)))
+        return filters
+
+    def _format_queries(self,
+                        order=DFP_QUERY_DEFAULTS['order'],
+                        limit=None,
+                        offset=DFP_QUERY_DEFAULTS['offset'],
+                        **filter_kwargs):
+        """
+        Format the statements of a query, splitting the lists of values
+        longer than max_in_list_size into chunks queried separately
+
+        @param order: str, see _format_query
+        @param limit: int, see _format_query
+        @param offset: int, see _format_query
+        @param filter_kwargs: dict, see _format_query
+        @return: list(FilterStatement|KeysetStatement), statements whose
+            results together are those of the query
+        """
+        long_lists = [
+            (len(val), key) for key, val in filter_kwargs.iteritems()
+            if isinstance(val, list) and len(val) > self.max_in_list_size
+        ]
+        if not long_lists:
+            return [self._format_query(order, limit, offset, **filter_kwargs)]
+        if offset:
+            raise ParselmouthException(
+                "Cannot query from an offset with more than {0} values "
+                "in a list".format(self.max_in_list_size)
+            )
+
+        # Split the longest list, other long lists are split recursively
+        _, key = max(long_lists)
+        values = filter_kwargs[key]
+        statements = []
+        for i in range(0, len(values), self.max_in_list_size):
+            chunk_kwargs = dict(filter_kwargs)
+            chunk_kwargs[key] = values[i:i + self.max_in_list_size]
+            statements += self._format_queries(
+                order, limit, offset, **chunk_kwargs
+            )
+        return statements
+
+    def _iter_service_query(self, query, query_function):
+        """
+        Run a series of chunked DFP queries, yielding each page of
+        results. The query is advanced before a page is yielded, so that
+        its offset, or the last id of a KeysetStatement, is that of the
+        next page. A page which fails is retried by the query function,
+        see _get_service.
 
-        @param query: FilterStatement
+        @param query: FilterStatement|KeysetStatement
         @param query_function: Dfp service method
-        @return: list
+        @return: generator(list)
+        @raise ParselmouthNetworkError: on transport errors and timeouts
+        @raise ParselmouthException: on errors returned by DFP
         """
-        results = []
         while True:
             try:
                 response = query_function(query.ToStatement())
+            except ParselmouthNetworkError:
+                raise
             except Exception as e:
                 raise ParselmouthException(
                     "Error running query: {0}. Got Error: {1}".format(
@@ -185,24 +444,148 @@ class DFPClient(object):
                     query.ToStatement(),
                     len(response['results']),
                 )
-                results += response['results']
-                query.offset += SUGGESTED_PAGE_LIMIT
+                if isinstance(query, KeysetStatement):
+                    query.advance(response['results'])
+                else:
+                    query.offset += SUGGESTED_PAGE_LIMIT
+                yield response['results']
             else:
                 break
 
+    def _run_service_query(self, query, query_function):
+        """
+        Run a series of chunked DFP queries until all results
+        are acquired
+
+        @param query: FilterStatement|KeysetStatement
+        @param query_function: Dfp service method
+        @return: list
+        """
+        results = []
+        for page in self._iter_service_query(query, query_function):
+            results += page
         return results
 
+    def _run_service_queries(self,
+                             service_name,
+                             method_name,
+                             queries,
+                             order=DFP_QUERY_DEFAULTS['order'],
+                             limit=None):
+        """
+        Run queries against a DFP service, concurrently within
+        in_list_concurrency, and merge their results. Objects returned by
+        several queries are only kept once. Queries are run with the
+        deadline of the calling thread.
+
+        @param service_name: str, e.g. 'LineItemService'
+        @param method_name: str, e.g. 'getLineItemsByStatement'
+        @param queries: list(FilterStatement|KeysetStatement), see
+            _format_queries
+        @param order: str|None, order of the results of the queries.
+            Merged results are sorted by id if it is 'ID', and otherwise
+            returned in the order of the queries
+        @param limit: int|None, number of results of the query. Each
+            chunk of a query split by _format_queries is limited, so the
+            merged results are too.
+        @return: list
+        """
+        if len(queries) == 1:
+            with self._get_service(service_name) as service:
+                return self._run_service_query(
+                    queries[0], getattr(service, method_name),
+                )
+
+        results = [None] * len(queries)
+        errors = []
+        queue = Queue()
+        for i in range(len(queries)):
+            queue.put(i)
+        remaining_time = get_remaining_time()
+
+        def work():
+            with Timeout(remaining_time):
+                while True:
+                    i = queue.get()
+                    if i is None:
+                        return
+                    if errors:
+                        # Skip the remaining queries once one has failed
+                        continue
+                    try:
+                        with self._get_service(service_name) as service:
+                            results[i] = self._run_service_query(
+                                queries[i], getattr(service, method_name),
+                            )
+                    except Exception as e:
+                        errors.append(e)
+
+        num_workers = min(self.in_list_concurrency, len(queries))
+        for _ in range(num_workers):
+            queue.put(None)
+        workers = [threading.Thread(target=work) for _ in range(num_workers)]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if errors:
+            raise errors[0]
+
+        merged = []
+        ids = set()
+        for result in results:
+            for obj in result:
+                if obj['id'] not in ids:
+                    ids.add(obj['id'])
+                    merged.append(obj)
+        if order and order.lower() == 'id':
+            merged.sort(key=lambda obj: obj['id'])
+        if limit:
+            merged = merged[:limit]
+        return merged
+
+    def iter_pages(self, service_name, method_name, query):
+        """
+        Run a paged query against a DFP service, yielding each page of
+        results. A query can be resumed from a page by setting its offset,
+        or the last id of a KeysetStatement.
+
+        Example:
+            query = FilterStatement('ORDER BY id')
+            for page in client.iter_pages(
+                    'OrderService', 'getOrdersByStatement', query):
+                save(page, next_offset=query.offset)
+
+        @param service_name: str, e.g. 'OrderService'
+        @param method_name: str, e.g. 'getOrdersByStatement'
+        @param query: FilterStatement|KeysetStatement
+        @return: generator(list(SUDS envelope))
+        """
+        with self._get_service(service_name) as service:
+            for page in self._iter_service_query(
+                    query, getattr(service, method_name)):
+                yield page
+
     def get_network_data(self):
         """
         Get network data associated with dfp account
 
         @return: SUDS envelope
         """
-        service = self.native_dfp_client.GetService(
-            'NetworkService',
-            version=self.version,
-        )
-        return service.getCurrentNetwork()
+        with self._get_service('NetworkService') as service:
+            return service.getCurrentNetwork()
+
+    def get_network_timezone(self):
+        """
+        Get the timezone of the network, fetched from DFP once
+
+        @return: pytz.timezone
+        """
+        if self._network_timezone is None:
+            network = self.get_network_data()
+            self._network_timezone = pytz.timezone(network['timeZone'])
+        return self._network_timezone
 
     def get_order(self, order_id):
         """
@@ -225,30 +608,27 @@ class DFPClient(object):
         @param limit: int, number of PQL results to return
         @param offset: int, page in a stream of PQL results to return
         @param filter_kwargs: dict, keyword arguments on which to filter
-            PQL results
+            PQL results. Lists of more than max_in_list_size values are
+            queried in chunks, see _format_queries
         @return: SUDS envelope
 
         Example:
             * Get an order by id: `get_orders(id=ORDER_ID)`
         """
-        query = self._format_query(
+        queries = self._format_queries(
             order=order,
             limit=limit,
             offset=offset,
             **filter_kwargs
         )
-        service = self.native_dfp_client.GetService(
-            'OrderService',
-            version=self.version
-        )
-
-        orders = self._run_service_query(
-            query, service.getOrdersByStatement,
+        orders = self._run_service_queries(
+            'OrderService', 'getOrdersByStatement', queries, order,
+            limit,
         )
 
         if not orders:
             logging.warning(
-                'Results not found from query. Query: {0}'.format(query.ToStatement())
+                'Results not found from query. Query: {0}'.format(queries)
             )
             return []
 
@@ -275,30 +655,27 @@ class DFPClient(object):
         @param limit: int, number of PQL results to return
         @param offset: int, page in a stream of PQL results to return
         @param filter_kwargs: dict, keyword arguments on which to filter
-            PQL results
+            PQL results. Lists of more than max_in_list_size values are
+            queried in chunks, see _format_queries
         @return: SUDS envelope
 
         Example:
             * Get an order by id: `get_line_items(id=LINE_ITEM_ID)`
         """
-        query = self._format_query(
+        queries = self._format_queries(
             order=order,
             limit=limit,
             offset=offset,
             **filter_kwargs
         )
-        service = self.native_dfp_client.GetService(
-            'LineItemService',
-            version=self.version
-        )
-
-        line_items = self._run_service_query(
-            query, service.getLineItemsByStatement,
+        line_items = self._run_service_queries(
+            'LineItemService', 'getLineItemsByStatement', queries, order,
+            limit,
         )
 
         if not line_items:
             logging.warning(
-                'Results not found from query. Query: {0}'.format(query)
+                'Results not found from query. Query: {0}'.format(queries)
             )
             return []
 
@@ -310,11 +687,6 @@ class DFPClient(object):
 
         @return: list(dict), returns a list of company dictionaries
         """
-        service = self.native_dfp_client.GetService(
-            'CompanyService',
-            version=self.version,
-        )
-
         # Create statement object to only select companies that are advertisers
         values = [{
             'key': 'type',
@@ -326,7 +698,10 @@ class DFPClient(object):
         }]
         query = 'WHERE type = :type'
         statement = FilterStatement(query, values)
-        results = self._run_service_query(statement, service.getCompaniesByStatement)
+        with self._get_service('CompanyService') as service:
+            results = self._run_service_query(
+                statement, service.getCompaniesByStatement,
+            )
         advertisers = [
             {'id': advertiser['id'],
              'name': advertiser['name']
@@ -340,10 +715,6 @@ class DFPClient(object):
         @param line_item: LineItem
         @return: SUDS envelope
         """
-        service = self.native_dfp_client.GetService(
-            'ForecastService',
-            version=self.version,
-        )
         prospective_line_item = {
             'lineItem': dfp_line_item,
         }
@@ -351,10 +722,11 @@ class DFPClient(object):
             'includeContendingLineItems': False,
             'includeTargetingCriteriaBreakdown': False,
         }
-        return service.getAvailabilityForecast(
-            prospective_line_item,
-            forecast_options,
-        )
+        with self._get_service('ForecastService') as service:
+            return service.getAvailabilityForecast(
+                prospective_line_item,
+                forecast_options,
+            )
 
     def get_creative(self, creative_id):
         """
@@ -377,30 +749,27 @@ class DFPClient(object):
         @param limit: int, number of PQL results to return
         @param offset: int, page in a stream of PQL results to return
         @param filter_kwargs: dict, keyword arguments on which to filter
-            PQL results
+            PQL results. Lists of more than max_in_list_size values are
+            queried in chunks, see _format_queries
         @return: SUDS envelope
 
         Example:
             * Get an order by id: `get_creatives(id=CREATIVE_ID)`
         """
-        query = self._format_query(
+        queries = self._format_queries(
             order=order,
             limit=limit,
             offset=offset,
             **filter_kwargs
         )
-        service = self.native_dfp_client.GetService(
-            'CreativeService',
-            version=self.version
-        )
-
-        creatives = self._run_service_query(
-            query, service.getCreativesByStatement,
+        creatives = self._run_service_queries(
+            'CreativeService', 'getCreativesByStatement', queries, order,
+            limit,
         )
 
         if not creatives:
             logging.warning(
-                'Results not found from query. Query: {0}'.format(query)
+                'Results not found from query. Query: {0}'.format(queries)
             )
             return []
 
@@ -423,14 +792,10 @@ class DFPClient(object):
           }]
         query = 'WHERE lineItemId = :lineItemId'
         statement = FilterStatement(where_clause=query, values=values)
-        service = self.native_dfp_client.GetService(
-            'LineItemCreativeAssociationService',
-            version=self.version
-        )
-
-        creatives = self._run_service_query(
-            statement, service.getLineItemCreativeAssociationsByStatement,
-        )
+        with self._get_service('LineItemCreativeAssociationService') as service:
+            creatives = self._run_service_query(
+                statement, service.getLineItemCreativeAssociationsByStatement,
+            )
 
         if creatives:
             if 'results' in creatives:
@@ -446,47 +811,94 @@ class DFPClient(object):
         else:
             return []
 
-    def _run_pql_query(self, pql_query, values=None):
+    def get_line_item_rows(self, columns=DFP_LINE_ITEM_COLUMNS, **filter_kwargs):
         """
-        Get a list of contents of a DFP table for the specific pql query
+        Stream selected columns of line items from PQL table Line_Item,
+        without their targeting or the other fields of LineItem objects.
+        Lists of values longer than max_in_list_size are queried in
+        chunks, see _format_queries, whose rows are each ordered by id.
 
-        @param pql_query: str
-        @param values: list(dict)
-        @return: list
+        @param columns: list(str), columns of table Line_Item
+        @param filter_kwargs: dict, keyword arguments on which to filter
+            PQL results, see _format_query
+        @return: generator(namedtuple), a row per line item, see
+            iter_pql_rows
         """
-        report_downloader = self.native_dfp_client.GetDataDownloader(
-            version=self.version,
-        )
-        raw_list = report_downloader.DownloadPqlResultToList(
-            pql_query, values,
-        )
-        return format_pql_response(raw_list)
+        select = "SELECT {0} FROM Line_Item".format(', '.join(columns))
+        for statement in self._format_queries(order=None, **filter_kwargs):
+            pql_query = " ".join(filter(None, [
+                select, statement.where_clause.strip(), "ORDER BY Id",
+            ]))
+            for row in self.iter_pql_rows(pql_query):
+                yield row
+
+    def iter_pql_rows(self, pql_query, values=None):
+        """
+        Stream the results of a PQL query, paging through them with the
+        PQL service so that only a page is held in memory at a time
+
+        Example:
+            for row in client.iter_pql_rows('SELECT Id, ParentId FROM Ad_Unit'):
+                row.parent_id
+
+        @param pql_query: str, without LIMIT or OFFSET
+        @param values: list(dict)|None, bind values of the query
+        @return: generator(namedtuple), a row per result, with typed
+            values and a field per column selected, named in snake case,
+            see parselmouth.adapters.dfp.pql
+        """
+        statement = FilterStatement(pql_query, values)
+        columns = get_query_columns(pql_query)
+        row_type = None
+        with self._get_service('PublisherQueryLanguageService') as service:
+            while True:
+                response = service.select(statement.ToStatement())
+                rows = response['rows'] if 'rows' in response else []
+                if rows and row_type is None:
+                    labels = [
+                        column['labelName']
+                        for column in response['columnTypes']
+                    ]
+                    if not columns or len(columns) != len(labels):
+                        columns = labels
+                    row_type = get_row_type(columns)
+                for row in rows:
+                    yield row_type(*[
+                        parse_pql_value(value) for value in row['values']
+                    ])
+
+                statement.offset += len(rows)
+                if len(rows) < statement.limit:
+                    break
 
     def get_geography_targets(self):
         """
-        Get a list of DFP geography ids
+        Stream the targetable geographies of DFP, from countries down to
+        postal codes
 
-        @return: list(dict)
+        @return: generator(namedtuple), rows with fields id, name,
+            parent_ids, country_code and type, see iter_pql_rows.
+            parent_ids are the ids of all the ancestors of a geography.
         """
         pql_query = """
-        SELECT Id, Name, CountryCode, Type
+        SELECT Id, Name, ParentIds, CountryCode, Type
         FROM Geo_Target
-        WHERE type='country'
-            AND targetable=true
+        WHERE targetable=true
         """
-        return self._run_pql_query(pql_query)
+        return self.iter_pql_rows(pql_query)
 
     def get_adunit_targets(self):
         """
-        Get a list of DFP geography ids
+        Stream the ad units of the network
 
-        @return: list(dict)
+        @return: generator(namedtuple), rows with fields id, name and
+            parent_id, see iter_pql_rows
         """
         pql_query = """
         SELECT Id, Name, ParentId
         FROM Ad_Unit
         """
-        return self._run_pql_query(pql_query)
+        return self.iter_pql_rows(pql_query)
 
     def get_custom_targets(self, key_name=None, value_name=None):
         """
@@ -498,11 +910,6 @@ class DFPClient(object):
             targeting with the given value name
         @return: list(dict)
         """
-        service = self.native_dfp_client.GetService(
-            'CustomTargetingService',
-            version=self.version,
-        )
-
         if key_name:
             values = [{
                 'key': 'name',
@@ -516,9 +923,10 @@ class DFPClient(object):
         else:
             key_statement = FilterStatement()
 
-        key_results = self._run_service_query(
-            key_statement, service.getCustomTargetingKeysByStatement,
-        )
+        with self._get_service('CustomTargetingService') as service:
+            key_results = self._run_service_query(
+                key_statement, service.getCustomTargetingKeysByStatement,
+            )
 
         custom_data = []
         if not key_results:
@@ -529,11 +937,9 @@ class DFPClient(object):
             # the key target
             custom_data += key_results
 
-        # Create statement to get all targeting values.
-        query = 'WHERE customTargetingKeyId IN ({})'.format(
-            ', '.join([str(key['id']) for key in key_results]),
-        )
-
+        # Create statements to get all targeting values, in chunks of
+        # keys for networks with many keys
+        values = None
         if value_name:
             values = [{
                 'key': 'name',
@@ -542,14 +948,22 @@ class DFPClient(object):
                     'value': value_name,
                 }
             }]
-            query += ' AND name = :name'
-            value_statement = FilterStatement(query, values)
-        else:
-            value_statement = FilterStatement(query)
+        key_ids = [str(key['id']) for key in key_results]
+        value_statements = []
+        for i in range(0, len(key_ids), self.max_in_list_size):
+            query = 'WHERE customTargetingKeyId IN ({0})'.format(
+                ', '.join(key_ids[i:i + self.max_in_list_size]),
+            )
+            if value_name:
+                query += ' AND name = :name'
+            value_statements.append(FilterStatement(query, values))
 
         # Get custom targeting values by statement.
-        value_results = self._run_service_query(
-            value_statement, service.getCustomTargetingValuesByStatement,
+        value_results = self._run_service_queries(
+            'CustomTargetingService',
+            'getCustomTargetingValuesByStatement',
+            value_statements,
+            order=None,
         )
         custom_data += value_results
         return custom_data
@@ -620,11 +1034,6 @@ class DFPClient(object):
             logging.info("Custom target key+value already exists in DFP")
             return existing_values
 
-        service = self.native_dfp_client.GetService(
-            'CustomTargetingService',
-            version=self.version,
-        )
-
         # Check if the key already exists in DFP, if not then create it
         # We need to do this first since DFP handles id assignment
         existing_keys = self.get_custom_targets(key_name=key_name)
@@ -636,7 +1045,8 @@ class DFPClient(object):
             }
             if key_display_name:
                 key['displayName'] = key_display_name
-            keys = service.createCustomTargetingKeys([key])
+            with self._get_service('CustomTargetingService') as service:
+                keys = service.createCustomTargetingKeys([key])
         else:
             logging.info("Key ({0}) already exists in DFP".format(key_name))
             keys = existing_keys
@@ -658,7 +1068,8 @@ class DFPClient(object):
             value['displayName'] = value_display_name
         if value_match_type:
             value['matchType'] = value_match_type
-        values = service.createCustomTargetingValues([value])
+        with self._get_service('CustomTargetingService') as service:
+            values = service.createCustomTargetingValues([value])
 
         # Extract the value we want
         if len(values) == 0:
@@ -675,43 +1086,101 @@ class DFPClient(object):
 
         return [key, value]
 
+    def _get_url_opener(self):
+        """
+        @return: urllib2.OpenerDirector, opener of the URLs reports are
+            downloaded from, the native client's if it has one, e.g. a
+            FakeDFPClient
+        """
+        return getattr(self.native_dfp_client, 'url_opener', None) \
+            or urllib2.build_opener()
+
+    def _wait_for_report(self, report_service, report_query):
+        """
+        Run a report job and poll its status until it has finished
+        processing, or until the deadline of the current thread
+
+        @param report_service: SUDS service, see _get_service
+        @param report_query: dict
+        @return: int, id of the completed report job
+        @raise DfpReportError: if the report job failed
+        @raise ParselmouthTimeout: at the deadline
+        """
+        report_job = report_service.runReportJob({'reportQuery': report_query})
+        report_job_id = report_job['id']
+        status = report_service.getReportJobStatus(report_job_id)
+        while status not in ('COMPLETED', 'FAILED'):
+            logging.debug('Report job %s is %s', report_job_id, status)
+            interval = self.report_poll_interval
+            remaining_time = get_remaining_time()
+            if remaining_time is not None:
+                interval = min(interval, remaining_time)
+            time.sleep(interval)
+            check_deadline()
+            status = report_service.getReportJobStatus(report_job_id)
+
+        if status == 'FAILED':
+            raise DfpReportError(report_job_id)
+        return report_job_id
+
+    def _download_report(self, report_service, report_job_id, report_file):
+        """
+        Download a report to a file, with a socket timeout of the time
+        left before the deadline of the current thread
+
+        @param report_service: SUDS service, see _get_service
+        @param report_job_id: int
+        @param report_file: file, the gzipped CSV of the report is
+            written to
+        """
+        url = report_service.getReportDownloadURL(report_job_id, 'CSV_DUMP')
+
+        def download_report():
+            # Start over from an empty file when retrying
+            report_file.seek(0)
+            report_file.truncate()
+            timeout = get_remaining_time()
+            if timeout is None or timeout > self.request_timeout:
+                timeout = self.request_timeout
+            try:
+                response = self._get_url_opener().open(url, timeout=timeout)
+                shutil.copyfileobj(response, report_file)
+            except Exception:
+                # Downloads cut short by the socket timeout fail with a
+                # ParselmouthTimeout
+                check_deadline()
+                raise
+
+        self._call('ReportService', download_report)
+
     def _generate_report_as_list(self, report_query):
         """
         Generates a report from a report query.  This
-        function will hang until the report has finished processing.
-        This function does not return the report, but a pointer
-        to this report
+        function will hang until the report has finished processing,
+        or until the deadline of the current thread.
 
         @param report_query: dict
-        @return: list(dict)
+        @return: list(dict)|None, None if the report failed
         """
         logging.info('Generating report with query: %s', report_query)
-        report_downloader = self.native_dfp_client.GetDataDownloader(
-            version=self.version,
-        )
-        try:
-            # Run the report and wait for it to finish.
-            report_id = report_downloader.WaitForReport(
-                {'reportQuery': report_query},
-            )
-        except DfpReportError, e:
-            logging.exception(e)
-            return None
-
-        with NamedTemporaryFile(suffix='.csv.gz', delete=True) as report_file:
-            # Download report data.
-            report_downloader.DownloadReportToFile(
-                report_id, 'CSV_DUMP', report_file
-            )
-            # Go to top of file
-            report_file.seek(0)
-            # Unzip contents and read
-            with GzipFile(fileobj=report_file, mode='r') as unzipped:
-                csvfile = csv.reader(unzipped)
-                parsed_data = [
-                    [cell.decode('utf-8') for cell in row]
-                    for row in csvfile
-                ]
+        with self._get_service('ReportService') as report_service:
+            try:
+                report_id = self._wait_for_report(report_service, report_query)
+            except DfpReportError, e:
+                logging.exception(e)
+                return None
+
+            with NamedTemporaryFile(suffix='.csv.gz', delete=True) as report_file:
+                self._download_report(report_service, report_id, report_file)
+                # Go to top of file
+                report_file.seek(0)
+                # Unzip contents and read
+                with GzipFile(fileobj=report_file, mode='r') as unzipped:
+                    csvfile = csv.reader(unzipped)
+                    parsed_data = [
+                        [cell.decode('utf-8') for cell in row]
+                        for row in csvfile
+                    ]
 
         logging.info('Report download completed with %d results', len(parsed_data))
         return format_report_list(parsed_data)
@@ -766,8 +1235,5 @@ class DFPClient(object):
         @param line_items: L{dict}
         """
 
-        service = self.native_dfp_client.GetService(
-            'LineItemService',
-            version=self.version
-        )
-        service.updateLineItems(line_items)
+        with self._get_service('LineItemService') as service:
+            service.updateLineItems(line_items)
@@ -14,9 +14,6 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-# Third Party Imports
-import yaml
-
 # Parselmouth Imports
 from parselmouth.exceptions import ParselmouthException
 from parselmouth.adapters.abstract_config import AbstractConfig
@@ -53,6 +50,8 @@ class DFPConfig(AbstractConfig):
         return self._credentials
 
     def load_config_from_file(self, provider_name, config_path):
+        # Only import yaml when reading config files, it is slow to import
+        import yaml
 
         with open(config_path, 'r') as infile:
             config_dict = yaml.load(infile)
@@ -23,6 +23,107 @@ DFP_QUERY_DEFAULTS = {
 dict, default query params for the DFP API
 """
 
+DFP_MAX_IN_LIST_SIZE = 500
+"""
+int, maximum number of values in the IN list of a PQL statement. Longer
+lists are split into chunks, each queried with its own statement
+"""
+
+DFP_IN_LIST_CONCURRENCY = 4
+"""
+int, maximum number of the chunks of a long IN list queried concurrently
+"""
+
+DFP_LINE_ITEM_COLUMNS = [
+    'Id',
+    'Name',
+    'OrderId',
+    'Status',
+    'LineItemType',
+    'CostType',
+    'UnitsBought',
+    'StartDateTime',
+    'EndDateTime',
+    'LastModifiedDateTime',
+]
+"""
+list(str), default columns of PQL table Line_Item selected when listing
+line items without their targeting
+"""
+
+DFP_GEOGRAPHY_CACHE_TTL = 24 * 60 * 60
+"""
+int, number of seconds the geographies of DFP are cached for
+"""
+
+DFP_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+"""
+str, format of datetime values in PQL statements. DFP interprets these
+in the timezone of the network
+"""
+
+DFP_REQUEST_TIMEOUT = 60 * 60
+"""
+int, socket timeout in seconds of DFP requests made without a deadline
+"""
+
+DFP_REPORT_POLL_INTERVAL = 30
+"""
+int, number of seconds between checks of the status of a report job
+"""
+
+DFP_RATE_LIMIT = 8
+"""
+int, default maximum number of requests per second made to a DFP service
+of a network
+"""
+
+DFP_MAX_CONCURRENCY = 8
+"""
+int, default maximum number of concurrent requests made to a DFP service
+of a network
+"""
+
+DFP_QUOTA_BACKOFF = 2
+"""
+int, number of seconds to pause requests after a quota error. Doubled on
+each consecutive quota error
+"""
+
+DFP_QUOTA_RETRIES = 5
+"""
+int, number of times a request failing with a quota error is retried
+"""
+
+DFP_QUOTA_ERRORS = [
+    'EXCEEDED_QUOTA',
+    'QUOTA_EXCEEDED',
+]
+"""
+list(str), reasons of the DFP errors raised when a network exceeds its
+request quota, e.g. QuotaError.EXCEEDED_QUOTA
+"""
+
+DFP_RETRYABLE_ERRORS = [
+    'ServerError',
+    'InternalApiError',
+]
+"""
+list(str), types of the DFP errors which may succeed when retried, e.g.
+ServerError.SERVER_BUSY
+"""
+
+DFP_MUTATE_METHOD_PREFIXES = (
+    'create',
+    'update',
+    'perform',
+)
+"""
+tuple(str), prefixes of the DFP methods which change objects, e.g.
+LineItemService.createLineItems, and aren't retried when they fail
+since they may have taken effect
+"""
+
 SELL_TYPE_MAP = {
     'SPONSORSHIP': AdProviderSellTypes.sponsorship,
     'STANDARD': AdProviderSellTypes.standard,
@@ -37,6 +138,7 @@ dict, map dfp sell type names -> AD_PROVIDER_SELL_TYPES
 DFP_REPORT_METRIC_MAP = {
     ParselmouthReportMetrics.ad_impressions: "AD_SERVER_IMPRESSIONS",
     ParselmouthReportMetrics.ad_viewable_impressions: "AD_SERVER_ACTIVE_VIEW_VIEWABLE_IMPRESSIONS",
+    ParselmouthReportMetrics.ad_clicks: "AD_SERVER_CLICKS",
     ParselmouthReportMetrics.line_item_id: "LINE_ITEM_ID",
     ParselmouthReportMetrics.line_item_name: "LINE_ITEM_NAME",
     ParselmouthReportMetrics.delivery_percentage: "AD_SERVER_DELIVERY_INDICATOR",
@@ -65,3 +167,15 @@ DFP_VALUE_MATCH_TYPES = Enum([
 """
 Enum, list of the available custom targeting value match types
 """
+
+DFP_PAGINATION_MODES = Enum([
+    'offset',
+    'keyset',
+])
+"""
+Enum, ways of paging through the results of a statement. Offset paging
+skips the results of the previous pages with OFFSET. Keyset paging orders
+results by id and selects those with an id greater than the last one of
+the previous page, which stays fast deep into large tables and neither
+skips nor repeats results when objects are created or deleted mid-scan.
+"""
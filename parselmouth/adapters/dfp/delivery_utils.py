@@ -234,11 +234,7 @@ def transform_line_item_from_dfp(line_item):
         units=int(line_item['primaryGoal']['units'])
     )
 
-    targeting = transform_targeting_data_from_dfp(
-        line_item['targeting'],
-    )
-
-    return LineItem(
+    parselmouth_line_item = LineItem(
         budget=budget,
         cost_per_unit=cost_per_unit,
         cost_type=line_item['costType'],
@@ -254,11 +250,15 @@ def transform_line_item_from_dfp(line_item):
         primary_goal=primary_goal,
         start=start_datetime,
         status=line_item['status'],
-        targeting=targeting,
         value_cost_per_unit=value_cost_per_unit,
         creative_placeholder=line_item.get('creativePlaceholders'),
         target_platform=line_item.get('targetPlatform'),
     )
+    # Targeting is the bulk of the conversion, so is only decoded if read
+    parselmouth_line_item.set_raw_targeting(
+        line_item['targeting'], transform_targeting_data_from_dfp,
+    )
+    return parselmouth_line_item
 
 
 def _sell_type_reverse_lookup(line_item):
@@ -0,0 +1,388 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" DFP Network Export
+
+Export every order, line item, creative, line item creative
+association, custom targeting key and value, and ad unit of a DFP
+network to local files, one per entity. Exports of large networks take
+hours, so progress is checkpointed after every page to a state file in
+the output directory, and an interrupted export resumes from the last
+page written.
+
+Each page is written as its own gzip member, and the checkpoint records
+the size of each file after the page. When resuming, files are truncated
+back to their checkpointed size, so pages written after the last
+checkpoint are not duplicated.
+
+Run with:
+    `python -m parselmouth.adapters.dfp.export config.yaml google_dfp_premium OUTPUT_DIR`
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import argparse
+import cPickle as pickle
+import json
+import logging
+import os
+from gzip import GzipFile
+
+# Third Party Library Imports
+from googleads.dfp import FilterStatement
+
+# Parselmouth Imports
+from parselmouth.config import ParselmouthConfig
+from parselmouth.exceptions import ParselmouthException
+from parselmouth.utils.enum import Enum
+
+# Parselmouth Imports - Local DFP Adapter Imports
+from parselmouth.adapters.dfp.client import DFPClient
+from parselmouth.adapters.dfp.utils import recursive_asdict
+
+
+ExportFormats = Enum([
+    'ndjson',
+    'pickle',
+])
+"""
+Enum, formats of the exported records. ndjson files hold one JSON
+document per line, pickle files a sequence of pickled dicts. Both are
+gzip compressed.
+"""
+
+EXPORT_ENTITIES = [
+    ('orders', 'OrderService', 'getOrdersByStatement', 'id'),
+    ('line_items', 'LineItemService', 'getLineItemsByStatement', 'id'),
+    ('creatives', 'CreativeService', 'getCreativesByStatement', 'id'),
+    (
+        'line_item_creative_associations',
+        'LineItemCreativeAssociationService',
+        'getLineItemCreativeAssociationsByStatement',
+        'lineItemId, creativeId',
+    ),
+    (
+        'custom_targeting_keys',
+        'CustomTargetingService',
+        'getCustomTargetingKeysByStatement',
+        'id',
+    ),
+    (
+        'custom_targeting_values',
+        'CustomTargetingService',
+        'getCustomTargetingValuesByStatement',
+        'id',
+    ),
+    ('ad_units', 'InventoryService', 'getAdUnitsByStatement', 'id'),
+]
+"""
+list(tuple), exported entities as (name, service name, method name,
+columns ordering the results). Results must be ordered so that pages are
+stable when resuming.
+"""
+
+CUSTOM_TARGETING_KEY_CHUNK_SIZE = 500
+"""
+int, number of custom targeting keys whose values are queried at once.
+DFP requires custom targeting values to be queried by key.
+"""
+
+STATE_FILE_NAME = 'export_state.json'
+"""
+str, name of the checkpoint file in the output directory
+"""
+
+
+def _json_default(obj):
+    """
+    @param obj: object, not serializable by json
+    @return: unicode
+    """
+    return unicode(obj)
+
+
+def _to_record(obj):
+    """
+    @param obj: SUDS envelope|dict
+    @return: dict
+    """
+    if isinstance(obj, dict):
+        return obj
+    return recursive_asdict(obj)
+
+
+def get_export_path(directory, name, output_format):
+    """
+    @param directory: str
+    @param name: str, name of an exported entity, see EXPORT_ENTITIES
+    @param output_format: ExportFormats
+    @return: str, path of the entity's export file
+    """
+    return os.path.join(directory, '{0}.{1}.gz'.format(name, output_format))
+
+
+def read_export(path, output_format=ExportFormats.ndjson):
+    """
+    Read the records of an export file
+
+    @param path: str
+    @param output_format: ExportFormats
+    @return: generator(dict)
+    """
+    with GzipFile(path, 'rb') as infile:
+        if output_format == ExportFormats.ndjson:
+            for line in infile:
+                yield json.loads(line)
+        else:
+            while True:
+                try:
+                    yield pickle.load(infile)
+                except EOFError:
+                    break
+
+
+class NetworkExport(object):
+    """
+    Resumable export of a DFP network
+
+    Example:
+        export = NetworkExport(dfp_client, '/data/export/1234')
+        counts = export.run()
+    """
+
+    def __init__(self,
+                 client,
+                 directory,
+                 output_format=ExportFormats.ndjson):
+        """
+        @param client: parselmouth.adapters.dfp.client.DFPClient
+        @param directory: str, output directory, also holding the state
+            file of the export
+        @param output_format: ExportFormats
+        """
+        if output_format not in ExportFormats:
+            raise ParselmouthException(
+                "Unknown export format: {0}".format(output_format)
+            )
+        self.client = client
+        self.directory = directory
+        self.output_format = output_format
+        self.state_path = os.path.join(directory, STATE_FILE_NAME)
+        self._entities = dict(
+            (name, (service_name, method_name, order))
+            for name, service_name, method_name, order in EXPORT_ENTITIES
+        )
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "directory='{directory}',"
+                "output_format={output_format}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            directory=self.directory,
+            output_format=self.output_format,
+        )
+
+    def _get_path(self, name):
+        """
+        @param name: str
+        @return: str
+        """
+        return get_export_path(self.directory, name, self.output_format)
+
+    def _new_state(self):
+        """
+        @return: dict, state of an export which has not started
+        """
+        return {
+            'output_format': self.output_format,
+            'tasks': [
+                {'name': name, 'where': None, 'offset': 0, 'done': False}
+                for name, _, _, _ in EXPORT_ENTITIES
+                # Planned once the keys are exported
+                if name != 'custom_targeting_values'
+            ],
+            'file_sizes': {},
+            'counts': {},
+        }
+
+    def _load_state(self):
+        """
+        Load the state of an interrupted export, and truncate the export
+        files to their checkpointed size, dropping pages written after
+        the last checkpoint
+
+        @return: dict
+        """
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'rb') as infile:
+                state = json.load(infile)
+            if state['output_format'] != self.output_format:
+                raise ParselmouthException(
+                    "Cannot resume a {0} export as {1}".format(
+                        state['output_format'], self.output_format,
+                    )
+                )
+        else:
+            state = self._new_state()
+
+        for name in self._entities:
+            path = self._get_path(name)
+            size = state['file_sizes'].get(name, 0)
+            if not os.path.exists(path):
+                if size:
+                    raise ParselmouthException(
+                        "Export file {0} is missing, cannot resume".format(path)
+                    )
+                continue
+            if os.path.getsize(path) < size:
+                raise ParselmouthException(
+                    "Export file {0} is truncated, cannot resume".format(path)
+                )
+            with open(path, 'r+b') as outfile:
+                outfile.truncate(size)
+        return state
+
+    def _save_state(self, state):
+        """
+        Atomically replace the state file
+
+        @param state: dict
+        """
+        temporary_path = self.state_path + '.tmp'
+        with open(temporary_path, 'wb') as outfile:
+            json.dump(state, outfile)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        os.rename(temporary_path, self.state_path)
+
+    def _write_page(self, name, records):
+        """
+        Append a page of records to an export file as a gzip member
+
+        @param name: str
+        @param records: list(dict)
+        @return: int, size of the file after the page
+        """
+        with open(self._get_path(name), 'ab') as outfile:
+            with GzipFile(fileobj=outfile, mode='wb') as member:
+                for record in records:
+                    if self.output_format == ExportFormats.ndjson:
+                        member.write(json.dumps(
+                            record, default=_json_default, sort_keys=True,
+                        ).encode('utf-8'))
+                        member.write(b'\n')
+                    else:
+                        pickle.dump(record, member, pickle.HIGHEST_PROTOCOL)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+            return outfile.tell()
+
+    def _plan_custom_targeting_values(self, state):
+        """
+        Add the tasks exporting the values of the exported keys
+
+        @param state: dict
+        """
+        key_path = self._get_path('custom_targeting_keys')
+        key_ids = []
+        if os.path.exists(key_path):
+            key_ids = [
+                record['id']
+                for record in read_export(key_path, self.output_format)
+            ]
+
+        for i in range(0, len(key_ids), CUSTOM_TARGETING_KEY_CHUNK_SIZE):
+            chunk = key_ids[i:i + CUSTOM_TARGETING_KEY_CHUNK_SIZE]
+            state['tasks'].append({
+                'name': 'custom_targeting_values',
+                'where': 'customTargetingKeyId IN ({0})'.format(
+                    ', '.join(str(key_id) for key_id in chunk)
+                ),
+                'offset': 0,
+                'done': False,
+            })
+
+    def _run_task(self, state, task):
+        """
+        Export the pages of a task, checkpointing after each one
+
+        @param state: dict
+        @param task: dict, one of state['tasks']
+        """
+        name = task['name']
+        service_name, method_name, order = self._entities[name]
+        query = 'ORDER BY {0}'.format(order)
+        if task['where']:
+            query = 'WHERE {0} {1}'.format(task['where'], query)
+        statement = FilterStatement(query, offset=task['offset'])
+
+        logging.info("Exporting %s from offset %d", name, task['offset'])
+        for page in self.client.iter_pages(service_name, method_name, statement):
+            records = [_to_record(obj) for obj in page]
+            state['file_sizes'][name] = self._write_page(name, records)
+            state['counts'][name] = state['counts'].get(name, 0) + len(records)
+            task['offset'] = statement.offset
+            self._save_state(state)
+
+        task['done'] = True
+        if name == 'custom_targeting_keys':
+            self._plan_custom_targeting_values(state)
+        self._save_state(state)
+
+    def run(self):
+        """
+        Run the export, resuming it if it was interrupted
+
+        @return: dict, entity name -> number of records exported
+        """
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+        state = self._load_state()
+        # Tasks may be added while running
+        i = 0
+        while i < len(state['tasks']):
+            task = state['tasks'][i]
+            if not task['done']:
+                self._run_task(state, task)
+            i += 1
+
+        logging.info("Export complete: %s", state['counts'])
+        return state['counts']
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Export a DFP network, resuming an interrupted export',
+    )
+    parser.add_argument('config_path', help='YAML credential file')
+    parser.add_argument('provider_name', help='provider in the credential file')
+    parser.add_argument('directory', help='output directory')
+    parser.add_argument(
+        '--format', default=ExportFormats.ndjson, choices=sorted(ExportFormats),
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = ParselmouthConfig(args.provider_name, config_path=args.config_path)
+    client = DFPClient(**config.get_credentials_arguments())
+    counts = NetworkExport(client, args.directory, args.format).run()
+    for name, count in sorted(counts.items()):
+        print('{0}: {1}'.format(name, count))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,992 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" DFP Stand-in
+
+Offline stand-in for the googleads DFP client, so that parselmouth can be
+tested and benchmarked without making requests to DFP. A FakeDFPClient
+is passed to DFPClient as its native client and serves its services,
+PQL queries and reports from a backend:
+    * FakeDFPBackend serves fixtures, e.g. a synthetic network, and
+        evaluates the PQL statements of the requests against them
+    * ReplayBackend serves the responses of a live network recorded
+        with a RecordingDFPClient
+
+The FakeDFPClient can add latency to requests, and fail them with quota
+errors or server errors, either at random with a fixed seed or on
+demand.
+
+Example:
+    backend = FakeDFPBackend({'line_items': [...], 'orders': [...]})
+    native_client = FakeDFPClient(backend, latency=0.2, quota_error_rate=0.01)
+    client = DFPClient(..., native_client=native_client)
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import base64
+import csv
+import json
+import random
+import re
+import threading
+import time
+import urllib2
+from collections import Counter
+from gzip import GzipFile
+from io import BytesIO
+
+# Parselmouth Imports
+from parselmouth.exceptions import ParselmouthException
+
+# Parselmouth Imports - Local DFP Adapter Imports
+from parselmouth.adapters.dfp.utils import recursive_asdict
+
+
+QUOTA_ERROR_MESSAGE = '[QuotaError.EXCEEDED_QUOTA @ ]'
+"""
+str, message of the quota errors raised by the stand-in
+"""
+
+SERVER_ERROR_MESSAGE = '[ServerError.SERVER_ERROR @ ]'
+"""
+str, message of the server errors raised by the stand-in
+"""
+
+REPORT_SERVICE_NAME = 'ReportService'
+"""
+str, name of the service reports are run by
+"""
+
+REPORT_URL = 'https://fake-dfp.invalid/reports/{0}?exportFormat={1}'
+"""
+str, URL reports are downloaded from, formatted with the id of the
+report job and the export format
+"""
+
+DEFAULT_NETWORK = {
+    'networkCode': '1234',
+    'displayName': 'Stand-in Network',
+    'timeZone': 'America/New_York',
+    'currencyCode': 'USD',
+}
+"""
+dict, network returned by NetworkService.getCurrentNetwork unless the
+fixtures have one
+"""
+
+_STATEMENT_PATTERN = re.compile(
+    r'^\s*(?:WHERE\s+(?P<where>.*?))?\s*'
+    r'(?:ORDER\s+BY\s+(?P<order>.*?))?\s*'
+    r'(?:LIMIT\s+(?P<limit>\d+))?\s*'
+    r'(?:OFFSET\s+(?P<offset>\d+))?\s*$',
+    re.IGNORECASE | re.DOTALL,
+)
+
+_SELECT_PATTERN = re.compile(
+    r'^\s*SELECT\s+(?P<columns>.*?)\s+FROM\s+(?P<table>\w+)\s*(?P<statement>.*)$',
+    re.IGNORECASE | re.DOTALL,
+)
+
+_CONDITION_PATTERN = re.compile(
+    r'^\s*(?P<column>\w+)\s*'
+    r'(?P<operator>!=|<=|>=|=|<|>|NOT\s+IN\b|IN\b|LIKE\b|IS\s+NOT\b|IS\b)'
+    r'\s*(?P<value>.*?)\s*$',
+    re.IGNORECASE | re.DOTALL,
+)
+
+_AND_PATTERN = re.compile(r'\s+AND\s+', re.IGNORECASE)
+
+_METHOD_PATTERN = re.compile(r'^(get|create|update)(\w+?)(ByStatement)?$')
+
+
+class FakeDFPError(Exception):
+    """
+    Error of a request to the stand-in, standing in for the SOAP faults
+    raised by googleads. Errors are classified by their message, as
+    those of DFP are, see is_quota_error and is_retryable_error.
+    """
+    pass
+
+
+def _to_snake_case(name):
+    """
+    @param name: str, e.g. 'LineItemCreativeAssociations'
+    @return: str, e.g. 'line_item_creative_associations'
+    """
+    return re.sub(r'(?<!^)([A-Z])', r'_\1', name).lower()
+
+
+def _get_entity_name(table):
+    """
+    @param table: str, PQL table, e.g. 'Line_Item'
+    @return: str, name of the fixture of the table, e.g. 'line_items'
+    """
+    return table.lower() + 's'
+
+
+def _format_datetime(dfp_datetime):
+    """
+    @param dfp_datetime: dict, DFP DateTime
+    @return: str, in DFP_DATETIME_FORMAT, which sorts chronologically
+    """
+    date = dfp_datetime['date']
+    return '{0:04d}-{1:02d}-{2:02d}T{3:02d}:{4:02d}:{5:02d}'.format(
+        int(date['year']), int(date['month']), int(date['day']),
+        int(dfp_datetime.get('hour', 0)),
+        int(dfp_datetime.get('minute', 0)),
+        int(dfp_datetime.get('second', 0)),
+    )
+
+
+def _to_value(field):
+    """
+    @param field: object, field of a record
+    @return: dict, PQL Value of the field, as in the result sets of
+        PublisherQueryLanguageService.select
+    """
+    if field is None:
+        return {'xsi_type': 'TextValue'}
+    if isinstance(field, bool):
+        return {'xsi_type': 'BooleanValue', 'value': field}
+    if isinstance(field, (int, long, float)):
+        return {'xsi_type': 'NumberValue', 'value': unicode(field)}
+    if isinstance(field, dict) and 'date' in field:
+        return {'xsi_type': 'DateTimeValue', 'value': field}
+    if isinstance(field, list):
+        return {
+            'xsi_type': 'SetValue',
+            'values': [_to_value(item) for item in field],
+        }
+    return {'xsi_type': 'TextValue', 'value': field}
+
+
+def _normalize(value):
+    """
+    Make field and query values comparable: numbers as floats, text
+    without case, and DateTimes as text
+
+    @param value: object
+    @return: object
+    """
+    if isinstance(value, dict) and 'date' in value:
+        return _format_datetime(value)
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, long, float)):
+        return float(value)
+    if isinstance(value, basestring):
+        try:
+            return float(value)
+        except ValueError:
+            return value.lower()
+    return value
+
+
+def _sort_key(value):
+    """
+    @param value: object
+    @return: tuple, ordering values of mixed types
+    """
+    value = _normalize(value)
+    return (value is None, isinstance(value, basestring), value)
+
+
+def _split_list(text):
+    """
+    @param text: str, comma separated values, which may be quoted
+    @return: list(str)
+    """
+    return next(csv.reader([text.encode('utf-8')], skipinitialspace=True,
+                           quotechar=b"'"))
+
+
+def _parse_value(token, bind_values):
+    """
+    @param token: str, value of a PQL condition
+    @param bind_values: dict, values of the bind variables of the query
+    @return: object
+    """
+    token = token.strip()
+    if token.startswith(':'):
+        return bind_values[token[1:]]
+    if token.startswith('(') and token.endswith(')'):
+        return [
+            _parse_value(item.decode('utf-8'), bind_values)
+            for item in _split_list(token[1:-1])
+        ]
+    if len(token) > 1 and token[0] == token[-1] and token[0] in '\'"':
+        return token[1:-1]
+    if token.lower() in ('true', 'false'):
+        return token.lower() == 'true'
+    if token.lower() == 'null':
+        return None
+    return token
+
+
+def _get_bind_values(values):
+    """
+    @param values: list(dict)|None, bind values of a statement
+    @return: dict, name -> value
+    """
+    return dict(
+        (value['key'], value['value'].get('value'))
+        for value in values or []
+    )
+
+
+def _matches(fields, condition):
+    """
+    @param fields: dict, lower cased field name -> value of a record
+    @param condition: tuple(str, str, object), (column, operator, value)
+    @return: bool
+    """
+    column, operator, value = condition
+    field = _normalize(fields.get(column))
+    if operator in ('in', 'not in'):
+        # Values of IN lists are normalized when parsed
+        found = field in value
+        return found if operator == 'in' else not found
+    if operator == 'like':
+        pattern = re.escape(value.lower()).replace('\\%', '.*')
+        return field is not None and \
+            re.match(pattern + '$', unicode(field)) is not None
+    if operator == 'is':
+        return field is None
+    if operator == 'is not':
+        return field is not None
+    value = _normalize(value)
+    if operator == '=':
+        return field == value
+    if operator == '!=':
+        return field != value
+    if field is None:
+        return False
+    return {
+        '<': field < value,
+        '<=': field <= value,
+        '>': field > value,
+        '>=': field >= value,
+    }[operator]
+
+
+def _parse_where(where, bind_values):
+    """
+    @param where: str|None, WHERE clause of a PQL statement
+    @param bind_values: dict
+    @return: list(tuple), conditions which must all match
+    """
+    if not where:
+        return []
+    conditions = []
+    for text in _AND_PATTERN.split(where):
+        match = _CONDITION_PATTERN.match(text)
+        if not match:
+            raise FakeDFPError(
+                '[PublisherQueryLanguageSyntaxError.UNPARSABLE @ {0}]'.format(
+                    text
+                )
+            )
+        operator = ' '.join(match.group('operator').lower().split())
+        value = _parse_value(match.group('value'), bind_values)
+        if operator in ('in', 'not in'):
+            value = frozenset(_normalize(item) for item in value)
+        conditions.append((match.group('column').lower(), operator, value))
+    return conditions
+
+
+def select(records, query, values=None):
+    """
+    Evaluate a PQL statement against records
+
+    @param records: list(dict)
+    @param query: str, PQL statement, e.g.
+        "WHERE status = 'READY' ORDER BY id LIMIT 500 OFFSET 0"
+    @param values: list(dict)|None, bind values of the statement
+    @return: tuple(list(dict), int), the records selected, and the
+        number of records matching before LIMIT and OFFSET are applied
+    """
+    match = _STATEMENT_PATTERN.match(query or '')
+    if not match:
+        raise FakeDFPError(
+            '[PublisherQueryLanguageSyntaxError.UNPARSABLE @ {0}]'.format(query)
+        )
+    conditions = _parse_where(match.group('where'), _get_bind_values(values))
+
+    selected = []
+    for record in records:
+        fields = dict((key.lower(), value) for key, value in record.iteritems())
+        if all(_matches(fields, condition) for condition in conditions):
+            selected.append(record)
+
+    if match.group('order'):
+        # Sort by the last column first, sorts are stable
+        for column in reversed(match.group('order').split(',')):
+            parts = column.split()
+            name = parts[0].lower()
+            selected.sort(
+                key=lambda record: _sort_key(dict(
+                    (key.lower(), value) for key, value in record.iteritems()
+                ).get(name)),
+                reverse=len(parts) > 1 and parts[1].upper() == 'DESC',
+            )
+
+    total = len(selected)
+    offset = int(match.group('offset') or 0)
+    if match.group('limit'):
+        selected = selected[offset:offset + int(match.group('limit'))]
+    else:
+        selected = selected[offset:]
+    return selected, total
+
+
+class FakeDFPBackend(object):
+    """
+    Thread-safe stand-in for the data of a DFP network. Fixtures are
+    lists of records, as dicts shaped like DFP objects, named after the
+    objects of each DFP service, e.g. 'line_items' for
+    LineItemService.getLineItemsByStatement and PQL table Line_Item,
+    'geo_targets' for PQL table Geo_Target.
+    """
+
+    def __init__(self, fixtures=None, max_page_size=None):
+        """
+        @param fixtures: dict|None, name -> list(dict). 'network' is the
+            dict returned by NetworkService.getCurrentNetwork,
+            'forecast' the one returned by
+            ForecastService.getAvailabilityForecast, and 'report_rows' a
+            list of dicts of the values of each report dimension and
+            column. 'report_polls' is the number of times the status of
+            a report job is checked before it completes, 0 by default.
+        @param max_page_size: int|None, maximum number of results
+            returned per request, less than asked for when smaller than
+            the LIMIT of a statement
+        """
+        self.fixtures = dict(fixtures or {})
+        self.max_page_size = max_page_size
+        self._lock = threading.Lock()
+        # report job id -> [report query, status checks left]
+        self._reports = {}
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "fixtures={fixtures}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            fixtures=sorted(
+                name for name, records in self.fixtures.iteritems()
+                if isinstance(records, list)
+            ),
+        )
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """
+        @param path: str, JSON file of fixtures
+        @return: FakeDFPBackend
+        """
+        with open(path, 'rb') as infile:
+            return cls(json.load(infile), **kwargs)
+
+    def _get_records(self, name):
+        """
+        @param name: str
+        @return: list(dict)
+        """
+        return self.fixtures.setdefault(name, [])
+
+    def _get_by_statement(self, name, statement):
+        """
+        @param name: str
+        @param statement: dict, with the query and values of a statement
+        @return: dict, page of results
+        """
+        query = statement.get('query')
+        page, total = select(
+            self._get_records(name), query, statement.get('values'),
+        )
+        if self.max_page_size is not None:
+            page = page[:self.max_page_size]
+        response = {'totalResultSetSize': total}
+        if page:
+            match = _STATEMENT_PATTERN.match(query or '')
+            response['startIndex'] = int(match.group('offset') or 0)
+            response['results'] = [dict(record) for record in page]
+        return response
+
+    def _create(self, name, objects):
+        """
+        @param name: str
+        @param objects: list(dict)
+        @return: list(dict), the objects created, with their ids
+        """
+        records = self._get_records(name)
+        next_id = max([int(record['id']) for record in records] or [0]) + 1
+        created = []
+        for obj in objects:
+            record = dict(obj, id=next_id)
+            next_id += 1
+            records.append(record)
+            created.append(dict(record))
+        return created
+
+    def _update(self, name, objects):
+        """
+        @param name: str
+        @param objects: list(dict)
+        @return: list(dict), the objects updated
+        """
+        records = self._get_records(name)
+        positions = dict(
+            (unicode(record['id']), i) for i, record in enumerate(records)
+        )
+        for obj in objects:
+            position = positions.get(unicode(obj['id']))
+            if position is None:
+                raise FakeDFPError(
+                    '[EntityNotFoundError.NOT_FOUND @ {0}]'.format(obj['id'])
+                )
+            records[position] = dict(obj)
+        return [dict(obj) for obj in objects]
+
+    def _select_table(self, pql_query, values=None):
+        """
+        @param pql_query: str
+        @param values: list(dict)|None
+        @return: tuple(list(str), list(list)), lower cased columns, and
+            the fields of the records selected
+        """
+        match = _SELECT_PATTERN.match(pql_query)
+        if not match:
+            raise FakeDFPError(
+                '[PublisherQueryLanguageSyntaxError.UNPARSABLE @ {0}]'.format(
+                    pql_query
+                )
+            )
+        columns = [
+            column.strip().lower()
+            for column in match.group('columns').split(',')
+        ]
+        records, _ = select(
+            self._get_records(_get_entity_name(match.group('table'))),
+            match.group('statement'),
+            values,
+        )
+        rows = []
+        for record in records:
+            fields = dict((key.lower(), value) for key, value in record.iteritems())
+            rows.append([fields.get(column) for column in columns])
+        return columns, rows
+
+    def _select_pql(self, statement):
+        """
+        @param statement: dict, with the query and values of a statement
+        @return: dict, PQL ResultSet
+        """
+        columns, rows = self._select_table(
+            statement.get('query'), statement.get('values'),
+        )
+        response = {
+            'columnTypes': [{'labelName': column} for column in columns],
+        }
+        if rows:
+            response['rows'] = [
+                {'values': [_to_value(field) for field in row]}
+                for row in rows
+            ]
+        return response
+
+    def _get_report_rows(self, report_query):
+        """
+        @param report_query: dict
+        @return: list(list), header row followed by the report's rows
+        """
+        dimensions = report_query.get('dimensions', [])
+        columns = report_query.get('columns', [])
+        if 'report_rows' in self.fixtures:
+            rows = self.fixtures['report_rows']
+        else:
+            # One row per line item
+            rows = [
+                {
+                    'LINE_ITEM_ID': line_item.get('id'),
+                    'LINE_ITEM_NAME': line_item.get('name'),
+                    'AD_SERVER_IMPRESSIONS': line_item.get(
+                        'stats', {}
+                    ).get('impressionsDelivered', 0),
+                }
+                for line_item in self._get_records('line_items')
+            ]
+        header = ['Dimension.' + name for name in dimensions] + \
+            ['Column.' + name for name in columns]
+        return [header] + [
+            [row.get(name, '') for name in dimensions + columns]
+            for row in rows
+        ]
+
+    def handle(self, service_name, method_name, args):
+        """
+        Serve a request
+
+        @param service_name: str, e.g. 'LineItemService'
+        @param method_name: str, e.g. 'getLineItemsByStatement'
+        @param args: tuple, arguments of the request
+        @return: object, response of the request
+        """
+        with self._lock:
+            if method_name == 'getCurrentNetwork':
+                return dict(self.fixtures.get('network', DEFAULT_NETWORK))
+            if method_name == 'getAvailabilityForecast':
+                return dict(self.fixtures.get('forecast', {'availableUnits': 0}))
+            if method_name == 'select':
+                return self._select_pql(args[0])
+            if method_name == 'runReportJob':
+                report_id = len(self._reports) + 1
+                self._reports[report_id] = [
+                    args[0]['reportQuery'],
+                    self.fixtures.get('report_polls', 0),
+                ]
+                return {'id': report_id}
+            if method_name == 'getReportJobStatus':
+                report = self._get_report(args[0])
+                if report[1] > 0:
+                    report[1] -= 1
+                    return 'IN_PROGRESS'
+                return 'COMPLETED'
+            if method_name == 'getReportDownloadURL':
+                self._get_report(args[0])
+                return REPORT_URL.format(*args)
+            if method_name == 'downloadReport':
+                report_id = int(args[0].split('?')[0].rsplit('/', 1)[-1])
+                return self._get_report_file(self._get_report(report_id)[0])
+
+            match = _METHOD_PATTERN.match(method_name)
+            if not match:
+                raise ParselmouthException(
+                    "The DFP stand-in does not support {0}.{1}".format(
+                        service_name, method_name,
+                    )
+                )
+            action, objects, by_statement = match.groups()
+            name = _to_snake_case(objects)
+            if action == 'get' and by_statement:
+                return self._get_by_statement(name, args[0])
+            if action == 'create':
+                return self._create(name, args[0])
+            if action == 'update':
+                return self._update(name, args[0])
+            raise ParselmouthException(
+                "The DFP stand-in does not support {0}.{1}".format(
+                    service_name, method_name,
+                )
+            )
+
+    def _get_report(self, report_id):
+        """
+        @param report_id: int, id of a report job
+        @return: list, report query and number of status checks left
+        """
+        report = self._reports.get(report_id)
+        if report is None:
+            raise FakeDFPError(
+                '[ReportError.REPORT_NOT_FOUND @ {0}]'.format(report_id)
+            )
+        return report
+
+    def _get_report_file(self, report_query):
+        """
+        @param report_query: dict
+        @return: bytes, gzipped CSV of the report, as DFP serves it
+        """
+        output = BytesIO()
+        with GzipFile(fileobj=output, mode='wb') as zipped:
+            writer = csv.writer(zipped)
+            for row in self._get_report_rows(report_query):
+                writer.writerow([unicode(cell).encode('utf-8') for cell in row])
+        return output.getvalue()
+
+
+def _to_json(obj):
+    """
+    @param obj: object, response of a request, which may hold SUDS
+        objects
+    @return: object, serializable as JSON
+    """
+    if hasattr(obj, '__keylist__'):
+        return recursive_asdict(obj)
+    if isinstance(obj, (list, tuple)):
+        return [_to_json(item) for item in obj]
+    if isinstance(obj, dict):
+        return dict((key, _to_json(value)) for key, value in obj.iteritems())
+    return obj
+
+
+def _get_request_key(service_name, method_name, args):
+    """
+    @param service_name: str
+    @param method_name: str
+    @param args: tuple
+    @return: str, identifying a request with the same arguments
+    """
+    return json.dumps(
+        [service_name, method_name, _to_json(list(args))],
+        sort_keys=True,
+        default=unicode,
+    )
+
+
+class ReplayBackend(object):
+    """
+    Thread-safe backend serving the responses recorded by a
+    RecordingDFPClient. Requests made more than once are answered with
+    their recorded responses in order, then with the last one.
+    """
+
+    def __init__(self, recording):
+        """
+        @param recording: list(dict), recorded requests and responses,
+            see RecordingDFPClient.save
+        """
+        self._lock = threading.Lock()
+        # request key -> list of recorded calls
+        self._calls = {}
+        for call in recording:
+            key = _get_request_key(
+                call['service'], call['method'], call['args'],
+            )
+            self._calls.setdefault(key, []).append(call)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        @param path: str, file saved by RecordingDFPClient.save
+        @return: ReplayBackend
+        """
+        with open(path, 'rb') as infile:
+            return cls(json.load(infile))
+
+    def handle(self, service_name, method_name, args):
+        """
+        @param service_name: str
+        @param method_name: str
+        @param args: tuple
+        @return: object, recorded response of the request
+        """
+        key = _get_request_key(service_name, method_name, args)
+        with self._lock:
+            calls = self._calls.get(key)
+            if not calls:
+                raise ParselmouthException(
+                    "No recorded response for {0}.{1}{2}".format(
+                        service_name, method_name, key,
+                    )
+                )
+            call = calls.pop(0) if len(calls) > 1 else calls[0]
+
+        if 'error' in call:
+            raise FakeDFPError(call['error'])
+        response = call['response']
+        if method_name == 'downloadReport':
+            return base64.b64decode(response)
+        return response
+
+
+class FakeService(object):
+    """
+    Stand-in for a googleads service, making its requests through a
+    FakeDFPClient
+    """
+
+    # Not a SUDS service, there is no transport to configure
+    suds_client = None
+
+    def __init__(self, client, service_name):
+        """
+        @param client: FakeDFPClient
+        @param service_name: str
+        """
+        self.client = client
+        self.service_name = service_name
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def request(*args):
+            return self.client.request(self.service_name, name, args)
+        request.__name__ = name
+        return request
+
+
+class FakeURLOpener(object):
+    """
+    Stand-in for the urllib2 opener reports are downloaded with,
+    downloading them through a FakeDFPClient
+    """
+
+    def __init__(self, client):
+        """
+        @param client: FakeDFPClient
+        """
+        self.client = client
+
+    def open(self, url, data=None, timeout=None):
+        return BytesIO(self.client.request(
+            REPORT_SERVICE_NAME, 'downloadReport', (url,),
+        ))
+
+
+class FakeDFPClient(object):
+    """
+    Thread-safe stand-in for googleads.DfpClient, serving requests from
+    a backend with simulated latency and failures
+    """
+
+    def __init__(self,
+                 backend,
+                 latency=0,
+                 quota_error_rate=0,
+                 failure_rate=0,
+                 seed=0,
+                 sleep=time.sleep):
+        """
+        @param backend: FakeDFPBackend|ReplayBackend
+        @param latency: float|function(str, str) -> float, number of
+            seconds each request takes, or a function of the service
+            and method names returning it
+        @param quota_error_rate: float, probability of a request failing
+            with a quota error
+        @param failure_rate: float, probability of a request failing
+            with a retryable server error
+        @param seed: int, seed of the random failures, so that runs are
+            reproducible
+        @param sleep: function(float), wait for a number of seconds
+        """
+        self.backend = backend
+        self.latency = latency
+        self.quota_error_rate = quota_error_rate
+        self.failure_rate = failure_rate
+        self._sleep = sleep
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # list of [service name|None, method name|None, error, times]
+        self._injected_errors = []
+        # (service name, method name) -> number of requests
+        self.requests = Counter()
+        self.url_opener = FakeURLOpener(self)
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "backend={backend},"
+                "requests={requests}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            backend=self.backend,
+            requests=sum(self.requests.values()),
+        )
+
+    def GetService(self, service_name, version=None, server=None):
+        return FakeService(self, service_name)
+
+    def inject_error(self, error, service_name=None, method_name=None, times=1):
+        """
+        Fail the next requests to a service and/or method
+
+        @param error: Exception|str, error raised, or the message of a
+            FakeDFPError, e.g. QUOTA_ERROR_MESSAGE
+        @param service_name: str|None, None to fail any service
+        @param method_name: str|None, None to fail any method
+        @param times: int, number of requests failed
+        """
+        if not isinstance(error, Exception):
+            error = FakeDFPError(error)
+        with self._lock:
+            self._injected_errors.append(
+                [service_name, method_name, error, times]
+            )
+
+    def _get_error(self, service_name, method_name):
+        """
+        @param service_name: str
+        @param method_name: str
+        @return: Exception|None, error the request fails with
+        """
+        with self._lock:
+            self.requests[(service_name, method_name)] += 1
+            for injected in self._injected_errors:
+                injected_service, injected_method, error, times = injected
+                if injected_service not in (None, service_name):
+                    continue
+                if injected_method not in (None, method_name):
+                    continue
+                if times <= 1:
+                    self._injected_errors.remove(injected)
+                else:
+                    injected[3] -= 1
+                return error
+
+            draw = self._random.random()
+            if draw < self.quota_error_rate:
+                return FakeDFPError(QUOTA_ERROR_MESSAGE)
+            if draw < self.quota_error_rate + self.failure_rate:
+                return FakeDFPError(SERVER_ERROR_MESSAGE)
+        return None
+
+    def request(self, service_name, method_name, args):
+        """
+        Make a request to the backend
+
+        @param service_name: str
+        @param method_name: str
+        @param args: tuple
+        @return: object, response of the request
+        """
+        latency = self.latency
+        if callable(latency):
+            latency = latency(service_name, method_name)
+        if latency:
+            self._sleep(latency)
+
+        error = self._get_error(service_name, method_name)
+        if error is not None:
+            raise error
+        return self.backend.handle(service_name, method_name, args)
+
+
+class _RecordingProxy(object):
+    """
+    Wraps a googleads service, recording its requests
+    """
+
+    def __init__(self, recorder, service_name, target):
+        """
+        @param recorder: RecordingDFPClient
+        @param service_name: str
+        @param target: object
+        """
+        self.recorder = recorder
+        self.service_name = service_name
+        self.target = target
+
+    def __getattr__(self, name):
+        attribute = getattr(self.target, name)
+        if not callable(attribute) or name.startswith('_'):
+            return attribute
+
+        def recorded(*args):
+            return self.recorder.record(self.service_name, name, attribute, args)
+        recorded.__name__ = name
+        return recorded
+
+
+class _RecordingURLOpener(object):
+    """
+    Wraps a urllib2 opener, recording the reports downloaded with it
+    """
+
+    def __init__(self, recorder, opener):
+        """
+        @param recorder: RecordingDFPClient
+        @param opener: urllib2.OpenerDirector|FakeURLOpener
+        """
+        self.recorder = recorder
+        self.opener = opener
+
+    def open(self, url, data=None, timeout=None):
+        def downloadReport(url):
+            return self.opener.open(url, timeout=timeout).read()
+        return BytesIO(self.recorder.record(
+            REPORT_SERVICE_NAME, 'downloadReport', downloadReport, (url,),
+        ))
+
+
+class RecordingDFPClient(object):
+    """
+    Wraps a googleads.DfpClient, recording the requests made through it
+    and their responses, so that they can be replayed offline with a
+    ReplayBackend
+
+    Example:
+        recorder = RecordingDFPClient(dfp_client.native_dfp_client)
+        dfp_client.native_dfp_client = recorder
+        dfp_client.get_line_items()
+        recorder.save('line_items.json')
+    """
+
+    def __init__(self, native_client):
+        """
+        @param native_client: googleads.DfpClient
+        """
+        self.native_client = native_client
+        self._lock = threading.Lock()
+        self.calls = []
+        self.url_opener = _RecordingURLOpener(
+            self,
+            getattr(native_client, 'url_opener', None) or urllib2.build_opener(),
+        )
+
+    def GetService(self, service_name, version=None, server=None):
+        return _RecordingProxy(
+            self,
+            service_name,
+            self.native_client.GetService(service_name, version=version),
+        )
+
+    def record(self, service_name, method_name, function, args):
+        """
+        Make a request and record it
+
+        @param service_name: str
+        @param method_name: str
+        @param function: function making the request
+        @param args: tuple
+        @return: object, response of the request
+        """
+        call = {
+            'service': service_name,
+            'method': method_name,
+            'args': _to_json(list(args)),
+        }
+        try:
+            response = function(*args)
+        except Exception as e:
+            call['error'] = unicode(e)
+            with self._lock:
+                self.calls.append(call)
+            raise
+
+        if method_name == 'downloadReport':
+            call['response'] = base64.b64encode(response)
+        else:
+            call['response'] = _to_json(response)
+        with self._lock:
+            self.calls.append(call)
+        return response
+
+    def save(self, path):
+        """
+        @param path: str, JSON file, loaded with ReplayBackend.from_file
+        """
+        with self._lock:
+            calls = list(self.calls)
+        with open(path, 'wb') as outfile:
+            json.dump(calls, outfile, default=unicode, indent=1, sort_keys=True)
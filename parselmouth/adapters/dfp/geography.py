@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" DFP Geography
+
+The geographies DFP targets, from countries down to postal codes, are
+the same for every network and number in the hundreds of thousands.
+They are streamed once from PQL table Geo_Target into a GeographyTable,
+which keeps them in parallel arrays rather than as an object each, and
+is shared by the clients of every network of the process through a
+GeographyCache.
+
+The table resolves the parent of each geography from the ParentIds
+column, which lists all of its ancestors, e.g. a city has its state and
+its country as parents.
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import logging
+import threading
+import time
+from array import array
+from urllib import quote
+
+# Parselmouth Imports
+from parselmouth.targeting import Geography
+
+# Parselmouth Imports - Local DFP Adapter Imports
+from parselmouth.adapters.dfp.constants import DFP_GEOGRAPHY_CACHE_TTL
+
+
+def _intern(values, value):
+    """
+    @param values: dict, value -> index, of the values seen so far
+    @param value: object
+    @return: int, index of the value
+    """
+    index = values.get(value)
+    if index is None:
+        index = values[value] = len(values)
+    return index
+
+
+class GeographyTable(object):
+    """
+    Compact table of geographies. Geographies are rows of parallel
+    arrays: ids, index of the parent row (-1 for roots), names, and
+    indexes into the lists of the distinct types and country codes.
+    Geography objects are only built when read.
+    """
+
+    def __init__(self,
+                 ids,
+                 parent_rows,
+                 names,
+                 type_rows,
+                 types,
+                 country_code_rows,
+                 country_codes):
+        """
+        @param ids: array(int), id of each geography
+        @param parent_rows: array(int), row of the parent of each
+            geography, -1 if it has none
+        @param names: list(str), name of each geography
+        @param type_rows: array(int), index in types of the type of each
+            geography
+        @param types: list(str), distinct types, e.g. 'COUNTRY'
+        @param country_code_rows: array(int), index in country_codes of
+            the country code of each geography
+        @param country_codes: list(str|None), distinct country codes
+        """
+        self.ids = ids
+        self.parent_rows = parent_rows
+        self.names = names
+        self.type_rows = type_rows
+        self.types = types
+        self.country_code_rows = country_code_rows
+        self.country_codes = country_codes
+        self._rows = dict((geo_id, row) for row, geo_id in enumerate(ids))
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "geographies={geographies},"
+                "types={types}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            geographies=len(self),
+            types=self.types,
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        for row in xrange(len(self.ids)):
+            yield self._get_geography(row)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build a table from rows of PQL table Geo_Target. Rows are read
+        once, so they can be streamed.
+
+        @param rows: iterable(namedtuple), with fields id, name,
+            parent_ids, country_code and type, see
+            DFPClient.get_geography_targets
+        @return: GeographyTable
+        """
+        ids = array(b'l')
+        names = []
+        type_rows = array(b'H')
+        types = {}
+        country_code_rows = array(b'H')
+        country_codes = {}
+        parent_ids = []
+        for row in rows:
+            ids.append(row.id)
+            names.append(row.name)
+            type_rows.append(_intern(types, row.type))
+            country_code_rows.append(_intern(country_codes, row.country_code))
+            parent_ids.append(tuple(row.parent_ids or ()))
+
+        # The parent of a geography is its ancestor with the most
+        # ancestors, among those in the table
+        id_rows = dict((geo_id, row) for row, geo_id in enumerate(ids))
+        parent_rows = array(b'l', [-1] * len(ids))
+        for row, ancestor_ids in enumerate(parent_ids):
+            ancestor_rows = [
+                id_rows[ancestor_id] for ancestor_id in ancestor_ids
+                if ancestor_id in id_rows
+            ]
+            if ancestor_rows:
+                parent_rows[row] = max(
+                    ancestor_rows,
+                    key=lambda ancestor_row: len(parent_ids[ancestor_row]),
+                )
+
+        return cls(
+            ids,
+            parent_rows,
+            names,
+            type_rows,
+            sorted(types, key=types.get),
+            country_code_rows,
+            sorted(country_codes, key=country_codes.get),
+        )
+
+    def _get_geography(self, row):
+        """
+        @param row: int
+        @return: Geography
+        """
+        parent_row = self.parent_rows[row]
+        name = self.names[row]
+        geo_type = self.types[self.type_rows[row]]
+        return Geography(
+            id=unicode(self.ids[row]),
+            parent_id=(
+                unicode(self.ids[parent_row]) if parent_row >= 0 else None
+            ),
+            type=geo_type.lower() if geo_type else None,
+            name=name,
+            external_name=quote((name or '').encode('utf-8'), ''),
+        )
+
+    def get(self, geo_id):
+        """
+        @param geo_id: int|str
+        @return: Geography|None
+        """
+        row = self._rows.get(int(geo_id))
+        if row is None:
+            return None
+        return self._get_geography(row)
+
+    def get_country_code(self, geo_id):
+        """
+        @param geo_id: int|str
+        @return: str|None, e.g. 'US'
+        """
+        row = self._rows.get(int(geo_id))
+        if row is None:
+            return None
+        return self.country_codes[self.country_code_rows[row]]
+
+    def get_ancestors(self, geo_id):
+        """
+        @param geo_id: int|str
+        @return: list(Geography), from the parent of the geography up to
+            its root
+        """
+        ancestors = []
+        row = self._rows.get(int(geo_id), -1)
+        while row >= 0 and self.parent_rows[row] >= 0:
+            row = self.parent_rows[row]
+            ancestors.append(self._get_geography(row))
+        return ancestors
+
+    def get_geographies(self, types=None):
+        """
+        @param types: list(str)|None, only return geographies of these
+            types, e.g. ['country', 'state']
+        @return: list(Geography)
+        """
+        if types is None:
+            return list(self)
+        types = set(geo_type.lower() for geo_type in types)
+        type_indexes = set(
+            i for i, geo_type in enumerate(self.types)
+            if geo_type and geo_type.lower() in types
+        )
+        return [
+            self._get_geography(row) for row in xrange(len(self.ids))
+            if self.type_rows[row] in type_indexes
+        ]
+
+
+class GeographyCache(object):
+    """
+    Thread-safe cache of GeographyTables, per API version. A table is
+    loaded once for all the threads asking for it, and reloaded once it
+    is older than the time to live.
+    """
+
+    def __init__(self, ttl=DFP_GEOGRAPHY_CACHE_TTL, clock=time.time):
+        """
+        @param ttl: float, number of seconds a table is kept
+        @param clock: function() -> float
+        """
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # version -> (load time, GeographyTable)
+        self._tables = {}
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "ttl={ttl},"
+                "versions={versions}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            ttl=self.ttl,
+            versions=sorted(self._tables),
+        )
+
+    def get(self, version, load):
+        """
+        @param version: str, DFP API version
+        @param load: function() -> GeographyTable, called if the table
+            is not cached or has expired
+        @return: GeographyTable
+        """
+        with self._lock:
+            cached = self._tables.get(version)
+            if cached and self._clock() - cached[0] < self.ttl:
+                return cached[1]
+            table = load()
+            logging.info(
+                "Loaded %d geographies of DFP %s", len(table), version,
+            )
+            self._tables[version] = (self._clock(), table)
+            return table
+
+    def clear(self):
+        """
+        Forget the cached tables
+        """
+        with self._lock:
+            self._tables = {}
+
+
+GEOGRAPHY_CACHE = GeographyCache()
+"""
+GeographyCache, geographies shared by all DFP interfaces of the process
+"""
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" DFP Instrumentation
+
+Report the requests made to DFP services to a
+parselmouth.metrics.MetricsRegistry. Each request reports, tagged with
+its service and method:
+    * dfp.request: timing of the request
+    * dfp.request.errors: count of failed requests
+    * dfp.bytes: count of bytes sent and received
+    * dfp.pages, dfp.records: count of pages and records returned by
+        paged queries
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import time
+
+# Third Party Library Imports
+from suds.plugin import MessagePlugin
+
+
+class PayloadSizePlugin(MessagePlugin):
+    """
+    SUDS plugin counting the bytes of the SOAP messages of a client. A
+    googleads service is used by one thread at a time, see ServicePool,
+    so counts need no locking.
+    """
+
+    def __init__(self):
+        self.sent_bytes = 0
+        self.received_bytes = 0
+
+    def sending(self, context):
+        self.sent_bytes += len(context.envelope or b'')
+
+    def received(self, context):
+        self.received_bytes += len(context.reply or b'')
+
+    @property
+    def total_bytes(self):
+        """
+        @return: int
+        """
+        return self.sent_bytes + self.received_bytes
+
+
+def get_payload_size_plugin(service):
+    """
+    Get the PayloadSizePlugin of a googleads service, installing it on
+    first use
+
+    @param service: googleads.common.SudsServiceProxy
+    @return: PayloadSizePlugin|None, None for objects which are not
+        SUDS services
+    """
+    suds_client = getattr(service, 'suds_client', None)
+    if suds_client is None:
+        return None
+    plugins = suds_client.options.plugins
+    for plugin in plugins:
+        if isinstance(plugin, PayloadSizePlugin):
+            return plugin
+    plugin = PayloadSizePlugin()
+    suds_client.set_options(plugins=list(plugins) + [plugin])
+    return plugin
+
+
+def _get_page_size(result):
+    """
+    @param result: object, result of a request
+    @return: int|None, number of records of a page of a paged query
+    """
+    try:
+        if 'results' in result:
+            return len(result['results'])
+        # PQL result sets
+        if 'rows' in result:
+            return len(result['rows'])
+    except TypeError:
+        pass
+    return None
+
+
+class InstrumentedService(object):
+    """
+    Wraps a googleads service, or an object making requests through one,
+    so that its requests are reported to a MetricsRegistry
+    """
+
+    def __init__(self, service, metrics, service_name, transport_service=None):
+        """
+        @param service: object, e.g. a googleads service
+        @param metrics: MetricsRegistry
+        @param service_name: str, e.g. 'LineItemService'
+        @param transport_service: SudsServiceProxy|None, service making
+            the requests, defaults to the wrapped service
+        """
+        self.service = service
+        self.metrics = metrics
+        self.service_name = service_name
+        self.transport_service = transport_service or service
+
+    def __getattr__(self, name):
+        attribute = getattr(self.service, name)
+        if not callable(attribute) or not self.metrics.enabled:
+            return attribute
+
+        def instrumented(*args, **kwargs):
+            tags = {'service': self.service_name, 'method': name}
+            plugin = get_payload_size_plugin(self.transport_service)
+            bytes_before = plugin.total_bytes if plugin else 0
+            start = time.time()
+            try:
+                result = attribute(*args, **kwargs)
+            except Exception:
+                self.metrics.increment('dfp.request.errors', **tags)
+                raise
+            finally:
+                self.metrics.timing('dfp.request', time.time() - start, **tags)
+                if plugin:
+                    self.metrics.increment(
+                        'dfp.bytes', plugin.total_bytes - bytes_before, **tags
+                    )
+
+            page_size = _get_page_size(result)
+            if page_size is not None:
+                self.metrics.increment('dfp.pages', **tags)
+                self.metrics.increment('dfp.records', page_size, **tags)
+            return result
+        instrumented.__name__ = name
+        return instrumented
@@ -14,7 +14,6 @@ from __future__ import unicode_literals
 import logging
 from datetime import timedelta
 from pytz import timezone
-from urllib import quote
 
 # Parselmouth Imports
 from parselmouth.adapters.abstract_interface import AbstractInterface
@@ -23,20 +22,24 @@ from parselmouth.delivery import LineItem
 from parselmouth.exceptions import ParselmouthException
 from parselmouth.targeting import AdUnit
 from parselmouth.targeting import Custom
-from parselmouth.targeting import Geography
 from parselmouth.utils.dateutils import align_to_day
 
 # Parselmouth Imports - Local DFP Adapter Imports
 from parselmouth.adapters.dfp.constants import DFP_API_VERSION
+from parselmouth.adapters.dfp.constants import DFP_LINE_ITEM_COLUMNS
+from parselmouth.adapters.dfp.constants import DFP_PAGINATION_MODES
 from parselmouth.adapters.dfp.constants import DFP_QUERY_DEFAULTS
 from parselmouth.adapters.dfp.constants import DFP_REPORT_METRIC_MAP
 from parselmouth.adapters.dfp.client  import DFPClient
+from parselmouth.adapters.dfp.pql import to_columns
 from parselmouth.adapters.dfp.utils import recursive_asdict
 from parselmouth.adapters.dfp.delivery_utils import transform_line_item_from_dfp
 from parselmouth.adapters.dfp.delivery_utils import transform_line_item_to_dfp
 from parselmouth.adapters.dfp.delivery_utils import transform_forecast_line_item_to_dfp
 from parselmouth.adapters.dfp.delivery_utils import transform_campaign_from_dfp
 from parselmouth.adapters.dfp.delivery_utils import transform_creative_from_dfp
+from parselmouth.adapters.dfp.geography import GEOGRAPHY_CACHE
+from parselmouth.adapters.dfp.geography import GeographyTable
 
 
 class DFPInterface(AbstractInterface):
@@ -52,11 +55,30 @@ class DFPInterface(AbstractInterface):
                  client_secret,
                  refresh_token,
                  application_name,
-                 network_code):
+                 network_code,
+                 oauth2_client=None,
+                 rate_limiters=None,
+                 retry_policy=None,
+                 metrics=None,
+                 native_client=None,
+                 pagination=DFP_PAGINATION_MODES.keyset,
+                 geography_cache=None,
+                 network_timezone=None):
         """
         Constructor
 
         @param provider_config: child(parselmouth.config.ParselmouthConfig)
+        @param oauth2_client: GoogleRefreshTokenClient|None, OAuth2
+            client shared with the clients of other networks
+        @param rate_limiters: RateLimiterRegistry|None, see DFPClient
+        @param retry_policy: RetryPolicy|None, see DFPClient
+        @param metrics: MetricsRegistry|None, see DFPClient
+        @param native_client: googleads.DfpClient|None, see DFPClient
+        @param pagination: DFP_PAGINATION_MODES, see DFPClient
+        @param geography_cache: GeographyCache|None, cache of the
+            geographies of DFP, defaults to the cache shared by all
+            interfaces of the process
+        @param network_timezone: pytz.timezone|None, see DFPClient
         """
         self.dfp_client = DFPClient(
             client_id,
@@ -65,14 +87,35 @@ class DFPInterface(AbstractInterface):
             application_name,
             network_code,
             version=DFP_API_VERSION,
+            oauth2_client=oauth2_client,
+            rate_limiters=rate_limiters,
+            retry_policy=retry_policy,
+            metrics=metrics,
+            native_client=native_client,
+            pagination=pagination,
+            network_timezone=network_timezone,
         )
+        self.geography_cache = geography_cache or GEOGRAPHY_CACHE
+
+    def _transform(self, function, items):
+        """
+        Convert a list of DFP objects, reporting the time taken to the
+        client's metrics as dfp.conversion
+
+        @param function: function(object) -> object, conversion function
+        @param items: list
+        @return: list
+        """
+        with self.dfp_client.metrics.timer(
+                'dfp.conversion', function=function.__name__):
+            return [function(item) for item in items]
 
     def _convert_response_to_dict(self, dfp_data):
         """
         @param dfp_data: list(SUDS)
         @return: list(dict)
         """
-        return [recursive_asdict(d) for d in dfp_data]
+        return self._transform(recursive_asdict, dfp_data)
 
     def get_network_timezone(self):
         """
@@ -81,9 +124,7 @@ class DFPInterface(AbstractInterface):
 
         @return: pytz.timezone
         """
-        dfp_data = self.dfp_client.get_network_data()
-        data = recursive_asdict(dfp_data)
-        return timezone(data['timeZone'])
+        return self.dfp_client.get_network_timezone()
 
     def get_campaign(self, campaign_id):
         """
@@ -107,7 +148,7 @@ class DFPInterface(AbstractInterface):
                 )
             )
 
-        return transform_campaign_from_dfp(results[0])
+        return self._transform(transform_campaign_from_dfp, results[:1])[0]
 
     def get_campaigns(self,
                       order=DFP_QUERY_DEFAULTS['order'],
@@ -138,12 +179,7 @@ class DFPInterface(AbstractInterface):
         )
         results = self._convert_response_to_dict(dfp_orders)
 
-        campaigns = []
-        for order in results:
-            campaigns.append(
-                transform_campaign_from_dfp(order)
-            )
-        return campaigns
+        return self._transform(transform_campaign_from_dfp, results)
 
     def get_line_item(self, line_item_id):
         """
@@ -166,7 +202,7 @@ class DFPInterface(AbstractInterface):
                 )
             )
 
-        return transform_line_item_from_dfp(results[0])
+        return self._transform(transform_line_item_from_dfp, results[:1])[0]
 
     def get_line_items(self,
                        order=DFP_QUERY_DEFAULTS['order'],
@@ -193,12 +229,32 @@ class DFPInterface(AbstractInterface):
         )
         results = self._convert_response_to_dict(dfp_line_items)
 
-        line_items = []
-        for line_item in results:
-            line_items.append(
-                transform_line_item_from_dfp(line_item)
-            )
-        return line_items
+        return self._transform(transform_line_item_from_dfp, results)
+
+    def get_line_item_rows(self,
+                           columns=DFP_LINE_ITEM_COLUMNS,
+                           columnar=False,
+                           **filter_kwargs):
+        """
+        List line items with selected columns only, e.g. for dashboards.
+        Much less is downloaded and converted than with get_line_items,
+        since targeting and the other fields of LineItem objects are left
+        out.
+
+        @param columns: list(str), columns of PQL table Line_Item
+        @param columnar: bool, return a list of values per column rather
+            than a row per line item
+        @param filter_kwargs: dict, keyword arguments on which to filter
+            PQL results
+        @return: list(namedtuple)|dict, rows with a field per column
+            named in snake case, e.g. `row.start_date_time`, or field
+            name -> list of the values of the column, see
+            parselmouth.adapters.dfp.pql
+        """
+        rows = self.dfp_client.get_line_item_rows(columns, **filter_kwargs)
+        if columnar:
+            return to_columns(rows, columns)
+        return list(rows)
 
     def get_campaign_line_items(self, campaign):
         """
@@ -292,7 +348,7 @@ class DFPInterface(AbstractInterface):
                 )
             )
 
-        return transform_creative_from_dfp(creatives[0])
+        return self._transform(transform_creative_from_dfp, creatives[:1])[0]
 
     def get_creatives(self,
                       order=DFP_QUERY_DEFAULTS['order'],
@@ -319,12 +375,7 @@ class DFPInterface(AbstractInterface):
         )
         results = self._convert_response_to_dict(dfp_creatives)
 
-        creatives = []
-        for creative in results:
-            creatives.append(
-                transform_creative_from_dfp(creative)
-            )
-        return creatives
+        return self._transform(transform_creative_from_dfp, results)
 
     def get_line_item_creatives(self, line_item):
         """
@@ -350,29 +401,31 @@ class DFPInterface(AbstractInterface):
         )
         return creatives
 
-    def get_geography_targets(self):
+    def get_geography_table(self):
         """
-        Get a list of DFP geography ids
+        Get the geographies of DFP, streamed from the PQL service on
+        first use and then shared with the interfaces of other networks
 
-        @return: list(dict)
+        @return: GeographyTable
         """
-        geo_list = self.dfp_client.get_geography_targets()
+        return self.geography_cache.get(
+            self.dfp_client.version,
+            lambda: GeographyTable.from_rows(
+                self.dfp_client.get_geography_targets()
+            ),
+        )
 
-        # The type field is in all caps, we want to
-        # lower case this to be consistent with other systems
-        output_list = []
-        for item in geo_list:
-            # Convert to Geography Target objects
-            geo = Geography(
-                id=item['id'],
-                parent_id=item['countrycode'],
-                type=item['type'].lower(),
-                name=item['name'],
-                external_name=quote(item['name'], ''),
-            )
-            output_list.append(geo)
+    def get_geography_targets(self, types=None):
+        """
+        Get the hierarchy of DFP geographies, from countries down to
+        postal codes. The parent of a geography is the closest of its
+        ancestors, e.g. the state of a city, None for countries.
 
-        return output_list
+        @param types: list(str)|None, only return geographies of these
+            types, e.g. ['country']
+        @return: list(Geography), with lower cased types
+        """
+        return self.get_geography_table().get_geographies(types)
 
     def get_adunit_targets(self):
         """
@@ -380,16 +433,19 @@ class DFPInterface(AbstractInterface):
 
         @return: list(dict)
         """
-        adunit_list = self.dfp_client.get_adunit_targets()
+        adunit_rows = self.dfp_client.get_adunit_targets()
 
         output_list = []
-        for item in adunit_list:
-            # Convert to Geography Target objects
+        for row in adunit_rows:
+            # Convert to AdUnit Target objects
             adunit = AdUnit(
-                id=item['id'],
-                parent_id=item['parentid'],
-                name=item['name'],
-                external_name=item['id'],
+                id=unicode(row.id),
+                parent_id=(
+                    unicode(row.parent_id) if row.parent_id is not None
+                    else None
+                ),
+                name=row.name,
+                external_name=unicode(row.id),
             )
             output_list.append(adunit)
 
@@ -536,8 +592,7 @@ class DFPInterface(AbstractInterface):
         @param line_items: L{parselmouth.delivery.LineItem}
         """
         # Convert line items into native format for the dfp client to use
-        native_line_items = [
-            transform_line_item_to_dfp(line_item)
-            for line_item in line_items
-        ]
+        native_line_items = self._transform(
+            transform_line_item_to_dfp, line_items,
+        )
         self.dfp_client.update_line_items(native_line_items)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" DFP PQL Tables
+
+Typed rows of the results of PQL queries. Result sets streamed from
+PublisherQueryLanguageService.select are made of PQL Value objects,
+converted with parse_pql_value. Rows are converted to compact named
+tuples, or to a list of values per column, with fields named after the
+columns in snake case, e.g. `StartDateTime` -> `start_date_time`.
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import re
+from collections import namedtuple
+from datetime import date
+
+# Parselmouth Imports - Local DFP Adapter Imports
+from parselmouth.adapters.dfp.delivery_utils import dfp_date_to_datetime
+
+
+_ROW_TYPES = {}
+_FIRST_CAP_PATTERN = re.compile(r'(.)([A-Z][a-z]+)')
+_ALL_CAP_PATTERN = re.compile(r'([a-z0-9])([A-Z])')
+_SELECT_PATTERN = re.compile(
+    r'^\s*SELECT\s+(?P<columns>.*?)\s+FROM\s', re.IGNORECASE | re.DOTALL,
+)
+
+
+def get_field_name(column):
+    """
+    @param column: str, PQL column, e.g. 'StartDateTime'
+    @return: str, e.g. 'start_date_time'
+    """
+    name = _FIRST_CAP_PATTERN.sub(r'\1_\2', column)
+    return _ALL_CAP_PATTERN.sub(r'\1_\2', name).lower()
+
+
+def get_query_columns(pql_query):
+    """
+    @param pql_query: str, e.g. 'SELECT Id, ParentId FROM Ad_Unit'
+    @return: list(str)|None, columns selected, e.g. ['Id', 'ParentId']
+    """
+    match = _SELECT_PATTERN.match(pql_query)
+    if not match:
+        return None
+    return [column.strip() for column in match.group('columns').split(',')]
+
+
+def _get_value_type(value):
+    """
+    @param value: SUDS object|dict, PQL Value
+    @return: str, e.g. 'TextValue'
+    """
+    if isinstance(value, dict):
+        return value.get('xsi_type')
+    return value.__class__.__name__
+
+
+def parse_pql_value(value):
+    """
+    @param value: SUDS object|dict, PQL Value of a result set, e.g.
+        NumberValue
+    @return: object|None, e.g. int
+    """
+    value_type = _get_value_type(value)
+    if value_type == 'SetValue':
+        if 'values' not in value:
+            return []
+        return [parse_pql_value(item) for item in value['values']]
+    if 'value' not in value or value['value'] is None:
+        return None
+
+    field = value['value']
+    if value_type == 'NumberValue':
+        field = unicode(field)
+        return float(field) if '.' in field else int(field)
+    if value_type == 'BooleanValue':
+        if isinstance(field, basestring):
+            return field.lower() == 'true'
+        return bool(field)
+    if value_type == 'DateTimeValue':
+        dt = dfp_date_to_datetime(field)
+        # Localized, so that the offset is the one of the date rather
+        # than the first one of the pytz timezone
+        return dt.tzinfo.localize(dt.replace(tzinfo=None))
+    if value_type == 'DateValue':
+        return date(
+            int(field['year']), int(field['month']), int(field['day']),
+        )
+    if isinstance(field, bytes):
+        return field.decode('utf-8')
+    return field
+
+
+def get_row_type(columns):
+    """
+    @param columns: list(str), PQL columns
+    @return: class, named tuple with a field per column
+    """
+    fields = tuple(get_field_name(column) for column in columns)
+    row_type = _ROW_TYPES.get(fields)
+    if row_type is None:
+        row_type = _ROW_TYPES[fields] = namedtuple('PQLRow', fields)
+    return row_type
+
+
+def to_columns(rows, columns):
+    """
+    @param rows: iterable(namedtuple), e.g. DFPClient.iter_pql_rows
+    @param columns: list(str), PQL columns of the rows
+    @return: dict, field name -> list of the values of the column
+    """
+    fields = [get_field_name(column) for column in columns]
+    values = [[] for _ in fields]
+    for row in rows:
+        for column_values, value in zip(values, row):
+            column_values.append(value)
+    return dict(zip(fields, values))
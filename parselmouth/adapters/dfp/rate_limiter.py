@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" DFP Rate Limiter
+
+DFP enforces request quotas per network and fails requests over quota
+with QuotaError.EXCEEDED_QUOTA. Requests to a DFP network go through an
+AdaptiveLimiter, which bounds their rate with a token
+bucket and their concurrency with an AIMD (additive increase,
+multiplicative decrease) limit: each success raises the limit a little,
+and a quota error halves it and pauses requests before they are retried.
+
+Limiters are shared by every client of a network in the process through
+a RateLimiterRegistry.
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import logging
+import threading
+import time
+
+# Parselmouth Imports - Local DFP Adapter Imports
+from parselmouth.adapters.dfp.constants import DFP_MAX_CONCURRENCY
+from parselmouth.adapters.dfp.constants import DFP_QUOTA_BACKOFF
+from parselmouth.adapters.dfp.constants import DFP_QUOTA_ERRORS
+from parselmouth.adapters.dfp.constants import DFP_QUOTA_RETRIES
+from parselmouth.adapters.dfp.constants import DFP_RATE_LIMIT
+
+
+def get_error_message(error):
+    """
+    @param error: Exception
+    @return: unicode
+    """
+    try:
+        return unicode(error)
+    except UnicodeError:
+        return repr(error)
+
+
+def is_quota_error(error):
+    """
+    @param error: Exception
+    @return: bool, True if the error was raised because the network
+        exceeded its DFP request quota
+    """
+    message = get_error_message(error)
+    return any(reason in message for reason in DFP_QUOTA_ERRORS)
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket allowing `rate` requests per second on
+    average, in bursts of up to `capacity` requests
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.time):
+        """
+        @param rate: float, number of tokens added per second
+        @param capacity: float|None, maximum number of tokens, defaults
+            to one second worth of tokens
+        @param clock: function() -> float, current time in seconds
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(rate, 1))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def reserve(self):
+        """
+        Take a token from the bucket. The bucket may go in debt, in which
+        case the caller must wait for the token to be added before using
+        it.
+
+        @return: float, number of seconds to wait before using the token
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate,
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self.rate
+
+
+class AdaptiveLimiter(object):
+    """
+    Rate and concurrency limiter for the requests to a DFP network, or
+    to a service of a network with settings of its own
+    """
+
+    def __init__(self,
+                 rate=DFP_RATE_LIMIT,
+                 max_concurrency=DFP_MAX_CONCURRENCY,
+                 min_concurrency=1,
+                 backoff=DFP_QUOTA_BACKOFF,
+                 max_retries=DFP_QUOTA_RETRIES,
+                 clock=time.time,
+                 sleep=time.sleep):
+        """
+        @param rate: float, maximum number of requests per second
+        @param max_concurrency: int, maximum number of concurrent requests
+        @param min_concurrency: int, lowest the concurrency limit is
+            decreased to on quota errors
+        @param backoff: float, number of seconds requests are paused
+            after a quota error, doubled on consecutive quota errors
+        @param max_retries: int, number of times a request failing with
+            a quota error is retried
+        @param clock: function() -> float, current time in seconds
+        @param sleep: function(float), wait for a number of seconds
+        """
+        self.bucket = TokenBucket(rate, clock=clock)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.backoff = backoff
+        self.max_retries = max_retries
+        self._clock = clock
+        self._sleep = sleep
+
+        self._condition = threading.Condition()
+        # Current concurrency limit, float so that it grows by fractions
+        self.concurrency = float(max_concurrency)
+        self._in_flight = 0
+        self._paused_until = 0
+        self._consecutive_errors = 0
+        self.quota_errors = 0
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "rate={rate},"
+                "concurrency={concurrency}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            rate=self.bucket.rate,
+            concurrency=int(self.concurrency),
+        )
+
+    def acquire(self):
+        """
+        Block until a request is allowed. Must be followed by release.
+        """
+        with self._condition:
+            while self._in_flight >= int(self.concurrency):
+                self._condition.wait()
+            self._in_flight += 1
+
+        while True:
+            with self._condition:
+                delay = self._paused_until - self._clock()
+            if delay <= 0:
+                break
+            self._sleep(delay)
+
+        delay = self.bucket.reserve()
+        if delay > 0:
+            self._sleep(delay)
+
+    def release(self):
+        """
+        Mark a request allowed by acquire as done
+        """
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        """
+        Additively increase the concurrency limit, by one for every
+        `concurrency` successful requests
+        """
+        with self._condition:
+            self._consecutive_errors = 0
+            self.concurrency = min(
+                self.max_concurrency,
+                self.concurrency + 1 / self.concurrency,
+            )
+            self._condition.notify_all()
+
+    def on_quota_exceeded(self):
+        """
+        Halve the concurrency limit and pause requests. Errors of
+        requests which were in flight before the pause only count once.
+        """
+        with self._condition:
+            self.quota_errors += 1
+            now = self._clock()
+            if now < self._paused_until:
+                return
+            self._consecutive_errors += 1
+            self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+            self._paused_until = now + \
+                self.backoff * 2 ** (self._consecutive_errors - 1)
+            logging.warning(
+                "DFP quota exceeded, pausing requests for %.1fs and "
+                "limiting concurrency to %d",
+                self._paused_until - now,
+                int(self.concurrency),
+            )
+
+    def call(self, function, *args, **kwargs):
+        """
+        Call a function making a DFP request within the limits, retrying
+        it when it fails with a quota error
+
+        @param function: function
+        @return: result of the function
+        """
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                if not is_quota_error(e):
+                    raise
+                self.on_quota_exceeded()
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+            else:
+                self.on_success()
+                return result
+            finally:
+                self.release()
+
+
+class RateLimitedService(object):
+    """
+    Wraps a googleads service so that its methods are called through an
+    AdaptiveLimiter
+    """
+
+    def __init__(self, service, limiter):
+        """
+        @param service: SUDS service
+        @param limiter: AdaptiveLimiter
+        """
+        self.service = service
+        self.limiter = limiter
+
+    def __getattr__(self, name):
+        attribute = getattr(self.service, name)
+        if not callable(attribute):
+            return attribute
+
+        def limited(*args, **kwargs):
+            return self.limiter.call(attribute, *args, **kwargs)
+        return limited
+
+
+class RateLimiterRegistry(object):
+    """
+    Thread-safe registry of the AdaptiveLimiters of each network. All
+    the services of a network share its limiter, since DFP quotas are
+    per network, except for services configured with settings of their
+    own, e.g. with a lower rate, which have a limiter per network.
+    Limiter settings can be configured for all networks, a network, a
+    service, or a service of a network.
+
+    Example:
+        RATE_LIMITERS.configure(network_code='1234', rate=4)
+        RATE_LIMITERS.configure(service_name='ForecastService', rate=1)
+    """
+
+    def __init__(self, **default_settings):
+        """
+        @param default_settings: dict, keyword arguments of the
+            AdaptiveLimiters of all networks and services
+        """
+        self._lock = threading.Lock()
+        # (network code|None, service name|None) -> dict of settings
+        self._settings = {(None, None): default_settings}
+        # (network code, service name|None) -> AdaptiveLimiter
+        self._limiters = {}
+
+    def configure(self, network_code=None, service_name=None, **settings):
+        """
+        Set the AdaptiveLimiter settings of a network and/or service.
+        Limiters which were already created are replaced.
+
+        @param network_code: str|None, None to configure all networks
+        @param service_name: str|None, None to configure all services
+        @param settings: dict, keyword arguments of AdaptiveLimiter
+        """
+        with self._lock:
+            key = (network_code, service_name)
+            self._settings[key] = dict(self._settings.get(key, {}), **settings)
+            self._limiters = {}
+
+    def _get_settings(self, network_code, service_name):
+        """
+        @param network_code: str
+        @param service_name: str
+        @return: dict, settings with the most specific taking precedence
+        """
+        settings = {}
+        for key in [
+            (None, None),
+            (None, service_name),
+            (network_code, None),
+            (network_code, service_name),
+        ]:
+            settings.update(self._settings.get(key, {}))
+        return settings
+
+    def get_limiter(self, network_code, service_name):
+        """
+        @param network_code: str
+        @param service_name: str, e.g. 'LineItemService'
+        @return: AdaptiveLimiter, the network's, or the service's if it
+            has settings of its own
+        """
+        with self._lock:
+            if (None, service_name) in self._settings \
+                    or (network_code, service_name) in self._settings:
+                key = (network_code, service_name)
+            else:
+                key = (network_code, None)
+            if key not in self._limiters:
+                self._limiters[key] = AdaptiveLimiter(
+                    **self._get_settings(network_code, service_name)
+                )
+            return self._limiters[key]
+
+
+RATE_LIMITERS = RateLimiterRegistry()
+"""
+RateLimiterRegistry, limiters shared by all DFP clients of the process
+"""
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" DFP Service Pool
+
+Building a googleads service parses its WSDL and creates a SUDS client,
+which is slow. The ServicePool keeps built services around so that each
+one is only built once per client and API version. SUDS clients are not
+thread-safe, so an instance is only handed to one caller at a time and
+concurrent callers get instances of their own.
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class ServicePool(object):
+    """
+    Thread-safe pool of googleads service instances
+    """
+
+    def __init__(self, service_factory):
+        """
+        @param service_factory: function(str, str), builds a service
+            given its name and API version,
+            e.g. googleads.DfpClient.GetService
+        """
+        self._service_factory = service_factory
+        self._lock = threading.Lock()
+        # (service name, version) -> list of idle service instances
+        self._idle = defaultdict(list)
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "hits={hits},"
+                "misses={misses}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            hits=self.hits,
+            misses=self.misses,
+        )
+
+    def acquire(self, service_name, version):
+        """
+        Take a service instance out of the pool, building it if no idle
+        instance is available. Instances must be given back with
+        release.
+
+        @param service_name: str, e.g. 'LineItemService'
+        @param version: str
+        @return: SUDS service
+        """
+        key = (service_name, version)
+        with self._lock:
+            if self._idle[key]:
+                self.hits += 1
+                return self._idle[key].pop()
+            self.misses += 1
+
+        # Build outside of the lock, this is the slow part
+        return self._service_factory(service_name, version)
+
+    def release(self, service_name, version, service):
+        """
+        Give a service instance back to the pool
+
+        @param service_name: str
+        @param version: str
+        @param service: SUDS service, from acquire
+        """
+        with self._lock:
+            self._idle[(service_name, version)].append(service)
+
+    @contextmanager
+    def get_service(self, service_name, version):
+        """
+        Context manager lending a service instance for the duration of
+        the block
+
+        @param service_name: str
+        @param version: str
+        @return: SUDS service
+        """
+        service = self.acquire(service_name, version)
+        try:
+            yield service
+        finally:
+            self.release(service_name, version, service)
+
+    def get_stats(self):
+        """
+        @return: dict, pool hit and miss counts, and number of idle
+            instances of each service
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'idle': dict(
+                    (name, len(services))
+                    for (name, _), services in self._idle.items()
+                ),
+            }
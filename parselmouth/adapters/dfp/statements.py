@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" DFP Statements
+
+PQL statements used by DFPClient to page through the results of a
+get*ByStatement query, in addition to googleads' FilterStatement which
+pages with OFFSET.
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Third Party Library Imports
+from googleads.dfp import SUGGESTED_PAGE_LIMIT
+
+
+class KeysetStatement(object):
+    """
+    Statement paging through results ordered by id, selecting the
+    results with an id greater than the last one of the previous page,
+    e.g. `WHERE status = 'READY' AND id > :lastId ORDER BY id LIMIT 500`.
+    Has the interface of a FilterStatement, and is resumed from a page
+    by setting last_id rather than offset.
+    """
+
+    def __init__(self,
+                 conditions=None,
+                 values=None,
+                 limit=SUGGESTED_PAGE_LIMIT,
+                 last_id=None):
+        """
+        @param conditions: list(str)|None, PQL conditions the results
+            must all match, e.g. ["status = 'READY'"]
+        @param values: list(dict)|None, bind values of the conditions
+        @param limit: int, number of results in a page
+        @param last_id: int|None, id of the last result of the previous
+            page, None to start from the first page
+        """
+        self.conditions = conditions or []
+        self.values = values
+        self.limit = limit
+        self.last_id = last_id
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "conditions={conditions},"
+                "limit={limit},"
+                "last_id={last_id}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            conditions=self.conditions,
+            limit=self.limit,
+            last_id=self.last_id,
+        )
+
+    def advance(self, page):
+        """
+        Move the statement to the page following the given one
+
+        @param page: list(SUDS envelope), results of the statement
+        """
+        if page:
+            self.last_id = page[-1]['id']
+
+    def ToStatement(self):
+        """
+        @return: dict, the statement in the format DFP requires
+        """
+        conditions = list(self.conditions)
+        values = list(self.values or [])
+        if self.last_id is not None:
+            conditions.append('id > :lastId')
+            values.append({
+                'key': 'lastId',
+                'value': {
+                    'xsi_type': 'NumberValue',
+                    'value': self.last_id,
+                },
+            })
+
+        query = 'ORDER BY id LIMIT {0:d}'.format(self.limit)
+        if conditions:
+            query = 'WHERE {0} {1}'.format(' AND '.join(conditions), query)
+        return {'query': query, 'values': values or None}
@@ -0,0 +1,328 @@
+import socket
+import unittest
+from datetime import datetime
+
+import pytz
+
+from parselmouth.adapters.dfp.client import DFPClient
+from parselmouth.adapters.dfp.constants import DFP_PAGINATION_MODES
+from parselmouth.adapters.dfp.statements import KeysetStatement
+from parselmouth.adapters.dfp.utils import is_retryable_error
+from parselmouth.exceptions import ParselmouthException
+from parselmouth.exceptions import ParselmouthNetworkError
+from parselmouth.exceptions import ParselmouthTimeout
+from parselmouth.metrics import InMemoryCollector
+from parselmouth.metrics import MetricsRegistry
+from parselmouth.retry import RetryPolicy
+from parselmouth.utils.timeout import Timeout
+
+
+class FakeSudsOptions(object):
+
+    def __init__(self):
+        self.plugins = []
+
+
+class FakeSudsContext(object):
+
+    def __init__(self, envelope=None, reply=None):
+        self.envelope = envelope
+        self.reply = reply
+
+
+class FakeSudsClient(object):
+
+    def __init__(self):
+        self.timeouts = []
+        self.options = FakeSudsOptions()
+
+    def set_options(self, timeout=None, plugins=None):
+        if timeout is not None:
+            self.timeouts.append(timeout)
+        if plugins is not None:
+            self.options.plugins = plugins
+
+    def send(self, envelope, reply):
+        for plugin in self.options.plugins:
+            plugin.sending(FakeSudsContext(envelope=envelope))
+            plugin.received(FakeSudsContext(reply=reply))
+
+
+class FakeLineItemService(object):
+
+    def __init__(self, pages, errors=None, update_errors=None):
+        self.suds_client = FakeSudsClient()
+        self.pages = pages
+        self.errors = errors or {}
+        self.update_errors = list(update_errors or [])
+        self.updates = 0
+        self.statements = []
+        self.page = 0
+
+    def getLineItemsByStatement(self, statement):
+        self.statements.append(statement)
+        self.suds_client.send(b'request', b'response')
+        if len(self.statements) in self.errors:
+            raise self.errors[len(self.statements)]
+        self.page += 1
+        if self.page <= self.pages:
+            return {'results': [{'id': self.page}]}
+        return {}
+
+    def updateLineItems(self, line_items):
+        self.updates += 1
+        if self.update_errors:
+            raise self.update_errors.pop(0)
+        return line_items
+
+
+class FakeNativeClient(object):
+
+    def __init__(self, errors=None, update_errors=None):
+        self.errors = errors
+        self.update_errors = update_errors
+        self.services = []
+
+    def GetService(self, name, version):
+        service = FakeLineItemService(
+            pages=2, errors=self.errors, update_errors=self.update_errors,
+        )
+        self.services.append((name, version, service))
+        return service
+
+
+class DFPClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = DFPClient(
+            'client_id',
+            'client_secret',
+            'refresh_token',
+            'application_name',
+            'network_code',
+        )
+
+    def test_format_query(self):
+        statement = self.client._format_query(order=None, id=1)
+        self.assertEqual(statement.ToStatement()['query'], 'WHERE id=1  LIMIT 500 OFFSET 0')
+
+        statement = self.client._format_query(order=None, id=[1, 2])
+        self.assertEqual(statement.ToStatement()['query'], 'WHERE id IN (1, 2)  LIMIT 500 OFFSET 0')
+
+    def test_format_query_operators(self):
+        statement = self.client._format_query(
+            order=None,
+            lastModifiedDateTime__gt=datetime(2015, 1, 2, 3, 4, 5),
+        )
+        self.assertEqual(
+            statement.ToStatement()['query'],
+            "WHERE lastModifiedDateTime > '2015-01-02T03:04:05'  LIMIT 500 OFFSET 0",
+        )
+
+        # Aware datetimes are compared in the timezone of the network
+        self.client._network_timezone = pytz.timezone('America/New_York')
+        statement = self.client._format_query(
+            order=None,
+            lastModifiedDateTime__gt=pytz.timezone('Europe/Paris').localize(
+                datetime(2015, 7, 2, 3, 4, 5),
+            ),
+        )
+        self.assertEqual(
+            statement.ToStatement()['query'],
+            "WHERE lastModifiedDateTime > '2015-07-01T21:04:05'  LIMIT 500 OFFSET 0",
+        )
+
+        statement = self.client._format_query(order=None, id__lte=10)
+        self.assertEqual(statement.ToStatement()['query'], 'WHERE id <= 10  LIMIT 500 OFFSET 0')
+
+        with self.assertRaises(ParselmouthException):
+            self.client._format_query(id__like=1)
+        with self.assertRaises(ParselmouthException):
+            self.client._format_query(id__gt=[1, 2])
+
+    def test_format_keyset_query(self):
+        statement = self.client._format_query(status='READY', id__gte=10)
+        self.assertIsInstance(statement, KeysetStatement)
+        self.assertEqual(
+            statement.ToStatement(),
+            {'query': 'WHERE status=READY AND id >= 10 ORDER BY id LIMIT 500',
+             'values': None},
+        )
+
+        statement.advance([{'id': 12}, {'id': 15}])
+        self.assertEqual(
+            statement.ToStatement(),
+            {'query': 'WHERE status=READY AND id >= 10 AND id > :lastId '
+                      'ORDER BY id LIMIT 500',
+             'values': [{'key': 'lastId', 'value': {
+                 'xsi_type': 'NumberValue', 'value': 15,
+             }}]},
+        )
+
+        # Queries for a page, or in another order, page with offset
+        for kwargs in [{'limit': 10}, {'offset': 500}, {'order': 'name'}]:
+            self.assertNotIsInstance(
+                self.client._format_query(**kwargs), KeysetStatement,
+            )
+        self.client.pagination = DFP_PAGINATION_MODES.offset
+        self.assertNotIsInstance(self.client._format_query(), KeysetStatement)
+
+    def test_format_queries(self):
+        self.client.max_in_list_size = 2
+        self.assertEqual(
+            [
+                statement.ToStatement()['query']
+                for statement in self.client._format_queries(
+                    order=None, id=[1, 2, 3],
+                )
+            ],
+            [
+                'WHERE id IN (1, 2)  LIMIT 500 OFFSET 0',
+                'WHERE id IN (3)  LIMIT 500 OFFSET 0',
+            ],
+        )
+        self.assertEqual(
+            len(self.client._format_queries(id=[1, 2, 3], orderId=[4, 5, 6])), 4,
+        )
+        with self.assertRaises(ParselmouthException):
+            self.client._format_queries(offset=500, id=[1, 2, 3])
+
+    def test_service_reuse(self):
+        self.client.native_dfp_client = FakeNativeClient()
+
+        self.assertEqual(self.client.get_line_items(limit=None), [{'id': 1}, {'id': 2}])
+        self.client.get_line_items(limit=None)
+        self.client.update_line_items([])
+        # The service is only built once
+        self.assertEqual(len(self.client.native_dfp_client.services), 1)
+        self.assertEqual(self.client.service_pool.hits, 2)
+        self.assertEqual(self.client.service_pool.misses, 1)
+
+    def test_paged_query_retries(self):
+        self.client.pagination = DFP_PAGINATION_MODES.offset
+        self.client.native_dfp_client = FakeNativeClient(errors={
+            2: socket.error('connection reset'),
+            3: Exception('[ServerError.SERVER_BUSY @ ]'),
+        })
+        self.client.retry_policy = RetryPolicy(
+            sleep=lambda seconds: None,
+            is_retryable=is_retryable_error,
+        )
+
+        self.assertEqual(self.client.get_line_items(limit=None), [{'id': 1}, {'id': 2}])
+        service = self.client.native_dfp_client.services[0][2]
+        # The failed page is retried from its offset
+        self.assertEqual(
+            [statement['query'].split()[-1] for statement in service.statements],
+            ['0', '500', '500', '500', '1000'],
+        )
+
+        self.client.native_dfp_client = FakeNativeClient(errors={
+            1: Exception('[AuthenticationError.NETWORK_NOT_FOUND @ ]'),
+        })
+        self.client.service_pool._idle.clear()
+        with self.assertRaises(ParselmouthException):
+            self.client.get_line_items(limit=None)
+        self.assertEqual(
+            len(self.client.native_dfp_client.services[0][2].statements), 1,
+        )
+
+    def test_network_errors(self):
+        self.client.native_dfp_client = FakeNativeClient(errors={
+            1: socket.error('connection reset'),
+            2: socket.error('connection reset'),
+            3: socket.error('connection reset'),
+        })
+        self.client.retry_policy = RetryPolicy(
+            sleep=lambda seconds: None,
+            is_retryable=is_retryable_error,
+        )
+        # Transport errors are told apart from the errors of DFP once
+        # the retries are exhausted
+        with self.assertRaises(ParselmouthNetworkError):
+            self.client.get_line_items(limit=None)
+
+        self.client.native_dfp_client = FakeNativeClient(errors={
+            1: ParselmouthTimeout('deadline'),
+        })
+        self.client.retry_policy = RetryPolicy(max_attempts=1)
+        self.client.service_pool._idle.clear()
+        with self.assertRaises(ParselmouthTimeout):
+            self.client.get_line_items(limit=None)
+
+    def test_keyset_paged_query_retries(self):
+        self.client.native_dfp_client = FakeNativeClient(errors={
+            2: socket.error('connection reset'),
+        })
+        self.client.retry_policy = RetryPolicy(
+            sleep=lambda seconds: None,
+            is_retryable=is_retryable_error,
+        )
+
+        self.assertEqual(self.client.get_line_items(limit=None), [{'id': 1}, {'id': 2}])
+        service = self.client.native_dfp_client.services[0][2]
+        # The failed page is retried from the last id of the previous page
+        self.assertEqual(
+            [
+                [value['value']['value'] for value in statement['values'] or []]
+                for statement in service.statements
+            ],
+            [[], [1], [1], [2]],
+        )
+
+    def test_mutations_not_retried(self):
+        self.client.retry_policy = RetryPolicy(
+            is_retryable=is_retryable_error, sleep=lambda seconds: None,
+        )
+        self.client.native_dfp_client = FakeNativeClient(
+            update_errors=[socket.error('reset')],
+        )
+        with self.assertRaises(ParselmouthNetworkError):
+            self.client.update_line_items([])
+        service = self.client.native_dfp_client.services[0][2]
+        self.assertEqual(service.updates, 1)
+
+        # Unless opted in
+        self.client.retry_mutations = True
+        service.update_errors = [socket.error('reset')]
+        self.client.update_line_items([])
+        self.assertEqual(service.updates, 3)
+
+    def test_request_deadlines(self):
+        self.client.native_dfp_client = FakeNativeClient()
+        self.client.update_line_items([])
+        with Timeout(30):
+            self.client.update_line_items([])
+
+        timeouts = self.client.native_dfp_client.services[0][2].suds_client.timeouts
+        self.assertEqual(timeouts[0], self.client.request_timeout)
+        self.assertLessEqual(timeouts[1], 30)
+        self.assertGreater(timeouts[1], 29)
+
+    def test_metrics(self):
+        collector = InMemoryCollector()
+        self.client.metrics = MetricsRegistry()
+        self.client.metrics.add_listener(collector)
+        self.client.native_dfp_client = FakeNativeClient(errors={
+            2: socket.error('connection reset'),
+        })
+        self.client.retry_policy = RetryPolicy(
+            sleep=lambda seconds: None,
+            is_retryable=is_retryable_error,
+            metrics=self.client.metrics,
+        )
+
+        self.client.get_line_items(limit=None)
+        tags = {'service': 'LineItemService', 'method': 'getLineItemsByStatement'}
+        self.assertEqual(collector.get_histogram('dfp.request', **tags).count, 4)
+        self.assertEqual(collector.get_count('dfp.request.errors', **tags), 1)
+        self.assertEqual(collector.get_count('dfp.pages', **tags), 2)
+        self.assertEqual(collector.get_count('dfp.records', **tags), 2)
+        self.assertEqual(collector.get_count('dfp.bytes', **tags), 4 * 15)
+        self.assertEqual(
+            collector.get_count('retries', error='error', **tags), 1,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
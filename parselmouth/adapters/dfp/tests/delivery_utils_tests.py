@@ -1,6 +1,8 @@
+import pickle
 import unittest
 from datetime import datetime
 from pytz import timezone
+from suds.sudsobject import Factory
 
 from parselmouth.delivery import Cost
 from parselmouth.delivery import Creative
@@ -22,6 +24,7 @@ from parselmouth.adapters.dfp.delivery_utils import transform_line_item_to_dfp
 from parselmouth.adapters.dfp.delivery_utils import transform_forecast_line_item_to_dfp
 from parselmouth.adapters.dfp.delivery_utils import transform_creative_to_dfp
 from parselmouth.adapters.dfp.delivery_utils import transform_creative_from_dfp
+from parselmouth.adapters.dfp.utils import recursive_asdict
 
 
 TEST_LINE_ITEM = LineItem(
@@ -365,6 +368,83 @@ class DeliveryUtilsTest(unittest.TestCase):
             transform_line_item_from_dfp(transform_line_item_to_dfp(TEST_LINE_ITEM)),
         )
 
+        # Targeting is decoded on first access
+        line_item = pickle.loads(pickle.dumps(
+            transform_line_item_from_dfp(dfp_line_item),
+        ))
+        self.assertEqual(
+            line_item.get_raw_targeting(), dfp_line_item['targeting'],
+        )
+        self.assertEqual(line_item.targeting, TEST_LINE_ITEM.targeting)
+        self.assertIsNone(line_item.get_raw_targeting())
+        line_item.targeting.inventory = TargetingCriterion(
+            AdUnit(id='other', include_descendants=False),
+        )
+        self.assertEqual(
+            transform_line_item_to_dfp(line_item)['targeting'],
+            {
+                'inventoryTargeting': {
+                    'targetedAdUnits': [{
+                        'adUnitId': 'other',
+                        'includeDescendants': False,
+                    }],
+                },
+            },
+        )
+
+    def test_line_item_custom_targeting_round_trip(self):
+        self.maxDiff = None
+        # As read from DFP: abstract nodes have a *.Type attribute rather
+        # than an xsi_type
+        suds_targeting = Factory.object('Targeting', {
+            'inventoryTargeting': Factory.object('InventoryTargeting', {
+                'targetedAdUnits': [Factory.object('AdUnitTargeting', {
+                    'adUnitId': 'adunit',
+                    'includeDescendants': True,
+                })],
+            }),
+            'customTargeting': Factory.object('CustomCriteriaSet', {
+                'CustomCriteriaNode.Type': 'CustomCriteriaSet',
+                'logicalOperator': 'OR',
+                'children': [Factory.object('CustomCriteriaSet', {
+                    'CustomCriteriaNode.Type': 'CustomCriteriaSet',
+                    'logicalOperator': 'AND',
+                    'children': [Factory.object('CustomCriteria', {
+                        'CustomCriteriaNode.Type': 'CustomCriteria',
+                        'CustomCriteriaLeaf.Type': 'CustomCriteria',
+                        'keyId': 1,
+                        'valueIds': [10, 11],
+                        'operator': 'IS',
+                    })],
+                })],
+            }),
+        })
+        dfp_line_item = dict(
+            transform_line_item_to_dfp(TEST_LINE_ITEM),
+            targeting=recursive_asdict(suds_targeting),
+        )
+
+        # Targeting which was never read is encoded again
+        dfp_targeting = transform_line_item_to_dfp(
+            transform_line_item_from_dfp(dfp_line_item),
+        )['targeting']
+        # Nodes are typed with xsi_type, and the redundant single child
+        # set is flattened
+        self.assertEqual(dfp_targeting['customTargeting'], {
+            'xsi_type': 'CustomCriteriaSet',
+            'logicalOperator': 'OR',
+            'children': [{
+                'xsi_type': 'CustomCriteria',
+                'keyId': '1',
+                'valueIds': ['10', '11'],
+                'operator': 'IS',
+            }],
+        })
+        self.assertEqual(
+            dfp_targeting['inventoryTargeting'],
+            transform_line_item_to_dfp(TEST_LINE_ITEM)['targeting']['inventoryTargeting'],
+        )
+
     def test_line_item_forecast_utils(self):
         dfp_no_start_no_id = {
             'costType': 'CPM',
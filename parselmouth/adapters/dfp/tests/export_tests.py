@@ -0,0 +1,137 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from parselmouth.adapters.dfp.client import DFPClient
+from parselmouth.adapters.dfp.export import ExportFormats
+from parselmouth.adapters.dfp.export import NetworkExport
+from parselmouth.adapters.dfp.export import get_export_path
+from parselmouth.adapters.dfp.export import read_export
+from parselmouth.adapters.dfp.rate_limiter import RateLimiterRegistry
+from parselmouth.exceptions import ParselmouthException
+
+
+RECORD_COUNTS = {
+    'getOrdersByStatement': 1200,
+    'getLineItemsByStatement': 700,
+    'getCustomTargetingKeysByStatement': 3,
+    'getCustomTargetingValuesByStatement': 10,
+}
+
+
+class Crash(Exception):
+    pass
+
+
+class FakeService(object):
+
+    suds_client = None
+
+    def __init__(self, native_client):
+        self.native_client = native_client
+
+    def __getattr__(self, method_name):
+        def query(statement):
+            self.native_client.calls.append((method_name, statement['query']))
+            if len(self.native_client.calls) == self.native_client.crash_at:
+                raise Crash('crashed')
+            offset = int(statement['query'].split()[-1])
+            count = RECORD_COUNTS.get(method_name, 0)
+            records = [
+                {'id': i, 'name': 'record {0}'.format(i)}
+                for i in range(offset, min(offset + 500, count))
+            ]
+            return {'results': records} if records else {}
+        return query
+
+
+class FakeNativeClient(object):
+
+    def __init__(self, crash_at=None):
+        self.crash_at = crash_at
+        self.calls = []
+
+    def GetService(self, name, version):
+        return FakeService(self)
+
+
+class NetworkExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def _get_client(self, native_client):
+        client = DFPClient(
+            'client_id',
+            'client_secret',
+            'refresh_token',
+            'application_name',
+            'network_code',
+            rate_limiters=RateLimiterRegistry(rate=1000),
+        )
+        client.native_dfp_client = native_client
+        return client
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _read(self, name, output_format=ExportFormats.ndjson):
+        path = get_export_path(self.directory, name, output_format)
+        return list(read_export(path, output_format))
+
+    def test_export(self):
+        native_client = FakeNativeClient()
+        client = self._get_client(native_client)
+        counts = NetworkExport(client, self.directory, ExportFormats.pickle).run()
+        self.assertEqual(counts, {
+            'orders': 1200,
+            'line_items': 700,
+            'custom_targeting_keys': 3,
+            'custom_targeting_values': 10,
+        })
+        orders = self._read('orders', ExportFormats.pickle)
+        self.assertEqual([order['id'] for order in orders], range(1200))
+
+        # Values are queried by key
+        self.assertIn(
+            ('getCustomTargetingValuesByStatement',
+             'WHERE customTargetingKeyId IN (0, 1, 2) ORDER BY id LIMIT 500 OFFSET 0'),
+            native_client.calls,
+        )
+
+    def test_resume(self):
+        # Crash on the third page of orders
+        client = self._get_client(FakeNativeClient(crash_at=3))
+        self.assertRaises(ParselmouthException, NetworkExport(client, self.directory).run)
+        self.assertEqual(len(self._read('orders')), 1000)
+
+        # Simulate a page written after the last checkpoint
+        with open(get_export_path(self.directory, 'orders', 'ndjson'), 'ab') as f:
+            f.write(b'partial page')
+
+        native_client = FakeNativeClient()
+        client = self._get_client(native_client)
+        counts = NetworkExport(client, self.directory).run()
+        self.assertEqual(counts['orders'], 1200)
+        self.assertEqual(
+            native_client.calls[0],
+            ('getOrdersByStatement', 'ORDER BY id LIMIT 500 OFFSET 1000'),
+        )
+        orders = self._read('orders')
+        self.assertEqual([order['id'] for order in orders], range(1200))
+        self.assertEqual(orders[1]['name'], 'record 1')
+
+        # A finished export does nothing more
+        native_client = FakeNativeClient()
+        client = self._get_client(native_client)
+        self.assertEqual(NetworkExport(client, self.directory).run(), counts)
+        self.assertEqual(native_client.calls, [])
+
+        self.assertRaises(
+            ParselmouthException,
+            NetworkExport(client, self.directory, ExportFormats.pickle).run,
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,352 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from parselmouth.adapters.dfp.client import DFPClient
+from parselmouth.adapters.dfp.constants import DFP_PAGINATION_MODES
+from parselmouth.adapters.dfp.fake import FakeDFPBackend
+from parselmouth.adapters.dfp.fake import FakeDFPClient
+from parselmouth.adapters.dfp.fake import QUOTA_ERROR_MESSAGE
+from parselmouth.adapters.dfp.fake import RecordingDFPClient
+from parselmouth.adapters.dfp.fake import ReplayBackend
+from parselmouth.adapters.dfp.fake import SERVER_ERROR_MESSAGE
+from parselmouth.adapters.dfp.fake import select
+from parselmouth.adapters.dfp.geography import GeographyCache
+from parselmouth.adapters.dfp.interface import DFPInterface
+from parselmouth.adapters.dfp.rate_limiter import RateLimiterRegistry
+from parselmouth.adapters.dfp.utils import is_retryable_error
+from parselmouth.exceptions import ParselmouthException
+from parselmouth.exceptions import ParselmouthTimeout
+from parselmouth.retry import RetryPolicy
+from parselmouth.targeting import AdUnit
+from parselmouth.targeting import TargetingCriterion
+from parselmouth.utils.timeout import Timeout
+
+
+def get_fixtures():
+    return {
+        'line_items': [
+            {'id': i, 'orderId': i % 3, 'name': 'Line Item {0}'.format(i)}
+            for i in range(1, 1201)
+        ],
+        'custom_targeting_keys': [
+            {'id': 1, 'name': 'section', 'type': 'PREDEFINED'},
+            {'id': 2, 'name': 'author', 'type': 'FREEFORM'},
+        ],
+        'custom_targeting_values': [
+            {'id': 10, 'customTargetingKeyId': 1, 'name': 'sports'},
+            {'id': 11, 'customTargetingKeyId': 1, 'name': 'news'},
+            {'id': 20, 'customTargetingKeyId': 2, 'name': 'jane'},
+        ],
+        'geo_targets': [
+            {'id': 2840, 'name': 'United States', 'countryCode': 'US',
+             'type': 'COUNTRY', 'targetable': True},
+            {'id': 21137, 'name': 'California', 'countryCode': 'US',
+             'type': 'STATE', 'targetable': True, 'parentIds': [2840]},
+            {'id': 1014044, 'name': 'San Francisco', 'countryCode': 'US',
+             'type': 'CITY', 'targetable': True,
+             'parentIds': [2840, 21137]},
+        ],
+    }
+
+
+class FakeDFPTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0
+        self.sleeps = []
+        self.backend = FakeDFPBackend(get_fixtures())
+        self.native_client = FakeDFPClient(self.backend, sleep=self.sleep)
+        self.client = self._get_client(self.native_client)
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def _get_client(self, native_client):
+        return DFPClient(
+            'client_id',
+            'client_secret',
+            'refresh_token',
+            'application_name',
+            'network_code',
+            rate_limiters=RateLimiterRegistry(
+                sleep=self.sleep, clock=lambda: self.now,
+            ),
+            retry_policy=RetryPolicy(
+                sleep=self.sleep, is_retryable=is_retryable_error,
+            ),
+            native_client=native_client,
+        )
+
+    def test_select(self):
+        records = get_fixtures()['custom_targeting_values']
+        self.assertEqual(
+            select(records, "WHERE customTargetingKeyId IN (1, 3) "
+                            "ORDER BY name DESC LIMIT 1 OFFSET 1"),
+            ([records[1]], 2),
+        )
+        self.assertEqual(
+            select(
+                records,
+                'WHERE name = :name AND id >= 11',
+                [{'key': 'name', 'value': {'xsi_type': 'TextValue', 'value': 'Jane'}}],
+            ),
+            ([records[2]], 1),
+        )
+        self.assertEqual(select(records, "WHERE name LIKE 'sp%'")[1], 1)
+
+    def test_services(self):
+        line_items = self.client.get_line_items(limit=None, orderId=1)
+        self.assertEqual(len(line_items), 400)
+        self.assertEqual(line_items[-1]['id'], 1198)
+        self.assertEqual(
+            self.native_client.requests[
+                ('LineItemService', 'getLineItemsByStatement')
+            ],
+            # Pages are requested until one comes back empty
+            2,
+        )
+
+        custom_targets = self.client.get_custom_targets(key_name='section')
+        self.assertEqual(
+            [target['name'] for target in custom_targets],
+            ['section', 'sports', 'news'],
+        )
+
+        line_item = dict(line_items[0], name='Renamed')
+        self.client.update_line_items([line_item])
+        self.assertEqual(self.client.get_line_item(1)[0]['name'], 'Renamed')
+
+    def test_keyset_pagination(self):
+        line_items = self.client.get_line_items(limit=None, orderId=1)
+        self.client.pagination = DFP_PAGINATION_MODES.offset
+        self.assertEqual(
+            self.client.get_line_items(limit=None, orderId=1), line_items,
+        )
+
+        # Line items deleted mid-scan make offset paging skip others
+        records = self.backend.fixtures['line_items']
+        for pagination in DFP_PAGINATION_MODES:
+            self.client.pagination = pagination
+            self.backend.fixtures['line_items'] = list(records)
+            query = self.client._format_query(limit=None)
+            ids = []
+            for page in self.client.iter_pages(
+                    'LineItemService', 'getLineItemsByStatement', query):
+                if not ids:
+                    del self.backend.fixtures['line_items'][:100]
+                ids += [line_item['id'] for line_item in page]
+            self.assertEqual(len(set(ids)), len(ids))
+            self.assertEqual(
+                len(ids),
+                1200 if pagination == DFP_PAGINATION_MODES.keyset else 1100,
+            )
+
+    def test_long_in_lists(self):
+        self.client.max_in_list_size = 100
+        ids = range(1200, 0, -3) + range(1, 1200, 2)
+        line_items = self.client.get_line_items(limit=None, id=ids)
+        self.assertEqual(
+            [line_item['id'] for line_item in line_items],
+            sorted(set(ids) & set(range(1, 1201))),
+        )
+        # 1000 values in chunks of 100, each read in a page
+        self.assertEqual(
+            self.native_client.requests[
+                ('LineItemService', 'getLineItemsByStatement')
+            ],
+            10 * 2,
+        )
+
+        # The merged results of the chunks are limited too
+        line_items = self.client.get_line_items(limit=5, id=ids)
+        self.assertEqual(
+            [line_item['id'] for line_item in line_items],
+            sorted(set(ids) & set(range(1, 1201)))[:5],
+        )
+
+        self.client.max_in_list_size = 1
+        custom_targets = self.client.get_custom_targets()
+        self.assertEqual(
+            sorted(target['id'] for target in custom_targets),
+            [1, 2, 10, 11, 20],
+        )
+
+        self.native_client.inject_error(
+            '[AuthenticationError.NETWORK_NOT_FOUND @ ]', 'LineItemService',
+        )
+        with self.assertRaises(ParselmouthException):
+            self.client.get_line_items(limit=None, id=ids)
+
+    def test_pql_and_reports(self):
+        interface = DFPInterface(
+            'client_id',
+            'client_secret',
+            'refresh_token',
+            'application_name',
+            'network_code',
+            native_client=self.native_client,
+            geography_cache=GeographyCache(),
+        )
+        rows = self.client.iter_pql_rows(
+            'SELECT Id, OrderId FROM Line_Item WHERE OrderId = :orderId',
+            [{'key': 'orderId', 'value': {'xsi_type': 'NumberValue', 'value': 1}}],
+        )
+        self.assertEqual(next(rows), (1, 1))
+        self.assertEqual(
+            self.native_client.requests[('PublisherQueryLanguageService', 'select')],
+            1,
+        )
+        self.assertEqual(len(list(rows)), 399)
+
+        self.backend.fixtures['ad_units'] = [
+            {'id': 1, 'name': 'root', 'parentId': None},
+            {'id': 2, 'name': 'sports', 'parentId': 1},
+        ]
+        self.assertEqual(
+            [
+                (adunit.id, adunit.parent_id, adunit.name)
+                for adunit in interface.get_adunit_targets()
+            ],
+            [('1', None, 'root'), ('2', '1', 'sports')],
+        )
+
+        geographies = interface.get_geography_targets()
+        self.assertEqual(
+            [(geo.id, geo.parent_id, geo.type) for geo in geographies],
+            [
+                ('2840', None, 'country'),
+                ('21137', '2840', 'state'),
+                ('1014044', '21137', 'city'),
+            ],
+        )
+        self.assertEqual(
+            [geo.name for geo in interface.get_geography_targets(['CITY'])],
+            ['San Francisco'],
+        )
+        # The table is cached
+        interface.get_geography_targets()
+        self.assertEqual(
+            self.native_client.requests[('PublisherQueryLanguageService', 'select')],
+            3,
+        )
+
+        self.backend.fixtures['line_items'][2]['startDateTime'] = {
+            'date': {'year': 2015, 'month': 7, 'day': 1},
+            'hour': 0, 'minute': 0, 'second': 0,
+            'timeZoneID': 'America/New_York',
+        }
+        rows = interface.get_line_item_rows(
+            ['Id', 'Name', 'StartDateTime'], orderId=0, id__lte=6,
+        )
+        self.assertEqual(
+            [(row.id, row.name) for row in rows],
+            [(3, 'Line Item 3'), (6, 'Line Item 6')],
+        )
+        self.assertEqual(
+            rows[0].start_date_time.isoformat(), '2015-07-01T00:00:00-04:00',
+        )
+        self.assertIsNone(rows[1].start_date_time)
+        self.assertEqual(
+            interface.get_line_item_rows(['Id'], columnar=True, orderId=0),
+            {'id': range(3, 1201, 3)},
+        )
+
+        # Long lists of values are queried in chunks
+        interface.dfp_client.max_in_list_size = 2
+        self.assertEqual(
+            [row.id for row in interface.get_line_item_rows(
+                ['Id'], orderId=0, id=[3, 6, 9, 12, 15],
+            )],
+            [3, 6, 9, 12, 15],
+        )
+        self.assertEqual(
+            self.native_client.requests[('PublisherQueryLanguageService', 'select')],
+            8,
+        )
+
+        report = self.client.generate_report(
+            ['LINE_ITEM_ID'], ['AD_SERVER_IMPRESSIONS'], 'LAST_WEEK',
+        )
+        self.assertEqual(len(report), 1200)
+        self.assertEqual(
+            report[0], {'LINE_ITEM_ID': '1', 'AD_SERVER_IMPRESSIONS': '0'},
+        )
+
+    def test_report_deadline(self):
+        self.backend.fixtures['report_polls'] = 2
+        self.client.report_poll_interval = 0.01
+        report = self.client.generate_report(
+            ['LINE_ITEM_ID'], ['AD_SERVER_IMPRESSIONS'], 'LAST_WEEK',
+        )
+        self.assertEqual(len(report), 1200)
+        self.assertEqual(
+            self.native_client.requests[('ReportService', 'getReportJobStatus')],
+            3,
+        )
+
+        # Polling stops at the deadline rather than after the interval
+        self.backend.fixtures['report_polls'] = 100
+        self.client.report_poll_interval = 30
+        start = time.time()
+        with self.assertRaises(ParselmouthTimeout):
+            with Timeout(0.1):
+                self.client.generate_report(
+                    ['LINE_ITEM_ID'], ['AD_SERVER_IMPRESSIONS'], 'LAST_WEEK',
+                )
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(
+            self.native_client.requests[('ReportService', 'downloadReport')],
+            1,
+        )
+
+    def test_failures_and_latency(self):
+        self.native_client.latency = 0.25
+        self.native_client.inject_error(
+            QUOTA_ERROR_MESSAGE, 'LineItemService', times=2,
+        )
+        self.native_client.inject_error(SERVER_ERROR_MESSAGE, 'LineItemService')
+
+        self.assertEqual(len(self.client.get_line_items(limit=None)), 1200)
+        requests = self.native_client.requests[
+            ('LineItemService', 'getLineItemsByStatement')
+        ]
+        # 3 failed requests, then 4 pages
+        self.assertEqual(requests, 7)
+        self.assertEqual(self.sleeps.count(0.25), 7)
+
+        self.native_client.failure_rate = 1
+        with self.assertRaises(ParselmouthException):
+            self.client.get_line_items(limit=None)
+
+    def test_record_and_replay(self):
+        recorder = RecordingDFPClient(self.native_client)
+        self.client.native_dfp_client = recorder
+        line_items = self.client.get_line_items(limit=None, orderId=2)
+        report = self.client.generate_report(
+            ['LINE_ITEM_ID'], ['AD_SERVER_IMPRESSIONS'], 'LAST_WEEK',
+        )
+
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'recording.json')
+            recorder.save(path)
+            replay_client = self._get_client(
+                FakeDFPClient(ReplayBackend.from_file(path)),
+            )
+            self.assertEqual(
+                replay_client.get_line_items(limit=None, orderId=2), line_items,
+            )
+            self.assertEqual(
+                replay_client.generate_report(
+                    ['LINE_ITEM_ID'], ['AD_SERVER_IMPRESSIONS'], 'LAST_WEEK',
+                ),
+                report,
+            )
+            with self.assertRaises(ParselmouthException):
+                replay_client.get_line_items(limit=None, orderId=1)
+        finally:
+            shutil.rmtree(directory)
@@ -0,0 +1,100 @@
+import unittest
+from collections import namedtuple
+
+from parselmouth.adapters.dfp.geography import GeographyCache
+from parselmouth.adapters.dfp.geography import GeographyTable
+from parselmouth.tree_builder import TreeBuilder
+
+
+GeoRow = namedtuple('GeoRow', ['id', 'name', 'parent_ids', 'country_code', 'type'])
+
+ROWS = [
+    GeoRow(2840, 'United States', None, 'US', 'COUNTRY'),
+    GeoRow(21137, 'California', [2840], 'US', 'STATE'),
+    GeoRow(1014044, 'San Francisco', [2840, 21137], 'US', 'CITY'),
+    # Its county is not targetable, so is not in the table
+    GeoRow(9031936, '94103', [2840, 21137, 9057265], 'US', 'POSTAL_CODE'),
+    GeoRow(2276, 'Germany', None, 'DE', 'COUNTRY'),
+]
+
+
+class GeographyTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.table = GeographyTable.from_rows(iter(ROWS))
+
+    def test_parents(self):
+        self.assertEqual(len(self.table), 5)
+        self.assertEqual(
+            [(geo.id, geo.parent_id) for geo in self.table],
+            [
+                ('2840', None),
+                ('21137', '2840'),
+                ('1014044', '21137'),
+                ('9031936', '21137'),
+                ('2276', None),
+            ],
+        )
+        geo = self.table.get('1014044')
+        self.assertEqual(geo.type, 'city')
+        self.assertEqual(geo.external_name, 'San%20Francisco')
+        self.assertIsNone(self.table.get(1))
+
+    def test_ancestors(self):
+        self.assertEqual(
+            [geo.name for geo in self.table.get_ancestors(1014044)],
+            ['California', 'United States'],
+        )
+        self.assertEqual(self.table.get_ancestors(2840), [])
+        self.assertEqual(self.table.get_country_code('9031936'), 'US')
+
+    def test_types(self):
+        self.assertEqual(
+            [geo.id for geo in self.table.get_geographies(['COUNTRY'])],
+            ['2840', '2276'],
+        )
+        self.assertEqual(
+            self.table.get_geographies(['postal_code', 'city']),
+            [self.table.get(1014044), self.table.get(9031936)],
+        )
+
+    def test_tree(self):
+        tree = TreeBuilder(None, None).build_tree(self.table.get_geographies())
+        self.assertEqual(
+            sorted(node.node.id for node in tree.children), ['2276', '2840'],
+        )
+        self.assertEqual(tree.get_max_depth(), 2)
+        california = tree.get_subtree('id', '21137')
+        self.assertEqual(
+            sorted(node.node.id for node in california.children),
+            ['1014044', '9031936'],
+        )
+
+
+class GeographyCacheTest(unittest.TestCase):
+
+    def test_ttl(self):
+        now = [0]
+        loads = []
+
+        def load():
+            loads.append(now[0])
+            return GeographyTable.from_rows(ROWS)
+
+        cache = GeographyCache(ttl=60, clock=lambda: now[0])
+        table = cache.get('v201711', load)
+        now[0] = 59
+        self.assertIs(cache.get('v201711', load), table)
+        cache.get('v201802', load)
+        self.assertEqual(loads, [0, 59])
+        now[0] = 60
+        self.assertIsNot(cache.get('v201711', load), table)
+        self.assertEqual(loads, [0, 59, 60])
+
+        cache.clear()
+        cache.get('v201711', load)
+        self.assertEqual(len(loads), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from datetime import date
+from datetime import datetime
+
+import pytz
+from suds.sudsobject import Factory
+
+from parselmouth.adapters.dfp.pql import get_field_name
+from parselmouth.adapters.dfp.pql import get_query_columns
+from parselmouth.adapters.dfp.pql import get_row_type
+from parselmouth.adapters.dfp.pql import parse_pql_value
+from parselmouth.adapters.dfp.pql import to_columns
+
+
+COLUMNS = ['Id', 'Name', 'StartDateTime', 'EndDate']
+
+
+class PQLTest(unittest.TestCase):
+
+    def test_field_names(self):
+        self.assertEqual(
+            [get_field_name(column) for column in COLUMNS + ['CPMValue']],
+            ['id', 'name', 'start_date_time', 'end_date', 'cpm_value'],
+        )
+
+    def test_parse_value(self):
+        self.assertEqual(parse_pql_value({'xsi_type': 'NumberValue', 'value': '12'}), 12)
+        self.assertEqual(parse_pql_value({'xsi_type': 'NumberValue', 'value': '1.5'}), 1.5)
+        self.assertEqual(parse_pql_value({'xsi_type': 'BooleanValue', 'value': 'true'}), True)
+        self.assertEqual(parse_pql_value({'xsi_type': 'TextValue'}), None)
+        self.assertEqual(
+            parse_pql_value({'xsi_type': 'DateValue', 'value': {
+                'year': 2015, 'month': 2, 'day': 1,
+            }}),
+            date(2015, 2, 1),
+        )
+        self.assertEqual(
+            parse_pql_value({'xsi_type': 'SetValue', 'values': [
+                {'xsi_type': 'NumberValue', 'value': '1'},
+                {'xsi_type': 'NumberValue', 'value': '2'},
+            ]}),
+            [1, 2],
+        )
+        # As returned by googleads
+        self.assertEqual(
+            parse_pql_value(Factory.object('DateTimeValue', {
+                'value': Factory.object('DateTime', {
+                    'date': Factory.object('Date', {'year': 2015, 'month': 1, 'day': 1}),
+                    'hour': 5, 'minute': 0, 'second': 0, 'timeZoneID': 'UTC',
+                }),
+            })),
+            datetime(2015, 1, 1, 5, tzinfo=pytz.utc),
+        )
+        dt = parse_pql_value({'xsi_type': 'DateTimeValue', 'value': {
+            'date': {'year': 2015, 'month': 7, 'day': 1},
+            'hour': 0, 'minute': 0, 'second': 0,
+            'timeZoneID': 'America/New_York',
+        }})
+        self.assertEqual(dt.isoformat(), '2015-07-01T00:00:00-04:00')
+        self.assertEqual(
+            parse_pql_value(Factory.object('TextValue', {'value': 'sports'})),
+            'sports',
+        )
+
+    def test_query_columns(self):
+        self.assertEqual(
+            get_query_columns('SELECT Id, ParentId\nFROM Ad_Unit WHERE Id > 1'),
+            ['Id', 'ParentId'],
+        )
+        self.assertIsNone(get_query_columns('WHERE Id > 1'))
+
+    def test_to_columns(self):
+        row_type = get_row_type(COLUMNS)
+        self.assertIs(get_row_type(COLUMNS), row_type)
+        rows = [
+            row_type(1, 'Say "hi"', None, date(2015, 2, 1)),
+            row_type(2, u'Caf\xe9', None, None),
+        ]
+        columns = to_columns(iter(rows), COLUMNS)
+        self.assertEqual(columns['id'], [1, 2])
+        self.assertEqual(columns['end_date'], [date(2015, 2, 1), None])
+        self.assertEqual(
+            to_columns([], COLUMNS),
+            {'id': [], 'name': [], 'start_date_time': [], 'end_date': []},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import threading
+import time
+import unittest
+
+from parselmouth.adapters.dfp.rate_limiter import AdaptiveLimiter
+from parselmouth.adapters.dfp.rate_limiter import RateLimiterRegistry
+from parselmouth.adapters.dfp.rate_limiter import TokenBucket
+from parselmouth.adapters.dfp.rate_limiter import is_quota_error
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class QuotaError(Exception):
+    pass
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def _get_limiter(self, **kwargs):
+        return AdaptiveLimiter(clock=self.clock, sleep=self.clock.sleep, **kwargs)
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(2, clock=self.clock)
+        self.assertEqual([bucket.reserve() for _ in range(4)], [0, 0, 0.5, 1.0])
+        self.clock.now += 2
+        self.assertEqual(bucket.reserve(), 0)
+
+    def test_is_quota_error(self):
+        self.assertTrue(is_quota_error(QuotaError('[QuotaError.EXCEEDED_QUOTA @ ]')))
+        self.assertFalse(is_quota_error(QuotaError('[AuthenticationError.NETWORK_NOT_FOUND @ ]')))
+
+    def test_aimd(self):
+        limiter = self._get_limiter(max_concurrency=8, backoff=2)
+        limiter.on_quota_exceeded()
+        self.assertEqual(limiter.concurrency, 4)
+        # Errors from requests in flight during the pause count once
+        limiter.on_quota_exceeded()
+        self.assertEqual(limiter.concurrency, 4)
+
+        # Consecutive errors double the pause
+        self.clock.now += 2
+        limiter.on_quota_exceeded()
+        self.assertEqual(limiter.concurrency, 2)
+        self.assertEqual(limiter._paused_until, self.clock.now + 4)
+
+        # Increases by about one for every `concurrency` successes
+        for _ in range(5):
+            limiter.on_success()
+        self.assertEqual(int(limiter.concurrency), 3)
+        for _ in range(100):
+            limiter.on_success()
+        self.assertEqual(limiter.concurrency, 8)
+
+    def test_call_retries_quota_errors(self):
+        limiter = self._get_limiter(rate=100, backoff=2, max_retries=2)
+        calls = []
+
+        def request(fail):
+            calls.append(self.clock.now)
+            if len(calls) <= fail:
+                raise QuotaError('QuotaError.EXCEEDED_QUOTA')
+            return 'ok'
+
+        self.assertEqual(limiter.call(request, 1), 'ok')
+        self.assertEqual(calls[1] - calls[0], 2)
+        self.assertEqual(limiter.quota_errors, 1)
+
+        calls[:] = []
+        self.assertRaises(QuotaError, limiter.call, request, 5)
+        self.assertEqual(len(calls), 3)
+
+        calls[:] = []
+        self.assertRaises(ValueError, limiter.call, int, 'not a number')
+
+    def test_concurrency(self):
+        limiter = AdaptiveLimiter(rate=1000, max_concurrency=2)
+        lock = threading.Lock()
+        running = [0]
+        max_running = [0]
+
+        def request():
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        threads = [
+            threading.Thread(target=limiter.call, args=(request,))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(max_running[0], 2)
+
+    def test_registry(self):
+        registry = RateLimiterRegistry(rate=8)
+        registry.configure(service_name='ForecastService', rate=1)
+        registry.configure(network_code='1', rate=4, max_concurrency=2)
+
+        limiter = registry.get_limiter('1', 'LineItemService')
+        self.assertIs(limiter, registry.get_limiter('1', 'LineItemService'))
+        self.assertIsNot(limiter, registry.get_limiter('2', 'LineItemService'))
+        # Services share the limiter of their network, unless configured
+        self.assertIs(limiter, registry.get_limiter('1', 'OrderService'))
+        self.assertIsNot(limiter, registry.get_limiter('1', 'ForecastService'))
+        self.assertEqual(limiter.bucket.rate, 4)
+        self.assertEqual(limiter.max_concurrency, 2)
+        self.assertEqual(registry.get_limiter('1', 'ForecastService').bucket.rate, 4)
+        self.assertEqual(registry.get_limiter('2', 'ForecastService').bucket.rate, 1)
+        self.assertEqual(registry.get_limiter('2', 'LineItemService').bucket.rate, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
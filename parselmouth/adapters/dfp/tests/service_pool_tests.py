@@ -0,0 +1,72 @@
+import threading
+import unittest
+
+from parselmouth.adapters.dfp.service_pool import ServicePool
+
+
+class ServicePoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.built = []
+        self.pool = ServicePool(self._build_service)
+
+    def _build_service(self, name, version):
+        service = (name, version, len(self.built))
+        self.built.append(service)
+        return service
+
+    def test_reuse(self):
+        for _ in range(3):
+            with self.pool.get_service('LineItemService', 'v201508') as service:
+                self.assertEqual(service, ('LineItemService', 'v201508', 0))
+
+        with self.pool.get_service('OrderService', 'v201508'):
+            pass
+
+        self.assertEqual(len(self.built), 2)
+        self.assertEqual(self.pool.get_stats(), {
+            'hits': 2,
+            'misses': 2,
+            'idle': {'LineItemService': 1, 'OrderService': 1},
+        })
+
+    def test_nested(self):
+        # A service in use is never lent to another caller
+        with self.pool.get_service('CustomTargetingService', 'v201508') as first:
+            with self.pool.get_service('CustomTargetingService', 'v201508') as second:
+                self.assertNotEqual(first, second)
+
+        self.assertEqual(len(self.built), 2)
+        with self.pool.get_service('CustomTargetingService', 'v201508'):
+            pass
+        self.assertEqual(len(self.built), 2)
+
+    def test_threads(self):
+        in_use = set()
+        errors = []
+        lock = threading.Lock()
+
+        def work():
+            for _ in range(50):
+                with self.pool.get_service('LineItemService', 'v201508') as service:
+                    with lock:
+                        if service in in_use:
+                            errors.append(service)
+                        in_use.add(service)
+                    with lock:
+                        in_use.remove(service)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(self.built), 8)
+        self.assertEqual(self.pool.hits + self.pool.misses, 400)
+        self.assertEqual(self.pool.misses, len(self.built))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" DFP Transport Deadlines
+
+Propagate the deadline of parselmouth.utils.timeout.Timeout into the
+SOAP transport: each request is made with a socket timeout of the time
+remaining before the deadline, and fails with a ParselmouthTimeout when
+the deadline has passed. Requests which still fail with a transport
+error once retried raise a ParselmouthNetworkError, so that callers can
+tell them apart from errors returned by DFP.
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import sys
+
+# Parselmouth Imports
+from parselmouth.exceptions import ParselmouthNetworkError
+from parselmouth.retry import is_transient_error
+from parselmouth.utils.timeout import check_deadline
+from parselmouth.utils.timeout import get_remaining_time
+
+# Parselmouth Imports - Local DFP Adapter Imports
+from parselmouth.adapters.dfp.constants import DFP_REQUEST_TIMEOUT
+from parselmouth.adapters.dfp.rate_limiter import get_error_message
+
+
+def set_transport_timeout(service, seconds):
+    """
+    Set the socket timeout of the requests made by a googleads service
+
+    @param service: googleads.common.SudsServiceProxy
+    @param seconds: float
+    """
+    suds_client = getattr(service, 'suds_client', None)
+    if suds_client is not None:
+        suds_client.set_options(timeout=seconds)
+
+
+def to_network_error(error):
+    """
+    @param error: Exception
+    @return: Exception, a ParselmouthNetworkError for transport errors,
+        see is_transient_error, and the error itself otherwise
+    """
+    if isinstance(error, ParselmouthNetworkError) \
+            or not is_transient_error(error):
+        return error
+    return ParselmouthNetworkError("{0}: {1}".format(
+        error.__class__.__name__, get_error_message(error),
+    ))
+
+
+def call_with_network_errors(function, *args, **kwargs):
+    """
+    Call a function making requests, raising a ParselmouthNetworkError
+    if it fails with a transport error
+
+    @param function: function
+    @return: result of the function
+    """
+    try:
+        return function(*args, **kwargs)
+    except Exception as e:
+        raise to_network_error(e), None, sys.exc_info()[2]
+
+
+class NetworkErrorService(object):
+    """
+    Wraps a googleads service, or an object making requests through one,
+    so that its requests raise a ParselmouthNetworkError when they fail
+    with a transport error, see to_network_error
+    """
+
+    def __init__(self, service):
+        """
+        @param service: object, e.g. a RetryingService
+        """
+        self.service = service
+
+    def __getattr__(self, name):
+        attribute = getattr(self.service, name)
+        if not callable(attribute):
+            return attribute
+
+        def with_network_errors(*args, **kwargs):
+            return call_with_network_errors(attribute, *args, **kwargs)
+        with_network_errors.__name__ = name
+        return with_network_errors
+
+
+class DeadlineService(object):
+    """
+    Wraps a googleads service, or an object making requests through one,
+    so that its requests time out at the current thread's deadline
+    """
+
+    def __init__(self,
+                 service,
+                 request_timeout=DFP_REQUEST_TIMEOUT,
+                 transport_service=None):
+        """
+        @param service: object, e.g. a googleads service
+        @param request_timeout: float, socket timeout of requests made
+            without a deadline, or with a later one
+        @param transport_service: SudsServiceProxy|None, service making
+            the requests, defaults to the wrapped service
+        """
+        self.service = service
+        self.request_timeout = request_timeout
+        self.transport_service = transport_service or service
+
+    def __getattr__(self, name):
+        attribute = getattr(self.service, name)
+        if not callable(attribute):
+            return attribute
+
+        def with_deadline(*args, **kwargs):
+            timeout = get_remaining_time()
+            if timeout is None or timeout > self.request_timeout:
+                timeout = self.request_timeout
+            set_transport_timeout(self.transport_service, timeout)
+            try:
+                return attribute(*args, **kwargs)
+            except Exception:
+                # Requests cut short by the socket timeout fail with a
+                # ParselmouthTimeout
+                check_deadline()
+                raise
+        with_deadline.__name__ = name
+        return with_deadline
@@ -13,6 +13,15 @@ from __future__ import unicode_literals
 # Third Party Library Imports
 from suds.sudsobject import asdict
 
+# Parselmouth Imports
+from parselmouth.retry import is_transient_error
+
+# Parselmouth Imports - Local DFP Adapter Imports
+from parselmouth.adapters.dfp.constants import DFP_MUTATE_METHOD_PREFIXES
+from parselmouth.adapters.dfp.constants import DFP_RETRYABLE_ERRORS
+from parselmouth.adapters.dfp.rate_limiter import get_error_message
+from parselmouth.adapters.dfp.rate_limiter import is_quota_error
+
 
 def _underscore_key(string):
     """
@@ -24,6 +33,31 @@ def _underscore_key(string):
     return string.replace('.', '_')
 
 
+def is_retryable_error(error):
+    """
+    @param error: Exception
+    @return: bool, True for network errors and DFP errors which may
+        succeed when retried. Quota errors are not, they are retried by
+        the rate limiter.
+    """
+    if is_quota_error(error):
+        return False
+    if is_transient_error(error):
+        return True
+    message = get_error_message(error)
+    return any(reason in message for reason in DFP_RETRYABLE_ERRORS)
+
+
+def is_idempotent_method(method_name):
+    """
+    @param method_name: str, e.g. 'getLineItemsByStatement'
+    @return: bool, False for the methods which change objects, which
+        may have taken effect when they fail, see
+        DFP_MUTATE_METHOD_PREFIXES
+    """
+    return not method_name.startswith(DFP_MUTATE_METHOD_PREFIXES)
+
+
 def to_string(item, convert_bool=True):
     """
     Handles unicode strings with non-ascii characters
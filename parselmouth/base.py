@@ -14,21 +14,19 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 # Standard Library Imports
-import logging
+import threading
 
 # Parselmouth Imports
-from parselmouth.constants import MAX_REQUEST_ATTEMPTS
 from parselmouth.constants import ParselmouthProviders
 from parselmouth.constants import ParselmouthReportMetrics
 from parselmouth.exceptions import ParselmouthException
-from parselmouth.exceptions import ParselmouthNetworkError
+from parselmouth.retry import RetryPolicy
+from parselmouth.retry import is_network_error
 from parselmouth.tree_builder import TreeBuilder
+from parselmouth.utils.imports import import_string
 from parselmouth.utils.timeout import Timeout
 from parselmouth.config import ParselmouthConfig
 
-# Parselmouth Imports - Adapter Imports
-from parselmouth.adapters.dfp.interface import DFPInterface
-
 
 class Parselmouth(object):
     """
@@ -36,11 +34,15 @@ class Parselmouth(object):
     """
 
     ProviderInterfaceMap = {
-        ParselmouthProviders.google_dfp_premium: DFPInterface,
-        ParselmouthProviders.google_dfp_small_business: DFPInterface,
+        ParselmouthProviders.google_dfp_premium:
+            'parselmouth.adapters.dfp.interface.DFPInterface',
+        ParselmouthProviders.google_dfp_small_business:
+            'parselmouth.adapters.dfp.interface.DFPInterface',
     }
     """
-    dict, mapping between ad service providers and their implementations
+    dict, mapping between ad service providers and the import path of
+    their implementations. Adapters are only imported when used since
+    they depend on heavy third party libraries.
     NOTES:
         * This should probably be hosted elsewhere...
         * This doesn't serve much purpose right now since all we support
@@ -51,6 +53,10 @@ class Parselmouth(object):
                  config=None,
                  provider_name=None,
                  network_timeout=60 * 10,
+                 provider_options=None,
+                 lazy=False,
+                 retry_policy=None,
+                 network_timezone=None,
                  **kwargs):
         """
         Constructor
@@ -61,8 +67,27 @@ class Parselmouth(object):
         @param provider_name: any(parselmouth.constants.ParseltoungProvider)
         @param network_timeout: int, number seconds before timing out a request
             the given ad provider service
+        @param provider_options: dict|None, extra keyword arguments for
+            the provider interface, e.g. a shared oauth2_client for DFP
+        @param lazy: bool, defer connecting to the provider and checking
+            the configuration until the client is first used
+        @param retry_policy: RetryPolicy|None, policy for retrying calls
+            to the provider which time out or fail with a network error.
+            Provider adapters retry the errors of their own requests.
+            Calls changing objects are not retried.
+        @param network_timezone: pytz.timezone|None, timezone of the
+            network if already known, e.g. by a ParselmouthPool, in which
+            case it is not fetched when connecting
         """
         self._network_timeout = network_timeout
+        self.retry_policy = retry_policy or RetryPolicy(
+            is_retryable=is_network_error,
+        )
+        self._network_timezone = network_timezone
+        self._provider_options = provider_options or {}
+        self._provider = None
+        self._tree_builder = None
+        self._connect_lock = threading.Lock()
         self.provider_config = config
         # Load the provider configuration
         if self.provider_config and not isinstance(self.provider_config, ParselmouthConfig):
@@ -72,29 +97,12 @@ class Parselmouth(object):
         elif not self.provider_config:
             self.provider_config = ParselmouthConfig(provider_name, **kwargs)
 
-        # Get interface for given provider
         self.provider_name = self.provider_config.provider_name
-        provider_interface_class = self.get_ad_service_interface_for_provider(
-            self.provider_name
-        )
-
-        self.provider = provider_interface_class(
-            **self.provider_config.get_credentials_arguments()
-        )
-        self.tree_builder = TreeBuilder(
-            self.provider_name,
-            self.provider,
-        )
+        # Fail early on unsupported providers, even when lazy
+        self._get_interface_path_for_provider(self.provider_name)
 
-        # Attempt to access the network to check proper configuration
-        try:
-            self.get_network_timezone()
-        except Exception as e:
-            raise ParselmouthException(
-                "Provider not configured correctly. Got error: '{}'".format(
-                    str(e)
-                )
-            )
+        if not lazy:
+            self.connect()
 
     def __str__(self):
         """
@@ -110,10 +118,25 @@ class Parselmouth(object):
             ")"
         ).format(
             class_name=self.__class__.__name__,
-            provider=self.provider,
+            provider=self._provider,
             provider_config=self.provider_config,
         )
 
+    @classmethod
+    def _get_interface_path_for_provider(cls, provider_name):
+        """
+        @param provider_name: str, one of enum
+            parselmouth.constants.ParselmouthProviders
+        @return: str, import path of the provider's interface class
+        """
+        interface_path = cls.ProviderInterfaceMap.get(provider_name)
+        if not interface_path:
+            raise ValueError(
+                "There is no interface defined for provider: %s" %
+                provider_name
+            )
+        return interface_path
+
     @classmethod
     def get_ad_service_interface_for_provider(cls, provider_name):
         """
@@ -125,13 +148,9 @@ class Parselmouth(object):
         @return: descendant of
             parselmouth.adapters.abstract_interface.AbstractInterface
         """
-        client_interface = cls.ProviderInterfaceMap.get(provider_name)
-        if not client_interface:
-            raise ValueError(
-                "There is no interface defined for provider: %s" %
-                provider_name
-            )
-        return client_interface
+        return import_string(
+            cls._get_interface_path_for_provider(provider_name)
+        )
 
     @classmethod
     def get_ad_service_config_interface_for_provider(cls, provider_name):
@@ -151,15 +170,105 @@ class Parselmouth(object):
             )
         return config_interface
 
+    def connect(self):
+        """
+        Create the provider interface and access the network to check
+        that it is configured correctly. This is done on construction,
+        or on first use for lazy clients.
+        """
+        with self._connect_lock:
+            if self._provider is not None:
+                return
+
+            provider_interface_class = self.get_ad_service_interface_for_provider(
+                self.provider_name
+            )
+            provider_arguments = dict(
+                self.provider_config.get_credentials_arguments(),
+                **self._provider_options
+            )
+            provider = provider_interface_class(**provider_arguments)
+
+            # Attempt to access the network to check proper configuration,
+            # unless it was accessed before
+            if self._network_timezone is None:
+                try:
+                    self._network_timezone = self._call(
+                        provider.get_network_timezone,
+                    )
+                except Exception as e:
+                    raise ParselmouthException(
+                        "Provider not configured correctly. Got error: '{}'".format(
+                            str(e)
+                        )
+                    )
+
+            self._tree_builder = TreeBuilder(self.provider_name, provider)
+            self._provider = provider
+
+    def _call(self, function, *args, **kwargs):
+        """
+        Call a provider method within the network timeout, retrying it
+        according to the retry policy. Retries share the deadline of the
+        first attempt.
+
+        @param function: function
+        @return: result of the function
+        """
+        with Timeout(self._network_timeout):
+            return self.retry_policy.call(function, *args, **kwargs)
+
+    def _call_once(self, function, *args, **kwargs):
+        """
+        Call a provider method within the network timeout, without
+        retrying it, for methods changing objects which may have taken
+        effect when they fail
+
+        @param function: function
+        @return: result of the function
+        """
+        with Timeout(self._network_timeout):
+            return function(*args, **kwargs)
+
+    @property
+    def provider(self):
+        """
+        @return: descendant of
+            parselmouth.adapters.abstract_interface.AbstractInterface
+        """
+        if self._provider is None:
+            self.connect()
+        return self._provider
+
+    @property
+    def tree_builder(self):
+        """
+        @return: parselmouth.tree_builder.TreeBuilder
+        """
+        if self._provider is None:
+            self.connect()
+        return self._tree_builder
+
+    @property
+    def network_timezone(self):
+        """
+        @return: pytz.timezone|None, timezone of the network if known,
+            without connecting to the provider
+        """
+        return self._network_timezone
+
     def get_network_timezone(self):
         """
         Get the DFP network timezone for
-        the host this client is connected to
+        the host this client is connected to. The timezone is only
+        fetched once.
 
         @return: pytz.timezone
         """
-        with Timeout(self._network_timeout):
-            return self.provider.get_network_timezone()
+        if self._network_timezone is None:
+            # The timezone is fetched when connecting
+            self.connect()
+        return self._network_timezone
 
     def get_advertisers(self):
         """
@@ -167,8 +276,7 @@ class Parselmouth(object):
 
         @return: list(dict), returns a list of company dictionaries
         """
-        with Timeout(self._network_timeout):
-            return self.provider.get_advertisers()
+        return self._call(self.provider.get_advertisers)
 
     def get_campaign(self, campaign_id, include_line_items=False):
         """
@@ -178,8 +286,7 @@ class Parselmouth(object):
         @param include_line_items: bool, include line item data as well
         @return: parselmouth.delivery.Campaign
         """
-        with Timeout(self._network_timeout):
-            campaign = self.provider.get_campaign(campaign_id)
+        campaign = self._call(self.provider.get_campaign, campaign_id)
 
         if include_line_items:
             campaign.line_items = self.get_campaign_line_items(campaign)
@@ -197,8 +304,7 @@ class Parselmouth(object):
             PQL results
         @return: L{parselmouth.delivery.Campaign}
         """
-        with Timeout(self._network_timeout):
-            return self.provider.get_campaigns(**kwargs)
+        return self._call(self.provider.get_campaigns, **kwargs)
 
     def get_line_item(self, line_item_id):
         """
@@ -207,21 +313,10 @@ class Parselmouth(object):
         @param line_item_id: str, id of the LineItem to return
         @return: parselmouth.delivery.LineItem
         """
-        attempt = 1
-        response = None
-        while not response and attempt <= MAX_REQUEST_ATTEMPTS:
-            try:
-                with Timeout(self._network_timeout):
-                    response = self.provider.get_line_item(line_item_id)
-            except ParselmouthNetworkError:
-                logging.exception("Got network error on attempt %s" % attempt)
-                attempt += 1
-
+        response = self._call(self.provider.get_line_item, line_item_id)
         if not response:
             raise ParselmouthException(
-                'Could not fetch a line item in {0} attempts'.format(
-                    MAX_REQUEST_ATTEMPTS
-                )
+                'Could not fetch line item {0}'.format(line_item_id)
             )
 
         return response
@@ -237,8 +332,21 @@ class Parselmouth(object):
             PQL results
         @return: L{parselmouth.delivery.LineItem}
         """
-        with Timeout(self._network_timeout):
-            return self.provider.get_line_items(**kwargs)
+        return self._call(self.provider.get_line_items, **kwargs)
+
+    def get_line_item_rows(self, **kwargs):
+        """
+        List line items with selected columns only, without their
+        targeting
+
+        @param columns: list(str), columns to select
+        @param columnar: bool, return a list of values per column rather
+            than a row per line item
+        @param filter_kwargs: dict, keyword arguments on which to filter
+            PQL results
+        @return: list(namedtuple)|dict
+        """
+        return self._call(self.provider.get_line_item_rows, **kwargs)
 
     def get_campaign_line_items(self, campaign):
         """
@@ -247,8 +355,7 @@ class Parselmouth(object):
         @param campaign: Campaign|str,
         @return: L{parselmouth.delivery.LineItem}
         """
-        with Timeout(self._network_timeout):
-            return self.provider.get_campaign_line_items(campaign)
+        return self._call(self.provider.get_campaign_line_items, campaign)
 
     def get_line_item_available_inventory(self,
                                           line_item,
@@ -271,10 +378,10 @@ class Parselmouth(object):
             is true then use_start is necessarily true.
         @return: int|None, number of available impressions
         """
-        with Timeout(self._network_timeout):
-            return self.provider.get_line_item_available_inventory(
-                line_item, use_start, preserve_id
-            )
+        return self._call(
+            self.provider.get_line_item_available_inventory,
+            line_item, use_start, preserve_id,
+        )
 
     def get_creative(self, creative_id):
         """
@@ -283,7 +390,7 @@ class Parselmouth(object):
         @param creative_id: str, id of the campaign to return
         @return: parselmouth.delivery.Creative
         """
-        return self.provider.get_creative(creative_id)
+        return self._call(self.provider.get_creative, creative_id)
 
     def get_creatives(self, **kwargs):
         """
@@ -296,8 +403,7 @@ class Parselmouth(object):
             PQL results
         @return: L{parselmouth.delivery.Creative}
         """
-        with Timeout(self._network_timeout):
-            return self.provider.get_creatives(**kwargs)
+        return self._call(self.provider.get_creatives, **kwargs)
 
     def get_line_item_creatives(self, line_item):
         """
@@ -307,8 +413,7 @@ class Parselmouth(object):
             either the id of the lineitem or an object with the id
         @return: list(parselmouth.delivery.Creative)
         """
-        with Timeout(self._network_timeout):
-            return self.provider.get_line_item_creatives(line_item)
+        return self._call(self.provider.get_line_item_creatives, line_item)
 
     def get_line_item_report(self,
                              start,
@@ -331,10 +436,9 @@ class Parselmouth(object):
         @param columns: list(str), list of columns to include
         @return: list(dict)
         """
-        with Timeout(self._network_timeout):
-            return self.provider.get_line_item_report(
-                start, end, columns,
-            )
+        return self._call(
+            self.provider.get_line_item_report, start, end, columns,
+        )
 
     def get_custom_target_by_name(self, name, parent_name):
         """
@@ -345,10 +449,11 @@ class Parselmouth(object):
         @return: Custom|None
         """
 
-        with Timeout(self._network_timeout):
-            targets = self.provider.get_custom_targets(
-                key_name=parent_name, value_name=name,
-            )
+        targets = self._call(
+            self.provider.get_custom_targets,
+            key_name=parent_name,
+            value_name=name,
+        )
 
         if targets and len(targets) > 1:
             raise ParselmouthException('Given name is not unique')
@@ -373,8 +478,7 @@ class Parselmouth(object):
 
         @param line_item: parselmouth.delivery.LineItem
         """
-        with Timeout(self._network_timeout):
-            self.update_line_items([line_item])
+        self.update_line_items([line_item])
 
     def update_line_items(self, line_items):
         """
@@ -382,8 +486,7 @@ class Parselmouth(object):
 
         @param line_items: L{parselmouth.delivery.LineItem}
         """
-        with Timeout(self._network_timeout):
-            self.provider.update_line_items(line_items)
+        self._call_once(self.provider.update_line_items, line_items)
 
     def create_custom_target(self, key, value):
         """
@@ -393,5 +496,4 @@ class Parselmouth(object):
         @param value: parselmouth.targeting.Custom
         @return: list(parselmouth.targeting.Custom)
         """
-        with Timeout(self._network_timeout):
-            return self.provider.create_custom_target(key, value)
+        return self._call_once(self.provider.create_custom_target, key, value)
@@ -18,9 +18,6 @@ from __future__ import unicode_literals
 from abc import ABCMeta
 from abc import abstractmethod
 
-# Third Party Imports
-import yaml
-
 # Parselmouth Imports
 from parselmouth.exceptions import ParselmouthException
 from parselmouth.constants import ParselmouthProviders
@@ -56,6 +56,7 @@ Enum, list of valid technology types for targeting
 ParselmouthReportMetrics = Enum([
     'ad_impressions',
     'ad_viewable_impressions',
+    'ad_clicks',
     'line_item_id',
     'line_item_name',
     'delivery_percentage',
@@ -76,5 +77,63 @@ AdProviderSellTypes = Enum([
 Enum, sales categories for campaigns
 """
 
+ParselmouthEntityTypes = Enum([
+    'campaign',
+    'line_item',
+    'creative',
+])
+"""
+Enum, kinds of delivery objects that can be synced and stored locally
+"""
+
 
 MAX_REQUEST_ATTEMPTS = 3
+"""
+int, default number of attempts made for a request before giving up
+"""
+
+RETRY_BASE_DELAY = 1
+"""
+int, number of seconds to wait before the first retry of a request, the
+wait doubles on each following retry
+"""
+
+RETRY_MAX_DELAY = 60
+"""
+int, maximum number of seconds to wait between attempts of a request
+"""
+
+RETRY_HTTP_CODES = [429, 500, 502, 503, 504]
+"""
+list(int), HTTP status codes of transient errors
+"""
+
+RETRY_BUDGET_RATIO = 0.2
+"""
+float, maximum number of retries per request made, over a window of
+RETRY_BUDGET_WINDOW seconds
+"""
+
+RETRY_BUDGET_MIN_RETRIES = 10
+"""
+int, number of retries allowed in a window regardless of the number of
+requests made
+"""
+
+RETRY_BUDGET_WINDOW = 60
+"""
+int, number of seconds over which retries are counted by a retry budget
+"""
+
+QUERY_OPERATORS = {
+    'eq': '=',
+    'ne': '!=',
+    'gt': '>',
+    'gte': '>=',
+    'lt': '<',
+    'lte': '<=',
+}
+"""
+dict, filter keyword suffix -> comparison operator, e.g. the filter
+keyword `lastModifiedDateTime__gt` is formatted as `lastModifiedDateTime >`
+"""
@@ -144,6 +144,10 @@ class LineItem(ObjectModel):
     when building an ad campaign for a particular campaign. Every line
     item is contained within a campaign or order. A line item contains
     one or more creatives.
+
+    Adapters may give a line item its targeting in the ad server's own
+    format with set_raw_targeting, to only decode it when read: most
+    callers only read budgets, stats or dates.
     """
 
     def __init__(self,
@@ -176,7 +180,6 @@ class LineItem(ObjectModel):
         assert isinstance(value_cost_per_unit, Cost) or value_cost_per_unit is None
         assert isinstance(primary_goal, Goal) or primary_goal is None
         assert isinstance(delivery, DeliveryMeta) or delivery is None
-        assert isinstance(targeting, TargetingData) or targeting is None
 
         if start and end:
             assert start <= end
@@ -212,6 +215,64 @@ class LineItem(ObjectModel):
         """
         return self.delivery.stats
 
+    @property
+    def targeting(self):
+        """
+        Targeting of the line item, decoded from the raw targeting on
+        first access if the line item was given one
+
+        @return: TargetingData|None
+        """
+        raw = self.__dict__.get('_raw_targeting')
+        if raw is not None:
+            raw_targeting, decode = raw
+            # Set through __dict__ since frozen line items decode too
+            self.__dict__['_targeting'] = decode(raw_targeting)
+            # Threads reading the targeting at once may both decode it
+            self.__dict__.pop('_raw_targeting', None)
+        return self.__dict__.get('_targeting')
+
+    @targeting.setter
+    def targeting(self, targeting):
+        """
+        @param targeting: TargetingData|None
+        """
+        assert isinstance(targeting, TargetingData) or targeting is None
+        self.__dict__.pop('_raw_targeting', None)
+        self.__dict__['_targeting'] = targeting
+
+    def set_raw_targeting(self, raw_targeting, decode):
+        """
+        Set the targeting of this line item in the format of an ad
+        server, to be decoded on first access
+
+        @param raw_targeting: object, e.g. dict
+        @param decode: function(object) -> TargetingData, e.g.
+            transform_targeting_data_from_dfp. Must be a module level
+            function for line items to stay picklable.
+        """
+        self.targeting = None
+        self.__dict__['_raw_targeting'] = (raw_targeting, decode)
+
+    def get_raw_targeting(self):
+        """
+        Get the raw targeting of this line item if it was never decoded.
+        Raw targeting is as read from the ad server, and is not fit to
+        be sent back to it.
+
+        @return: object|None, see set_raw_targeting
+        """
+        raw = self.__dict__.get('_raw_targeting')
+        return raw[0] if raw is not None else None
+
+    def _get_fields(self):
+        """
+        @return: dict, see ObjectModel._get_fields
+        """
+        fields = super(LineItem, self)._get_fields()
+        fields['targeting'] = self.targeting
+        return fields
+
 
 class Campaign(ObjectModel):
     """
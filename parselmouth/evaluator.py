@@ -0,0 +1,403 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Parselmouth - Targeting Evaluator
+
+Simulate ad serving decisions by matching impressions against line item
+targeting. A line item's TargetingData is compiled once into a
+predicate, and batches of impressions are matched against many line
+items through inverted indexes on ad unit, geography and custom
+targeting ids.
+
+Only inventory, geography, technology and custom targeting are
+evaluated. Day part, user domain and video targeting are stored as raw
+DFP dictionaries and are ignored.
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import logging
+from collections import defaultdict
+
+# Parselmouth Imports
+from parselmouth.exceptions import ParselmouthException
+from parselmouth.model import ObjectModel
+from parselmouth.targeting import AdUnit
+from parselmouth.targeting import Custom
+from parselmouth.targeting import Geography
+from parselmouth.targeting import Placement
+from parselmouth.targeting import TargetingCriterion
+from parselmouth.targeting import Technology
+
+
+FEATURE_KEYS = {
+    'inventory': ['adunit', 'adunit_tree'],
+    'geography': ['geography'],
+    'technology': ['technology'],
+    'custom': ['custom'],
+}
+"""
+dict, TargetingData field -> names of the impression features it is
+    evaluated against:
+        * adunit: the ad unit of the impression
+        * adunit_tree: the ad unit of the impression and its ancestors
+        * geography: geography ids of the impression and their ancestors
+        * technology: technology ids of the impression
+        * custom: custom targeting value and audience segment ids
+"""
+
+INDEXED_TARGETING_FIELDS = ['inventory', 'geography', 'custom']
+"""
+list(str), TargetingData fields used to index line items
+"""
+
+
+class ImpressionContext(ObjectModel):
+    """
+    Container describing a single ad request
+    """
+
+    def __init__(self,
+                 adunit_id=None,
+                 geography_ids=None,
+                 technology_ids=None,
+                 custom_ids=None):
+        """
+        @param adunit_id: str, id of the ad unit being requested
+        @param geography_ids: list(str), ids of the user's locations
+        @param technology_ids: list(str), ids of the user's browser,
+            operating system, device etc.
+        @param custom_ids: list(str), custom targeting value ids and
+            audience segment ids present on the request
+        """
+        self.adunit_id = adunit_id
+        self.geography_ids = geography_ids or []
+        self.technology_ids = technology_ids or []
+        self.custom_ids = custom_ids or []
+
+
+def _make_any_test(ids_by_key):
+    """
+    Make a predicate checking that an impression has at least one of
+    the given ids
+
+    @param ids_by_key: dict, feature key -> set(str)
+    @return: function(dict) -> bool
+    """
+    tests = [(key, frozenset(ids)) for key, ids in ids_by_key.items()]
+
+    def any_test(features):
+        for key, ids in tests:
+            if not ids.isdisjoint(features[key]):
+                return True
+        return False
+
+    return any_test
+
+
+def _make_bound(ids_by_key):
+    """
+    @param ids_by_key: dict, feature key -> set(str)
+    @return: frozenset((str, str))
+    """
+    return frozenset(
+        (key, _id) for key, ids in ids_by_key.items() for _id in ids
+    )
+
+
+class CompiledTargeting(object):
+    """
+    Predicate for a line item's TargetingData
+
+    Along with the predicate, each targeting field keeps a "bound": a set
+    of (feature key, id) pairs such that any matching impression has at
+    least one of them. The bounds are what line items are indexed on.
+    A bound of None means that the field can't be used for indexing.
+    """
+
+    def __init__(self, predicates, bounds):
+        """
+        @param predicates: list(function(dict) -> bool)
+        @param bounds: dict, TargetingData field -> frozenset|None
+        """
+        self.predicates = predicates
+        self.bounds = bounds
+
+    def __call__(self, features):
+        """
+        @param features: dict, see TargetingEvaluator.get_features
+        @return: bool
+        """
+        for predicate in self.predicates:
+            if not predicate(features):
+                return False
+        return True
+
+
+class TargetingEvaluator(object):
+    """
+    Match impressions against line item targeting
+    """
+
+    def __init__(self,
+                 adunit_tree=None,
+                 geography_tree=None,
+                 placements=None):
+        """
+        @param adunit_tree: NodeTree|None, ad unit tree used to expand
+            targets with include_descendants to the whole subtree. See
+            Parselmouth.construct_tree
+        @param geography_tree: NodeTree|None, geography tree used to
+            match impressions against parent locations
+        @param placements: dict|None, placement id -> list(str) of ad
+            unit ids, used for placements that do not list their
+            ad units
+        """
+        self._adunit_parents = \
+            adunit_tree.get_parent_map() if adunit_tree else {}
+        self._geography_parents = \
+            geography_tree.get_parent_map() if geography_tree else {}
+        self._placements = placements or {}
+
+    def _get_ancestors(self, ids, parent_map):
+        """
+        @param ids: list(str)
+        @param parent_map: dict, see NodeTree.get_parent_map
+        @return: set(str), the given ids and all of their ancestors
+        """
+        ancestors = set()
+        for _id in ids:
+            while _id is not None and _id not in ancestors:
+                ancestors.add(_id)
+                _id = parent_map.get(_id)
+        return ancestors
+
+    def get_features(self, impression):
+        """
+        Expand an impression into the sets of ids that targeting is
+        evaluated against
+
+        @param impression: ImpressionContext
+        @return: dict, feature key -> frozenset(str)
+        """
+        adunit_ids = [impression.adunit_id] if impression.adunit_id else []
+        return {
+            'adunit': frozenset(adunit_ids),
+            'adunit_tree': frozenset(
+                self._get_ancestors(adunit_ids, self._adunit_parents)
+            ),
+            'geography': frozenset(
+                self._get_ancestors(
+                    impression.geography_ids, self._geography_parents,
+                )
+            ),
+            'technology': frozenset(impression.technology_ids),
+            'custom': frozenset(impression.custom_ids),
+        }
+
+    def _get_target_ids(self, target):
+        """
+        Get the impression feature ids that satisfy a single target
+
+        @param target: ObjectModel
+        @return: dict, feature key -> set(str)
+        """
+        if isinstance(target, AdUnit):
+            if target.include_descendants:
+                return {'adunit_tree': set([target.id])}
+            return {'adunit': set([target.id])}
+
+        elif isinstance(target, Placement):
+            adunits = target.adunits or self._placements.get(target.id) or []
+            if not adunits:
+                logging.warning(
+                    "Ad units of placement %s are unknown", target.id,
+                )
+            # Placements always include the descendants of their ad units
+            return {'adunit_tree': set(
+                a.id if isinstance(a, AdUnit) else a for a in adunits
+            )}
+
+        elif isinstance(target, Geography):
+            return {'geography': set([target.id])}
+
+        elif isinstance(target, Technology):
+            return {'technology': set([target.id])}
+
+        elif isinstance(target, Custom):
+            return {'custom': set([target.id])}
+
+        raise ParselmouthException(
+            "Cannot evaluate target: {0}".format(target)
+        )
+
+    def _compile_any(self, targets):
+        """
+        Compile the targets of an OR group into a single predicate
+
+        @param targets: list(ObjectModel)
+        @return: (function(dict) -> bool, frozenset)
+        """
+        ids_by_key = defaultdict(set)
+        for target in targets:
+            for key, ids in self._get_target_ids(target).items():
+                ids_by_key[key] |= ids
+
+        # DFP ANDs together the different kinds of technology
+        # targeting, e.g. a browser and an operating system, while
+        # parselmouth lists them in a single OR group
+        tech_types = set(
+            t.type for t in targets if isinstance(t, Technology)
+        )
+        if len(tech_types) > 1 and \
+                all(isinstance(t, Technology) for t in targets):
+            tests = [
+                _make_any_test(
+                    {'technology': set(t.id for t in targets if t.type == _type)}
+                )
+                for _type in tech_types
+            ]
+            return (
+                lambda features: all(test(features) for test in tests),
+                _make_bound(ids_by_key),
+            )
+
+        return _make_any_test(ids_by_key), _make_bound(ids_by_key)
+
+    def _compile_criterion(self, criterion):
+        """
+        Recursively compile a TargetingCriterion
+
+        @param criterion: TargetingCriterion
+        @return: (function(dict) -> bool, frozenset|None), the
+            predicate and its bound
+        """
+        operator, targets = criterion.get_data()
+        leaves = [t for t in targets if not isinstance(t, TargetingCriterion)]
+        compiled = [
+            self._compile_criterion(t)
+            for t in targets if isinstance(t, TargetingCriterion)
+        ]
+
+        if operator == TargetingCriterion.OPERATOR.AND:
+            compiled += [self._compile_any([l]) for l in leaves]
+            predicates = [p for p, _ in compiled]
+            bounds = [b for _, b in compiled if b is not None]
+            bound = min(bounds, key=len) if bounds else None
+            return (
+                lambda features: all(p(features) for p in predicates),
+                bound,
+            )
+
+        if leaves:
+            compiled.append(self._compile_any(leaves))
+        predicates = [p for p, _ in compiled]
+
+        if operator == TargetingCriterion.OPERATOR.NOT:
+            return (
+                lambda features: not any(p(features) for p in predicates),
+                None,
+            )
+
+        bounds = [b for _, b in compiled]
+        if None in bounds:
+            bound = None
+        else:
+            bound = frozenset().union(*bounds)
+        return (
+            lambda features: any(p(features) for p in predicates),
+            bound,
+        )
+
+    def compile(self, targeting):
+        """
+        Compile line item targeting into a predicate on impression
+        features
+
+        @param targeting: TargetingData|None
+        @return: CompiledTargeting
+        """
+        predicates = []
+        bounds = {}
+        for field in FEATURE_KEYS:
+            criterion = getattr(targeting, field, None) if targeting else None
+            if criterion:
+                predicate, bound = self._compile_criterion(criterion)
+                predicates.append(predicate)
+                bounds[field] = bound
+            else:
+                bounds[field] = None
+
+        return CompiledTargeting(predicates, bounds)
+
+    def matches(self, targeting, impression):
+        """
+        Check if an impression is eligible for the given targeting
+
+        @param targeting: TargetingData|CompiledTargeting|None
+        @param impression: ImpressionContext
+        @return: bool
+        """
+        if not isinstance(targeting, CompiledTargeting):
+            targeting = self.compile(targeting)
+        return targeting(self.get_features(impression))
+
+    def match_line_items(self, line_items, impressions):
+        """
+        Find the line items each impression is eligible for.
+
+        Line items are compiled once, and indexed on the ad unit,
+        geography and custom ids their targeting requires. For each
+        impression only the line items found through the index are
+        evaluated.
+
+        @param line_items: list(LineItem)
+        @param impressions: list(ImpressionContext)
+        @return: list(list(LineItem)), matching line items for each
+            impression, in the order given by line_items
+        """
+        compiled = [self.compile(l.targeting) for l in line_items]
+
+        # field -> (feature key, id) -> set(line item position)
+        index = dict((f, defaultdict(set)) for f in INDEXED_TARGETING_FIELDS)
+        # field -> set(line item position), line items not restricted
+        # by this field
+        unbounded = dict((f, set()) for f in INDEXED_TARGETING_FIELDS)
+        for position, _compiled in enumerate(compiled):
+            for field in INDEXED_TARGETING_FIELDS:
+                bound = _compiled.bounds[field]
+                if bound is None:
+                    unbounded[field].add(position)
+                else:
+                    for pair in bound:
+                        index[field][pair].add(position)
+
+        results = []
+        for impression in impressions:
+            features = self.get_features(impression)
+
+            candidates = None
+            for field in INDEXED_TARGETING_FIELDS:
+                field_candidates = set(unbounded[field])
+                for key in FEATURE_KEYS[field]:
+                    for _id in features[key]:
+                        field_candidates |= index[field].get((key, _id), set())
+
+                if candidates is None:
+                    candidates = field_candidates
+                else:
+                    candidates &= field_candidates
+                if not candidates:
+                    break
+
+            results.append([
+                line_items[position] for position in sorted(candidates)
+                if compiled[position](features)
+            ])
+
+        return results
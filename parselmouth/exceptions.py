@@ -10,9 +10,6 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-# Third Party Library Imports
-from stopit import TimeoutException
-
 
 class ParselmouthException(Exception):
     """ Base Exception for the Parselmouth project
@@ -24,9 +21,9 @@ class ParselmouthNetworkError(Exception):
     """
     pass
 
-class ParselmouthTimeout(TimeoutException):
+class ParselmouthTimeout(ParselmouthNetworkError):
     """
-    Raised when the block under context management takes longer to
-    complete than the allowed maximum timeout value.
+    Raised when a request is made, or fails, after the deadline set by
+    parselmouth.utils.timeout.Timeout
     """
     pass
@@ -0,0 +1,436 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Parselmouth - Metrics
+
+Instrumentation hooks for the requests Parselmouth makes to ad
+providers. Instrumented code reports timings and counters to a
+MetricsRegistry, which passes them on to its listeners. Listeners are
+functions of (metric type, name, value, tags), e.g. an InMemoryCollector
+keeping histograms of the metrics, or a StatsdExporter sending them to a
+StatsD server over UDP. Nothing is measured while a registry has no
+listeners.
+
+Example:
+    collector = InMemoryCollector()
+    METRICS.add_listener(collector)
+    METRICS.add_listener(StatsdExporter('localhost', 8125))
+    client.get_line_items()
+    collector.get_histogram('dfp.request', service='LineItemService',
+                            method='getLineItemsByStatement').mean
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import logging
+import random
+import re
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Parselmouth Imports
+from parselmouth.utils.enum import Enum
+
+
+MetricTypes = Enum([
+    'timing',
+    'counter',
+])
+"""
+Enum, types of the metrics reported to listeners. Timings are in
+seconds.
+"""
+
+HISTOGRAM_MAX_SAMPLES = 1024
+"""
+int, number of values a Histogram keeps to estimate percentiles
+"""
+
+STATSD_PREFIX = 'parselmouth'
+"""
+str, prefix of the names of the metrics sent to StatsD
+"""
+
+_STATSD_INVALID_CHARACTERS = re.compile(r'[^A-Za-z0-9_\-.]')
+
+
+def _get_tags_key(tags):
+    """
+    @param tags: dict
+    @return: tuple, hashable and order independent tags
+    """
+    return tuple(sorted(tags.items()))
+
+
+class MetricsRegistry(object):
+    """
+    Thread-safe registry passing the metrics reported by instrumented
+    code on to listeners
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Replaced rather than mutated, so it is read without the lock
+        self._listeners = ()
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "listeners={listeners}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            listeners=len(self._listeners),
+        )
+
+    @property
+    def enabled(self):
+        """
+        @return: bool, True if metrics are reported to any listener
+        """
+        return bool(self._listeners)
+
+    def add_listener(self, listener):
+        """
+        @param listener: function(MetricTypes, str, float, dict)
+        """
+        with self._lock:
+            self._listeners += (listener,)
+
+    def remove_listener(self, listener):
+        """
+        @param listener: function, added with add_listener
+        """
+        with self._lock:
+            self._listeners = tuple(
+                other for other in self._listeners if other != listener
+            )
+
+    def report(self, metric_type, name, value, **tags):
+        """
+        Pass a metric on to the listeners. Errors of listeners are
+        logged, they never fail the instrumented code.
+
+        @param metric_type: MetricTypes
+        @param name: str, e.g. 'dfp.request'
+        @param value: float
+        @param tags: dict, e.g. service='LineItemService'
+        """
+        for listener in self._listeners:
+            try:
+                listener(metric_type, name, value, tags)
+            except Exception:
+                logging.exception("Metrics listener %r failed", listener)
+
+    def timing(self, name, seconds, **tags):
+        """
+        @param name: str
+        @param seconds: float
+        @param tags: dict
+        """
+        self.report(MetricTypes.timing, name, seconds, **tags)
+
+    def increment(self, name, value=1, **tags):
+        """
+        @param name: str
+        @param value: int
+        @param tags: dict
+        """
+        self.report(MetricTypes.counter, name, value, **tags)
+
+    @contextmanager
+    def timer(self, name, **tags):
+        """
+        Report the time taken by a with block, whether it succeeds or not
+
+        @param name: str
+        @param tags: dict
+        @return: context manager
+        """
+        if not self._listeners:
+            yield
+            return
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.timing(name, time.time() - start, **tags)
+
+    def timed(self, name, **tags):
+        """
+        Decorator reporting the time taken by calls of a function, tagged
+        with the name of the function
+
+        @param name: str
+        @param tags: dict
+        @return: function(function) -> function
+        """
+        def decorator(function):
+            function_tags = dict(tags, function=function.__name__)
+
+            @wraps(function)
+            def timed_function(*args, **kwargs):
+                if not self._listeners:
+                    return function(*args, **kwargs)
+                with self.timer(name, **function_tags):
+                    return function(*args, **kwargs)
+            return timed_function
+        return decorator
+
+
+class Histogram(object):
+    """
+    Summary of the values of a metric. Percentiles are estimated from a
+    uniform sample of at most `max_samples` values.
+    """
+
+    def __init__(self, max_samples=HISTOGRAM_MAX_SAMPLES, random=random.random):
+        """
+        @param max_samples: int
+        @param random: function() -> float, random number in [0, 1)
+        """
+        self.max_samples = max_samples
+        self._random = random
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self._samples = []
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "count={count},"
+                "mean={mean},"
+                "max={max}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            count=self.count,
+            mean=self.mean,
+            max=self.max,
+        )
+
+    @property
+    def mean(self):
+        """
+        @return: float|None
+        """
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def add(self, value):
+        """
+        @param value: float
+        """
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        # Reservoir sampling
+        if len(self._samples) < self.max_samples:
+            self._samples.append(value)
+        else:
+            i = int(self._random() * self.count)
+            if i < self.max_samples:
+                self._samples[i] = value
+
+    def percentile(self, percent):
+        """
+        @param percent: float, between 0 and 100
+        @return: float|None
+        """
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        i = int(round(percent / 100 * (len(samples) - 1)))
+        return samples[i]
+
+    def to_doc(self):
+        """
+        @return: dict
+        """
+        return {
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+
+class InMemoryCollector(object):
+    """
+    Thread-safe metrics listener keeping a Histogram of each timing and
+    a total of each counter, per name and tags
+    """
+
+    def __init__(self, max_samples=HISTOGRAM_MAX_SAMPLES):
+        """
+        @param max_samples: int, see Histogram
+        """
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        # (name, tags key) -> Histogram
+        self._histograms = {}
+        # (name, tags key) -> int
+        self._counters = {}
+
+    def __call__(self, metric_type, name, value, tags):
+        """
+        @param metric_type: MetricTypes
+        @param name: str
+        @param value: float
+        @param tags: dict
+        """
+        key = (name, _get_tags_key(tags))
+        with self._lock:
+            if metric_type == MetricTypes.timing:
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(self.max_samples)
+                self._histograms[key].add(value)
+            else:
+                self._counters[key] = self._counters.get(key, 0) + value
+
+    def get_histogram(self, name, **tags):
+        """
+        @param name: str
+        @param tags: dict
+        @return: Histogram|None
+        """
+        with self._lock:
+            return self._histograms.get((name, _get_tags_key(tags)))
+
+    def get_count(self, name, **tags):
+        """
+        @param name: str
+        @param tags: dict
+        @return: int
+        """
+        with self._lock:
+            return self._counters.get((name, _get_tags_key(tags)), 0)
+
+    def snapshot(self):
+        """
+        @return: dict, with lists of the timings and counters collected,
+            each as a dict of its name, tags and values
+        """
+        with self._lock:
+            return {
+                'timings': [
+                    dict(histogram.to_doc(), name=name, tags=dict(tags))
+                    for (name, tags), histogram
+                    in sorted(self._histograms.items())
+                ],
+                'counters': [
+                    {'name': name, 'tags': dict(tags), 'value': value}
+                    for (name, tags), value in sorted(self._counters.items())
+                ],
+            }
+
+    def reset(self):
+        """
+        Forget the metrics collected
+        """
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+
+
+class StatsdExporter(object):
+    """
+    Metrics listener sending metrics to a StatsD server over UDP. StatsD
+    has no tags, so the values of the tags are appended to the name of
+    the metric, ordered by tag name, e.g.
+    `parselmouth.dfp.request.getLineItemsByStatement.LineItemService:35|ms`
+    """
+
+    def __init__(self, host='localhost', port=8125, prefix=STATSD_PREFIX):
+        """
+        @param host: str
+        @param port: int
+        @param prefix: str|None, prepended to the names of the metrics
+        """
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "host='{host}',"
+                "port={port}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            host=self.address[0],
+            port=self.address[1],
+        )
+
+    def format(self, metric_type, name, value, tags):
+        """
+        @param metric_type: MetricTypes
+        @param name: str
+        @param value: float
+        @param tags: dict
+        @return: str, StatsD line of the metric
+        """
+        parts = [self.prefix] if self.prefix else []
+        parts.append(name)
+        parts += [unicode(tag_value) for _, tag_value in sorted(tags.items())]
+        metric_name = _STATSD_INVALID_CHARACTERS.sub('_', '.'.join(parts))
+        if metric_type == MetricTypes.timing:
+            return '{0}:{1:d}|ms'.format(metric_name, int(round(value * 1000)))
+        return '{0}:{1}|c'.format(metric_name, value)
+
+    def __call__(self, metric_type, name, value, tags):
+        """
+        @param metric_type: MetricTypes
+        @param name: str
+        @param value: float
+        @param tags: dict
+        """
+        line = self.format(metric_type, name, value, tags)
+        try:
+            self._socket.sendto(line.encode('utf-8'), self.address)
+        except socket.error as e:
+            logging.debug("Failed to send metric %s to StatsD: %s", line, e)
+
+    def close(self):
+        self._socket.close()
+
+
+METRICS = MetricsRegistry()
+"""
+MetricsRegistry, registry Parselmouth reports metrics to by default
+"""
@@ -17,6 +17,9 @@ from abc import ABCMeta
 from pprint import pformat
 import logging
 
+# Parselmouth Imports
+from parselmouth.exceptions import ParselmouthException
+
 # Global Variable Definitions
 _class_name_map = None
 """
@@ -74,6 +77,50 @@ def _initialize_class_name_map():
     }
 
 
+def make_hashable(value):
+    """
+    Recursively convert a value into a hashable equivalent so that
+    containers like lists and dicts can take part in content-based
+    hashing. Lists keep their order since they are compared in order.
+
+    @param value: object
+    @return: hashable object
+    """
+    if isinstance(value, dict):
+        return frozenset(
+            (_key, make_hashable(_value)) for _key, _value in value.items()
+        )
+    elif isinstance(value, (list, tuple)):
+        return tuple(make_hashable(v) for v in value)
+    elif isinstance(value, (set, frozenset)):
+        return frozenset(make_hashable(v) for v in value)
+    return value
+
+
+def make_canonical(value):
+    """
+    Recursively convert a value into a hashable equivalent with a
+    deterministic ordering, so that it can be used as a sort key.
+    Unlike make_hashable, dicts and sets become sorted tuples since
+    frozensets are only partially ordered.
+
+    @param value: object
+    @return: hashable object
+    """
+    if hasattr(value, '_get_canonical_key'):
+        # ObjectModel or TargetingCriterion
+        return value._get_canonical_key()
+    elif isinstance(value, dict):
+        return tuple(sorted(
+            (_key, make_canonical(_value)) for _key, _value in value.items()
+        ))
+    elif isinstance(value, (list, tuple)):
+        return tuple(make_canonical(v) for v in value)
+    elif isinstance(value, (set, frozenset)):
+        return tuple(sorted(make_canonical(v) for v in value))
+    return value
+
+
 class ObjectModel(object):
     """
     Abstract Base for all parselmouth object models
@@ -111,44 +158,78 @@ class ObjectModel(object):
         @return: str
         """
         pretty = False
+        fields = self._get_fields()
         return "{class_name}({vars})".format(
             class_name=self.__class__.__name__,
-            vars=pformat(vars(self)) if pretty else str(vars(self))
+            vars=pformat(fields) if pretty else str(fields)
         )
 
     def __repr__(self):
         return str(self)
 
+    def __setattr__(self, key, value):
+        if self.__dict__.get('_frozen'):
+            raise ParselmouthException(
+                "Cannot set {0} on frozen {1}".format(
+                    key, self.__class__.__name__,
+                )
+            )
+        super(ObjectModel, self).__setattr__(key, value)
+
     def __ne__(self, other):
         return not(self == other)
 
     def __getitem__(self, key):
-        return vars(self)[key]
+        return self._get_fields()[key]
+
+    def _get_fields(self):
+        """
+        Get the model fields of this object. Private bookkeeping
+        attributes (prefixed with an underscore) are not fields.
+
+        @return: dict
+        """
+        return dict(
+            (_key, _value) for _key, _value in vars(self).items()
+            if not _key.startswith('_')
+        )
+
+    def _get_comparable_fields(self):
+        """
+        Get the fields of this object that take part in comparisons
+        and hashing
+
+        @return: dict
+        """
+        return dict(
+            (_key, _value) for _key, _value in self._get_fields().items()
+            if _key not in self.ignored_comparable_keys
+        )
 
     def __eq__(self, other):
         if isinstance(other, ObjectModel):
-            self_dict = vars(self)
-            other_dict = vars(other)
+            # Keys like "last_modified" that don't really communicate
+            # anything useful are left out of the comparison
+            self_dict = self._get_comparable_fields()
+            other_dict = other._get_comparable_fields()
             for _key, _value in self_dict.items():
-
-                # Skip comparison of keys like "last_modified" that
-                # don't really communicate anything useful
-                if _key in self.ignored_comparable_keys:
-                    continue
-
                 if _key not in other_dict:
                     logging.warning(
                         "{0} key is not in the other object".format(_key)
                     )
                     return False
-                elif other_dict.get(_key) != _value:
+                elif other_dict[_key] != _value:
                     logging.debug(
                         "Other value ({0}) does not equal this value ({1})".format(
-                            other_dict.get(_key),
+                            other_dict[_key],
                             _value
                         )
                     )
                     return False
+
+            if len(other_dict) != len(self_dict):
+                logging.warning("The other object has keys not in this object")
+                return False
             return True
         return NotImplemented
 
@@ -159,7 +240,7 @@ class ObjectModel(object):
         @return: dict
         """
         doc = {}
-        for _key, _value in vars(self).items():
+        for _key, _value in self._get_fields().items():
             if isinstance(_value, ObjectModel):
                 doc[_key] = _value.to_doc()
             else:
@@ -203,5 +284,58 @@ class ObjectModel(object):
 
         return _doc_cls(**params)
 
+    def freeze(self):
+        """
+        Make this object, and every ObjectModel nested in its fields,
+        immutable. Frozen objects cache their hash, which makes them
+        cheap to use in sets and as dictionary keys.
+
+        NOTE: Containers (lists, dicts) held in fields are not copied,
+            and must not be mutated once the object is frozen.
+
+        @return: ObjectModel, this object
+        """
+        for _value in self._get_fields().values():
+            if isinstance(_value, ObjectModel):
+                _value.freeze()
+        self.__dict__['_frozen'] = True
+        return self
+
+    @property
+    def is_frozen(self):
+        """
+        @return: bool
+        """
+        return self.__dict__.get('_frozen', False)
+
+    def _get_canonical_key(self):
+        """
+        Get a hashable, sortable key uniquely describing the comparable
+        content of this object. The key is cached on frozen objects.
+
+        @return: tuple
+        """
+        _key = self.__dict__.get('_canonical_key')
+        if _key is None:
+            _key = (
+                self.__class__.__name__,
+                make_canonical(self._get_comparable_fields()),
+            )
+            if self.is_frozen:
+                self.__dict__['_canonical_key'] = _key
+        return _key
+
     def __hash__(self):
-        return hash(frozenset(vars(self)))
+        """
+        Content-based hash consistent with __eq__: the hash is built
+        from the comparable fields only, so keys in
+        ignored_comparable_keys do not affect it.
+
+        @return: int
+        """
+        _hash = self.__dict__.get('_hash')
+        if _hash is None:
+            _hash = hash(make_hashable(self._get_comparable_fields()))
+            if self.is_frozen:
+                self.__dict__['_hash'] = _hash
+        return _hash
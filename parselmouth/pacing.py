@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Parselmouth - Pacing Analytics
+
+Delivery pacing of many line items at once. The delivery of a collection
+of line items is extracted into NumPy arrays, one value per line item,
+and pacing is computed over whole arrays rather than line item by line
+item:
+
+    * pace: actual over expected delivery percentage, as DeliveryMeta.pace
+    * projected delivery: impressions delivered by the end date at the
+      rate delivered so far
+    * required daily rate: impressions a day needed to meet the goal in
+      the time left
+    * under and over delivery: projected delivery outside of a tolerance
+      around the goal
+    * click through rate: as Stats.click_through_rate
+
+Projections are only made for lifetime impression goals. NumPy is an
+optional dependency, installed with `pip install parselmouth[pacing]`.
+
+Example:
+    delivery = DeliveryArrays.from_line_items(client.get_line_items())
+    pacing = compute_pacing(delivery)
+    pacing.get(LINE_ITEM_ID)['required_daily_rate']
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import calendar
+import time
+
+# Third Party Library Imports
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Parselmouth Imports
+from parselmouth.constants import ParselmouthReportMetrics
+from parselmouth.exceptions import ParselmouthException
+
+
+PACING_TOLERANCE = 0.1
+"""
+float, fraction of its goal a line item's projected delivery can be off
+by before it is flagged as under or over delivering
+"""
+
+SECONDS_PER_DAY = 24 * 60 * 60
+"""
+int, number of seconds in a day
+"""
+
+LIFETIME_IMPRESSION_GOAL = ('LIFETIME', 'IMPRESSIONS')
+"""
+tuple(str), goal type and unit type of the goals projections are made for
+"""
+
+PACING_FIELDS = [
+    'pace',
+    'projected_delivery',
+    'required_daily_rate',
+    'under_delivering',
+    'over_delivering',
+    'click_through_rate',
+]
+"""
+list(str), arrays of PacingResults
+"""
+
+
+def _check_numpy():
+    """
+    @raise ParselmouthException: if NumPy is not installed
+    """
+    if np is None:
+        raise ParselmouthException(
+            "Pacing analytics require NumPy: "
+            "pip install parselmouth[pacing]"
+        )
+
+
+def _to_timestamp(dt):
+    """
+    @param dt: datetime|None, timezone aware
+    @return: float, seconds since the epoch, NaN if dt is None
+    """
+    if dt is None:
+        return float('nan')
+    return calendar.timegm(dt.utctimetuple()) + dt.microsecond / 1e6
+
+
+def _get_lifetime_goal(goal):
+    """
+    @param goal: Goal|None
+    @return: float, number of impressions of a lifetime impression goal,
+        NaN for other goals, e.g. daily or unlimited goals
+    """
+    if goal is None or goal.units is None or goal.units <= 0:
+        return float('nan')
+    if (goal.goal_type, goal.unit_type) != LIFETIME_IMPRESSION_GOAL:
+        return float('nan')
+    return float(goal.units)
+
+
+class DeliveryArrays(object):
+    """
+    Delivery of a collection of line items as NumPy arrays aligned with
+    ids: the values of a line item are at the same index in every array.
+    Missing values are NaN.
+    """
+
+    def __init__(self,
+                 ids,
+                 impressions,
+                 clicks,
+                 goal_units=None,
+                 start=None,
+                 end=None,
+                 actual_delivery_percent=None,
+                 expected_delivery_percent=None):
+        """
+        @param ids: list(str|int), line item ids
+        @param impressions: array-like(float), impressions delivered
+        @param clicks: array-like(float), clicks delivered
+        @param goal_units: array-like(float)|None, impressions of
+            lifetime impression goals
+        @param start: array-like(float)|None, start of the line items,
+            in seconds since the epoch
+        @param end: array-like(float)|None, end of the line items, in
+            seconds since the epoch
+        @param actual_delivery_percent: array-like(float)|None, see
+            DeliveryMeta
+        @param expected_delivery_percent: array-like(float)|None, see
+            DeliveryMeta
+        """
+        _check_numpy()
+        self.ids = [unicode(line_item_id) for line_item_id in ids]
+
+        def to_array(values):
+            if values is None:
+                return np.full(len(self.ids), np.nan)
+            array = np.asarray(values, dtype=np.float64)
+            assert array.shape == (len(self.ids),)
+            return array
+
+        self.impressions = to_array(impressions)
+        self.clicks = to_array(clicks)
+        self.goal_units = to_array(goal_units)
+        self.start = to_array(start)
+        self.end = to_array(end)
+        self.actual_delivery_percent = to_array(actual_delivery_percent)
+        self.expected_delivery_percent = to_array(expected_delivery_percent)
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "line_items={line_items}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            line_items=len(self),
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_line_items(cls, line_items):
+        """
+        @param line_items: list(LineItem)
+        @return: DeliveryArrays
+        """
+        _check_numpy()
+        deliveries = [line_item.delivery for line_item in line_items]
+        stats = [delivery.stats if delivery else None for delivery in deliveries]
+        return cls(
+            ids=[line_item.id for line_item in line_items],
+            impressions=[s.impressions if s else np.nan for s in stats],
+            clicks=[s.clicks if s else np.nan for s in stats],
+            goal_units=[
+                _get_lifetime_goal(line_item.primary_goal)
+                for line_item in line_items
+            ],
+            start=[_to_timestamp(line_item.start) for line_item in line_items],
+            end=[_to_timestamp(line_item.end) for line_item in line_items],
+            actual_delivery_percent=[
+                d.actual_delivery_percent if d else np.nan for d in deliveries
+            ],
+            expected_delivery_percent=[
+                d.expected_delivery_percent if d else np.nan for d in deliveries
+            ],
+        )
+
+    @classmethod
+    def from_report_rows(cls, rows, line_items=None):
+        """
+        Get the delivery of the line items of a report, e.g. a lifetime
+        report from Parselmouth.get_line_item_report, with the goals and
+        flight dates of the given line items
+
+        @param rows: list(dict), with keys ParselmouthReportMetrics
+            line_item_id, ad_impressions and optionally ad_clicks
+        @param line_items: list(LineItem)|None, line items of the
+            report. The goals and dates of the others are NaN.
+        @return: DeliveryArrays
+        """
+        _check_numpy()
+        delivery = cls(
+            ids=[row[ParselmouthReportMetrics.line_item_id] for row in rows],
+            impressions=[
+                row.get(ParselmouthReportMetrics.ad_impressions, np.nan)
+                for row in rows
+            ],
+            clicks=[
+                row.get(ParselmouthReportMetrics.ad_clicks, np.nan)
+                for row in rows
+            ],
+        )
+        if line_items:
+            rows_by_id = dict(
+                (line_item_id, i) for i, line_item_id in enumerate(delivery.ids)
+            )
+            for line_item in line_items:
+                i = rows_by_id.get(unicode(line_item.id))
+                if i is None:
+                    continue
+                delivery.goal_units[i] = _get_lifetime_goal(line_item.primary_goal)
+                delivery.start[i] = _to_timestamp(line_item.start)
+                delivery.end[i] = _to_timestamp(line_item.end)
+        return delivery
+
+
+class PacingResults(object):
+    """
+    Pacing of a collection of line items, as NumPy arrays aligned with
+    ids, see PACING_FIELDS
+    """
+
+    def __init__(self,
+                 ids,
+                 pace,
+                 projected_delivery,
+                 required_daily_rate,
+                 under_delivering,
+                 over_delivering,
+                 click_through_rate):
+        """
+        @param ids: list(str), line item ids
+        @param pace: array(float), actual over expected delivery
+            percentage, 0 if either is unknown
+        @param projected_delivery: array(float), impressions delivered by
+            the end of the line items at their current rate, NaN without
+            a lifetime impression goal or before their start
+        @param required_daily_rate: array(float), impressions a day needed
+            to meet the goals, NaN without a lifetime impression goal or
+            once ended
+        @param under_delivering: array(bool)
+        @param over_delivering: array(bool)
+        @param click_through_rate: array(float), 0 without impressions
+        """
+        self.ids = ids
+        self.pace = pace
+        self.projected_delivery = projected_delivery
+        self.required_daily_rate = required_daily_rate
+        self.under_delivering = under_delivering
+        self.over_delivering = over_delivering
+        self.click_through_rate = click_through_rate
+        self._indexes = dict((line_item_id, i) for i, line_item_id in enumerate(ids))
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "line_items={line_items},"
+                "under_delivering={under_delivering},"
+                "over_delivering={over_delivering}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            line_items=len(self),
+            under_delivering=int(self.under_delivering.sum()),
+            over_delivering=int(self.over_delivering.sum()),
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get(self, line_item_id):
+        """
+        @param line_item_id: str|int
+        @return: dict|None, field of PACING_FIELDS -> value for the line
+            item, None if it is not in the results
+        """
+        i = self._indexes.get(unicode(line_item_id))
+        if i is None:
+            return None
+        return dict(
+            (field, getattr(self, field)[i].item()) for field in PACING_FIELDS
+        )
+
+    def to_dict(self):
+        """
+        @return: dict, line item id -> see get
+        """
+        return dict(
+            (line_item_id, self.get(line_item_id)) for line_item_id in self.ids
+        )
+
+    def get_under_delivering_ids(self):
+        """
+        @return: list(str)
+        """
+        return [self.ids[i] for i in np.flatnonzero(self.under_delivering)]
+
+    def get_over_delivering_ids(self):
+        """
+        @return: list(str)
+        """
+        return [self.ids[i] for i in np.flatnonzero(self.over_delivering)]
+
+
+def compute_pacing(delivery, now=None, tolerance=PACING_TOLERANCE):
+    """
+    Compute the pacing of a collection of line items
+
+    @param delivery: DeliveryArrays
+    @param now: float|None, seconds since the epoch, defaults to the
+        current time
+    @param tolerance: float, see PACING_TOLERANCE
+    @return: PacingResults
+    """
+    _check_numpy()
+    now = time.time() if now is None else now
+    impressions = delivery.impressions
+    goal = delivery.goal_units
+
+    # Invalid operations give NaN, or 0 where replaced below
+    with np.errstate(divide='ignore', invalid='ignore'):
+        actual = delivery.actual_delivery_percent
+        expected = delivery.expected_delivery_percent
+        pace = np.where(
+            (actual > 0) & (expected > 0), actual / expected, 0.0,
+        )
+
+        ctr = np.where(
+            impressions > 0, delivery.clicks / impressions, 0.0,
+        )
+
+        duration = delivery.end - delivery.start
+        elapsed = np.clip(now - delivery.start, 0, duration)
+        projected = np.where(
+            (elapsed > 0) & ~np.isnan(goal),
+            impressions * duration / elapsed,
+            np.nan,
+        )
+
+        remaining_days = (delivery.end - np.maximum(now, delivery.start)) \
+            / SECONDS_PER_DAY
+        required = np.where(
+            remaining_days > 0,
+            np.maximum(goal - impressions, 0) / remaining_days,
+            np.nan,
+        )
+
+        # Comparisons with NaN are False, so line items without a
+        # projection are never flagged
+        under = projected < goal * (1 - tolerance)
+        over = projected > goal * (1 + tolerance)
+
+    return PacingResults(
+        ids=delivery.ids,
+        pace=pace,
+        projected_delivery=projected,
+        required_daily_rate=required,
+        under_delivering=under,
+        over_delivering=over,
+        click_through_rate=ctr,
+    )
@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Parselmouth - Client Pool
+
+Manage Parselmouth clients for many ad provider networks. Clients are
+created on first use and evicted when idle. Networks accessed with the
+same credentials share a single OAuth2 client, and the number of
+concurrent calls is bounded both globally and per network.
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from Queue import Queue
+
+# Parselmouth Imports
+from parselmouth.base import Parselmouth
+from parselmouth.constants import ParselmouthProviders
+
+
+OAUTH2_CREDENTIAL_KEYS = ['client_id', 'client_secret', 'refresh_token']
+"""
+list(str), credentials identifying an OAuth2 client
+"""
+
+
+def get_dfp_provider_options(pool, config, network_timezone):
+    """
+    @param pool: ParselmouthPool
+    @param config: ParselmouthConfig, configuration of a DFP network
+    @param network_timezone: pytz.timezone|None
+    @return: dict, provider_options of the DFPInterface of the network,
+        sharing its OAuth2 client with the other networks of the pool
+    """
+    return {
+        'oauth2_client': pool._get_oauth2_client(
+            config.get_credentials_arguments()
+        ),
+        'network_timezone': network_timezone,
+    }
+
+
+POOL_PROVIDER_OPTIONS_MAP = {
+    ParselmouthProviders.google_dfp_premium: get_dfp_provider_options,
+    ParselmouthProviders.google_dfp_small_business: get_dfp_provider_options,
+}
+"""
+dict, ad service provider -> function(ParselmouthPool, ParselmouthConfig,
+pytz.timezone|None) -> dict, giving the provider_options of the clients
+of a pool. Clients of other providers get no provider options.
+"""
+
+
+class ParselmouthPool(object):
+    """
+    Pool of Parselmouth clients, one per network
+
+    Example:
+        pool = ParselmouthPool(get_config)
+        with pool.session(NETWORK_CODE) as client:
+            line_items = client.get_line_items()
+    """
+
+    def __init__(self,
+                 get_config,
+                 max_concurrency=10,
+                 max_network_concurrency=2,
+                 idle_timeout=60 * 30,
+                 network_timeout=60 * 10,
+                 client_factory=None):
+        """
+        @param get_config: function(str) -> ParselmouthConfig, gives the
+            configuration of a network given its network code
+        @param max_concurrency: int, maximum number of sessions open at
+            once across all networks
+        @param max_network_concurrency: int, maximum number of sessions
+            open at once for a single network
+        @param idle_timeout: int, number of seconds after which a client
+            which isn't used is evicted
+        @param network_timeout: int, see Parselmouth
+        @param client_factory: function(str) -> Parselmouth|None, creates
+            the client of a network. Defaults to create_client
+        """
+        self._get_config = get_config
+        self.max_concurrency = max_concurrency
+        self.max_network_concurrency = max_network_concurrency
+        self.idle_timeout = idle_timeout
+        self.network_timeout = network_timeout
+        self._client_factory = client_factory or self.create_client
+
+        self._lock = threading.Lock()
+        self._global_slots = threading.BoundedSemaphore(max_concurrency)
+        # network code -> BoundedSemaphore
+        self._network_slots = {}
+        # network code -> Lock, held while the network's client is built
+        self._network_locks = defaultdict(threading.Lock)
+        # network code -> Parselmouth
+        self._clients = {}
+        # network code -> time the client was last used
+        self._last_used = {}
+        # network code -> number of open sessions
+        self._in_use = defaultdict(int)
+        # OAUTH2_CREDENTIAL_KEYS values -> OAuth2 client
+        self._oauth2_clients = {}
+        # network code -> pytz.timezone, kept when clients are evicted
+        self._timezones = {}
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "clients={clients}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            clients=len(self._clients),
+        )
+
+    def _get_oauth2_client(self, credentials):
+        """
+        @param credentials: dict, see ParselmouthConfig.get_credentials_arguments
+        @return: googleads.oauth2.GoogleRefreshTokenClient
+        """
+        # Imported here so that importing the pool doesn't import googleads
+        from parselmouth.adapters.dfp.client import get_oauth2_client
+
+        key = tuple(credentials[k] for k in OAUTH2_CREDENTIAL_KEYS)
+        with self._lock:
+            if key not in self._oauth2_clients:
+                self._oauth2_clients[key] = get_oauth2_client(*key)
+            return self._oauth2_clients[key]
+
+    def create_client(self, network_code):
+        """
+        Create the client of a network, sharing its OAuth2 client with
+        the other networks of the pool. Clients connect on first use,
+        and networks whose timezone is known are not accessed again to
+        check their configuration.
+
+        @param network_code: str
+        @return: Parselmouth
+        """
+        config = self._get_config(network_code)
+        timezone = self._timezones.get(network_code)
+        get_provider_options = POOL_PROVIDER_OPTIONS_MAP.get(
+            config.provider_name
+        )
+        return Parselmouth(
+            config,
+            network_timeout=self.network_timeout,
+            provider_options=(
+                get_provider_options(self, config, timezone)
+                if get_provider_options else None
+            ),
+            lazy=True,
+            network_timezone=timezone,
+        )
+
+    def get_client(self, network_code):
+        """
+        Get the client of a network, creating it if needed. Prefer
+        session, which bounds concurrency.
+
+        @param network_code: str
+        @return: Parselmouth
+        """
+        client = self._clients.get(network_code)
+        if client is not None:
+            return client
+
+        # Only build each network's client once, without blocking the
+        # other networks while it's being built
+        with self._lock:
+            network_lock = self._network_locks[network_code]
+        with network_lock:
+            client = self._clients.get(network_code)
+            if client is None:
+                logging.info("Creating client for network %s", network_code)
+                client = self._client_factory(network_code)
+                with self._lock:
+                    self._clients[network_code] = client
+                    self._last_used[network_code] = time.time()
+        return client
+
+    def _keep_timezone(self, network_code, client):
+        """
+        Remember the timezone of a network once its client knows it, so
+        that it isn't fetched again by the clients created after the
+        client is evicted
+
+        @param network_code: str
+        @param client: Parselmouth
+        """
+        timezone = client.network_timezone
+        if timezone is not None:
+            self._timezones[network_code] = timezone
+
+    def _get_network_slots(self, network_code):
+        """
+        @param network_code: str
+        @return: threading.BoundedSemaphore
+        """
+        with self._lock:
+            if network_code not in self._network_slots:
+                self._network_slots[network_code] = \
+                    threading.BoundedSemaphore(self.max_network_concurrency)
+            return self._network_slots[network_code]
+
+    @contextmanager
+    def session(self, network_code):
+        """
+        Context manager giving the client of a network, blocking until
+        the concurrency limits allow another session
+
+        @param network_code: str
+        @return: Parselmouth
+        """
+        network_slots = self._get_network_slots(network_code)
+        # Wait on the network first so that sessions waiting for a busy
+        # network do not hold global slots
+        with network_slots:
+            with self._global_slots:
+                with self._lock:
+                    self._in_use[network_code] += 1
+                client = self.get_client(network_code)
+                try:
+                    yield client
+                finally:
+                    self._keep_timezone(network_code, client)
+                    with self._lock:
+                        self._in_use[network_code] -= 1
+                        self._last_used[network_code] = time.time()
+
+        self.evict_idle()
+
+    def get_network_timezone(self, network_code):
+        """
+        @param network_code: str
+        @return: pytz.timezone
+        """
+        timezone = self._timezones.get(network_code)
+        if timezone is None:
+            with self.session(network_code) as client:
+                timezone = client.get_network_timezone()
+            self._timezones[network_code] = timezone
+        return timezone
+
+    def evict_idle(self, now=None):
+        """
+        Drop the clients of networks which have not been used for
+        idle_timeout seconds
+
+        @param now: float|None, current time
+        @return: list(str), network codes of the evicted clients
+        """
+        now = time.time() if now is None else now
+        evicted = []
+        with self._lock:
+            for network_code, last_used in self._last_used.items():
+                if self._in_use[network_code] or \
+                        now - last_used < self.idle_timeout:
+                    continue
+                client = self._clients.pop(network_code, None)
+                if client is not None:
+                    self._keep_timezone(network_code, client)
+                del self._last_used[network_code]
+                evicted.append(network_code)
+
+        if evicted:
+            logging.info("Evicted idle clients for networks %s", evicted)
+        return evicted
+
+    def map(self, function, network_codes):
+        """
+        Call a function with the client of each network, running calls
+        for different networks concurrently within the pool's limits
+
+        @param function: function(Parselmouth)
+        @param network_codes: list(str)
+        @return: (dict, dict), network code -> result of the function,
+            and network code -> exception for the calls that failed
+        """
+        results = {}
+        errors = {}
+        queue = Queue()
+        for network_code in network_codes:
+            queue.put(network_code)
+
+        def work():
+            while True:
+                network_code = queue.get()
+                if network_code is None:
+                    return
+                try:
+                    with self.session(network_code) as client:
+                        results[network_code] = function(client)
+                except Exception as e:
+                    logging.exception(
+                        "Call failed for network %s", network_code,
+                    )
+                    errors[network_code] = e
+
+        num_workers = min(self.max_concurrency, len(network_codes))
+        for _ in range(num_workers):
+            queue.put(None)
+        workers = [threading.Thread(target=work) for _ in range(num_workers)]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        return results, errors
@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Parselmouth - Retries
+
+Retry policy shared by the Parselmouth facade and the provider adapters.
+Failed requests are classified as retryable or fatal, retryable failures
+are retried with exponential backoff and jitter, and a retry budget
+stops retries from multiplying the load on a provider during an outage.
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import httplib
+import logging
+import random
+import socket
+import threading
+import time
+import urllib2
+from collections import deque
+
+# Parselmouth Imports
+from parselmouth.constants import MAX_REQUEST_ATTEMPTS
+from parselmouth.constants import RETRY_BASE_DELAY
+from parselmouth.constants import RETRY_BUDGET_MIN_RETRIES
+from parselmouth.constants import RETRY_BUDGET_RATIO
+from parselmouth.constants import RETRY_BUDGET_WINDOW
+from parselmouth.constants import RETRY_HTTP_CODES
+from parselmouth.constants import RETRY_MAX_DELAY
+from parselmouth.exceptions import ParselmouthNetworkError
+from parselmouth.exceptions import ParselmouthTimeout
+from parselmouth.metrics import METRICS
+from parselmouth.utils.timeout import get_deadline
+
+
+def is_network_error(error):
+    """
+    @param error: Exception
+    @return: bool, True for network errors raised by Parselmouth
+    """
+    return isinstance(error, (ParselmouthNetworkError, ParselmouthTimeout))
+
+
+def is_transient_error(error):
+    """
+    @param error: Exception
+    @return: bool, True for network errors, timeouts and HTTP errors
+        which may succeed when retried
+    """
+    if isinstance(error, urllib2.HTTPError):
+        return error.code in RETRY_HTTP_CODES
+    return is_network_error(error) or isinstance(error, (
+        socket.error,
+        httplib.HTTPException,
+        urllib2.URLError,
+    ))
+
+
+class RetryBudget(object):
+    """
+    Thread-safe limit on the number of retries made over a sliding
+    window of time, as a ratio of the number of requests made
+    """
+
+    def __init__(self,
+                 ratio=RETRY_BUDGET_RATIO,
+                 min_retries=RETRY_BUDGET_MIN_RETRIES,
+                 window=RETRY_BUDGET_WINDOW,
+                 clock=time.time):
+        """
+        @param ratio: float, number of retries allowed per request
+        @param min_retries: int, number of retries allowed in a window
+            regardless of the number of requests
+        @param window: int, number of seconds over which requests and
+            retries are counted
+        @param clock: function() -> float, current time in seconds
+        """
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._requests = deque()
+        self._retries = deque()
+
+    def _expire(self, now):
+        """
+        @param now: float
+        """
+        for times in [self._requests, self._retries]:
+            while times and times[0] <= now - self.window:
+                times.popleft()
+
+    def record_request(self):
+        """
+        Count a request made
+        """
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            self._requests.append(now)
+
+    def withdraw(self):
+        """
+        Count a retry if the budget allows it
+
+        @return: bool, False if the budget is exhausted
+        """
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            allowed = self.min_retries + self.ratio * len(self._requests)
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+
+class RetryPolicy(object):
+    """
+    Calls functions, retrying retryable failures with exponential
+    backoff and full jitter. Calls are not retried past the deadline of
+    the current thread, see parselmouth.utils.timeout.
+
+    Example:
+        policy = RetryPolicy(max_attempts=5)
+        line_items = policy.call(service.getLineItemsByStatement, statement)
+    """
+
+    def __init__(self,
+                 max_attempts=MAX_REQUEST_ATTEMPTS,
+                 base_delay=RETRY_BASE_DELAY,
+                 max_delay=RETRY_MAX_DELAY,
+                 jitter=True,
+                 budget=None,
+                 is_retryable=is_transient_error,
+                 sleep=time.sleep,
+                 random=random.random,
+                 metrics=None):
+        """
+        @param max_attempts: int, number of attempts made before giving up
+        @param base_delay: float, number of seconds to wait before the
+            first retry, doubled on each following retry
+        @param max_delay: float, maximum number of seconds between attempts
+        @param jitter: bool, wait a random time between 0 and the delay,
+            so that clients failing together do not retry together
+        @param budget: RetryBudget|None, defaults to a budget of this policy
+        @param is_retryable: function(Exception) -> bool, classifies errors
+            into retryable and fatal ones
+        @param sleep: function(float), wait for a number of seconds
+        @param random: function() -> float, random number in [0, 1)
+        @param metrics: MetricsRegistry|None, registry the retries are
+            counted in, defaults to parselmouth.metrics.METRICS
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.budget = budget or RetryBudget()
+        self.is_retryable = is_retryable
+        self._sleep = sleep
+        self._random = random
+        self.metrics = metrics or METRICS
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "max_attempts={max_attempts},"
+                "base_delay={base_delay},"
+                "max_delay={max_delay}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            max_attempts=self.max_attempts,
+            base_delay=self.base_delay,
+            max_delay=self.max_delay,
+        )
+
+    def get_delay(self, attempt):
+        """
+        @param attempt: int, number of the attempt which failed, from 1
+        @return: float, number of seconds to wait before the next attempt
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        if self.jitter:
+            delay *= self._random()
+        return delay
+
+    def call(self, function, *args, **kwargs):
+        """
+        Call a function, retrying it when it raises a retryable error
+
+        @param function: function
+        @return: result of the function
+        """
+        return self.run(function, args, kwargs)
+
+    def run(self, function, args=(), kwargs=None, tags=None):
+        """
+        Call a function, retrying it when it raises a retryable error
+
+        @param function: function
+        @param args: tuple, positional arguments of the function
+        @param kwargs: dict|None, keyword arguments of the function
+        @param tags: dict|None, tags of the retries counted in the
+            metrics, e.g. the service called
+        @return: result of the function
+        """
+        kwargs = kwargs or {}
+        self.budget.record_request()
+        attempt = 1
+        while True:
+            try:
+                return function(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_attempts or not self.is_retryable(e):
+                    raise
+                if not self.budget.withdraw():
+                    logging.warning("Retry budget exhausted, not retrying")
+                    raise
+                delay = self.get_delay(attempt)
+                deadline = get_deadline()
+                if deadline is not None and time.time() + delay >= deadline:
+                    logging.warning("Not retrying past the deadline")
+                    raise
+                logging.warning(
+                    "Attempt %d of %d failed with %r, retrying in %.1fs",
+                    attempt, self.max_attempts, e, delay,
+                )
+                self.metrics.increment(
+                    'retries', error=e.__class__.__name__, **(tags or {})
+                )
+            self._sleep(delay)
+            attempt += 1
+
+
+class RetryingService(object):
+    """
+    Wraps a service so that its methods are called through a RetryPolicy
+    """
+
+    def __init__(self, service, policy, tags=None, is_retryable_method=None):
+        """
+        @param service: object, e.g. a googleads service
+        @param policy: RetryPolicy
+        @param tags: dict|None, tags of the retries counted in the
+            metrics, along with the name of the method retried
+        @param is_retryable_method: function(str) -> bool|None, whether
+            a method can be retried given its name, e.g. not methods
+            which may have taken effect when they fail. All methods are
+            retried if None.
+        """
+        self.service = service
+        self.policy = policy
+        self.tags = tags or {}
+        self.is_retryable_method = is_retryable_method
+
+    def __getattr__(self, name):
+        attribute = getattr(self.service, name)
+        if not callable(attribute):
+            return attribute
+        if self.is_retryable_method is not None \
+                and not self.is_retryable_method(name):
+            return attribute
+
+        def retried(*args, **kwargs):
+            return self.policy.run(
+                attribute, args, kwargs, dict(self.tags, method=name),
+            )
+        return retried
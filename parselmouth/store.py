@@ -0,0 +1,553 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Parselmouth - Object Stores
+
+Local copies of delivery objects (campaigns, line items and creatives)
+pulled from ad providers, kept per network. Stores also remember the
+sync watermark of each type of object, see parselmouth.sync.
+
+SQLiteStore persists objects in a SQLite database, with indexes to
+answer queries shaped like the filter_kwargs of Parselmouth getters
+without going to the ad provider.
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import cPickle as pickle
+import sqlite3
+import threading
+from abc import ABCMeta
+from abc import abstractmethod
+from collections import defaultdict
+from datetime import datetime
+
+# Third Party Library Imports
+import pytz
+
+# Parselmouth Imports
+from parselmouth.constants import ParselmouthEntityTypes
+from parselmouth.constants import QUERY_OPERATORS
+from parselmouth.exceptions import ParselmouthException
+from parselmouth.model import ObjectModel
+from parselmouth.targeting_index import get_target_key
+from parselmouth.targeting_index import get_targeting_keys
+
+
+STORE_COLUMNS = [
+    'campaign_id',
+    'advertiser_id',
+    'status',
+    'start',
+    'end',
+    'last_modified',
+]
+"""
+list(str), object fields stored in their own indexed columns
+"""
+
+STORE_ENTITY_COLUMNS = {
+    ParselmouthEntityTypes.campaign: [
+        'advertiser_id',
+        'status',
+        'start',
+        'end',
+        'last_modified',
+    ],
+    ParselmouthEntityTypes.line_item: [
+        'campaign_id',
+        'status',
+        'start',
+        'end',
+        'last_modified',
+    ],
+    ParselmouthEntityTypes.creative: [
+        'advertiser_id',
+        'last_modified',
+    ],
+}
+"""
+dict, entity type -> list(str), columns of STORE_COLUMNS filled in by
+the fields of the objects of the entity type
+"""
+
+STORE_JOINED_COLUMNS = {
+    ParselmouthEntityTypes.line_item: {
+        'advertiser_id': (ParselmouthEntityTypes.campaign, 'campaign_id'),
+    },
+}
+"""
+dict, entity type -> column -> (entity type, column), columns read from
+the row of a related object, e.g. line items have the advertiser of
+their campaign
+"""
+
+STORE_FILTER_COLUMN_MAP = {
+    'id': 'id',
+    'orderid': 'campaign_id',
+    'advertiserid': 'advertiser_id',
+    'status': 'status',
+    'startdatetime': 'start',
+    'enddatetime': 'end',
+    'lastmodifieddatetime': 'last_modified',
+}
+"""
+dict, lower cased PQL field name -> column, for the filter keywords
+SQLiteStore can answer
+"""
+
+STORE_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+"""
+str, format of datetimes stored in SQLite. Datetimes are stored in UTC
+so that they compare correctly as strings
+"""
+
+SQLITE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS objects (
+        network_code TEXT NOT NULL,
+        entity_type TEXT NOT NULL,
+        id TEXT NOT NULL,
+        campaign_id TEXT,
+        advertiser_id TEXT,
+        status TEXT,
+        start TEXT,
+        end TEXT,
+        last_modified TEXT,
+        doc BLOB NOT NULL,
+        PRIMARY KEY (network_code, entity_type, id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS targets (
+        network_code TEXT NOT NULL,
+        entity_type TEXT NOT NULL,
+        id TEXT NOT NULL,
+        target_type TEXT NOT NULL,
+        target_id TEXT NOT NULL,
+        excluded INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS watermarks (
+        network_code TEXT NOT NULL,
+        entity_type TEXT NOT NULL,
+        watermark BLOB NOT NULL,
+        PRIMARY KEY (network_code, entity_type)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS targets_target
+    ON targets (network_code, entity_type, target_type, target_id, excluded)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS targets_object
+    ON targets (network_code, entity_type, id)
+    """,
+] + [
+    """
+    CREATE INDEX IF NOT EXISTS objects_{0}
+    ON objects (network_code, entity_type, {0})
+    """.format(_column)
+    for _column in STORE_COLUMNS
+]
+"""
+list(str), statements creating the SQLiteStore tables and indexes
+"""
+
+
+def _to_sql_value(val):
+    """
+    Convert an object field or a filter value to its stored
+    representation
+
+    @param val: datetime|str|int|None
+    @return: str|None
+    """
+    if val is None:
+        return None
+    elif isinstance(val, datetime):
+        if val.tzinfo:
+            val = val.astimezone(pytz.utc)
+        return val.strftime(STORE_DATETIME_FORMAT)
+    elif isinstance(val, basestring):
+        # PQL string literals are quoted
+        return val.strip("'")
+    return unicode(val)
+
+
+class AbstractStore(object):
+    """
+    Abstract interface to local object stores
+
+    Objects are stored by network code, entity type
+    (ParselmouthEntityTypes) and id.
+    """
+    __metaclass__ = ABCMeta
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+        )
+
+    @abstractmethod
+    def get_watermark(self, network_code, entity_type):
+        """
+        @param network_code: str
+        @param entity_type: ParselmouthEntityTypes
+        @return: datetime|None, last modification time of the most
+            recently modified object synced
+        """
+        pass
+
+    @abstractmethod
+    def set_watermark(self, network_code, entity_type, watermark):
+        """
+        @param network_code: str
+        @param entity_type: ParselmouthEntityTypes
+        @param watermark: datetime
+        """
+        pass
+
+    @abstractmethod
+    def get_objects(self, network_code, entity_type, ids=None):
+        """
+        @param network_code: str
+        @param entity_type: ParselmouthEntityTypes
+        @param ids: list(str)|None, ids of the objects to get, or None
+            to get all objects of the entity type
+        @return: dict, id -> ObjectModel, for the ids found
+        """
+        pass
+
+    @abstractmethod
+    def put_objects(self, network_code, entity_type, objects):
+        """
+        Insert objects, replacing stored objects with the same id
+
+        @param network_code: str
+        @param entity_type: ParselmouthEntityTypes
+        @param objects: list(ObjectModel)
+        """
+        pass
+
+    @abstractmethod
+    def remove_objects(self, network_code, entity_type, ids):
+        """
+        @param network_code: str
+        @param entity_type: ParselmouthEntityTypes
+        @param ids: list(str)
+        """
+        pass
+
+
+class MemoryStore(AbstractStore):
+    """
+    Store keeping objects in memory
+    """
+
+    def __init__(self):
+        # (network code, entity type) -> id -> ObjectModel
+        self._objects = defaultdict(dict)
+        # (network code, entity type) -> datetime
+        self._watermarks = {}
+
+    def get_watermark(self, network_code, entity_type):
+        return self._watermarks.get((network_code, entity_type))
+
+    def set_watermark(self, network_code, entity_type, watermark):
+        self._watermarks[(network_code, entity_type)] = watermark
+
+    def get_objects(self, network_code, entity_type, ids=None):
+        objects = self._objects[(network_code, entity_type)]
+        if ids is None:
+            return dict(objects)
+        return dict(
+            (_id, objects[_id]) for _id in ids if _id in objects
+        )
+
+    def put_objects(self, network_code, entity_type, objects):
+        stored = self._objects[(network_code, entity_type)]
+        for obj in objects:
+            stored[obj.id] = obj
+
+    def remove_objects(self, network_code, entity_type, ids):
+        stored = self._objects[(network_code, entity_type)]
+        for _id in ids:
+            stored.pop(_id, None)
+
+
+class SQLiteStore(AbstractStore):
+    """
+    Store persisting objects in a SQLite database
+
+    Objects are indexed on their campaign, advertiser, status, dates and
+    included/excluded targeting, see query.
+    """
+
+    def __init__(self, path=':memory:'):
+        """
+        @param path: str, path of the database file
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            for statement in SQLITE_SCHEMA:
+                self._connection.execute(statement)
+
+    def __repr__(self):
+        return "{class_name}(path='{path}')".format(
+            class_name=self.__class__.__name__,
+            path=self.path,
+        )
+
+    def close(self):
+        self._connection.close()
+
+    def _execute(self, statement, params=()):
+        """
+        @param statement: str
+        @param params: tuple|list
+        @return: list(tuple)
+        """
+        with self._lock:
+            return self._connection.execute(statement, params).fetchall()
+
+    def get_watermark(self, network_code, entity_type):
+        rows = self._execute(
+            "SELECT watermark FROM watermarks "
+            "WHERE network_code = ? AND entity_type = ?",
+            (network_code, entity_type),
+        )
+        return pickle.loads(str(rows[0][0])) if rows else None
+
+    def set_watermark(self, network_code, entity_type, watermark):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?)",
+                (
+                    network_code,
+                    entity_type,
+                    sqlite3.Binary(pickle.dumps(watermark, 2)),
+                ),
+            )
+
+    def _load(self, rows):
+        """
+        @param rows: list((buffer,)), doc rows
+        @return: list(ObjectModel)
+        """
+        return [ObjectModel.from_doc(pickle.loads(str(doc))) for doc, in rows]
+
+    def get_objects(self, network_code, entity_type, ids=None):
+        if ids is None:
+            return dict(
+                (obj.id, obj)
+                for obj in self.query(network_code, entity_type, order=None)
+            )
+
+        objects = {}
+        ids = list(ids)
+        # Stay below the SQLite limit on the number of parameters
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            objects.update((obj.id, obj) for obj in self._load(self._execute(
+                "SELECT doc FROM objects "
+                "WHERE network_code = ? AND entity_type = ? "
+                "AND id IN ({0})".format(", ".join("?" * len(chunk))),
+                [network_code, entity_type] + chunk,
+            )))
+        return objects
+
+    def put_objects(self, network_code, entity_type, objects):
+        object_rows = []
+        target_rows = []
+        for obj in objects:
+            object_rows.append(
+                [network_code, entity_type, obj.id] +
+                [_to_sql_value(getattr(obj, c, None)) for c in STORE_COLUMNS] +
+                [sqlite3.Binary(pickle.dumps(obj.to_doc(), 2))]
+            )
+            for posting_type, key, _ in \
+                    get_targeting_keys(getattr(obj, 'targeting', None)):
+                target_rows.append((
+                    network_code,
+                    entity_type,
+                    obj.id,
+                    key[0],
+                    key[1],
+                    posting_type == 'exclude',
+                ))
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM targets "
+                "WHERE network_code = ? AND entity_type = ? AND id = ?",
+                [(network_code, entity_type, obj.id) for obj in objects],
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO objects VALUES ({0})".format(
+                    ", ".join("?" * (len(STORE_COLUMNS) + 4))
+                ),
+                object_rows,
+            )
+            self._connection.executemany(
+                "INSERT INTO targets VALUES (?, ?, ?, ?, ?, ?)",
+                target_rows,
+            )
+
+    def remove_objects(self, network_code, entity_type, ids):
+        rows = [(network_code, entity_type, _id) for _id in ids]
+        with self._lock, self._connection:
+            for table in ['objects', 'targets']:
+                self._connection.executemany(
+                    "DELETE FROM {0} "
+                    "WHERE network_code = ? AND entity_type = ? "
+                    "AND id = ?".format(table),
+                    rows,
+                )
+
+    def _get_column(self, entity_type, field):
+        """
+        @param entity_type: ParselmouthEntityTypes
+        @param field: str, PQL field name, e.g. 'orderId'
+        @return: (str, list)|None, SQL expression of the field and its
+            parameters, or None if objects of the entity type can't be
+            filtered on the field
+        """
+        column = STORE_FILTER_COLUMN_MAP.get(field.lower())
+        if column == 'id':
+            return column, []
+        if column in STORE_ENTITY_COLUMNS.get(entity_type, []):
+            return column, []
+
+        joined = STORE_JOINED_COLUMNS.get(entity_type, {}).get(column)
+        if joined:
+            joined_type, foreign_key = joined
+            return (
+                "(SELECT joined.{0} FROM objects AS joined "
+                "WHERE joined.network_code = objects.network_code "
+                "AND joined.entity_type = ? "
+                "AND joined.id = objects.{1})".format(column, foreign_key),
+                [joined_type],
+            )
+        return None
+
+    def _format_order(self, entity_type, order):
+        """
+        @param entity_type: ParselmouthEntityTypes
+        @param order: str|None, PQL ORDER BY expression, e.g. "ID DESC"
+        @return: (str, list), SQL ORDER BY clause and its parameters
+        """
+        if not order:
+            return "", []
+
+        parts = order.split()
+        column = self._get_column(entity_type, parts[0])
+        direction = parts[1].upper() if len(parts) > 1 else 'ASC'
+        if not column or direction not in ('ASC', 'DESC') or len(parts) > 2:
+            raise ParselmouthException(
+                "Cannot order stored objects by: {0}".format(order)
+            )
+        expression, params = column
+        if expression == 'id':
+            # Ids are numerical
+            expression = 'CAST(id AS INTEGER)'
+        return " ORDER BY {0} {1}".format(expression, direction), params
+
+    def query(self,
+              network_code,
+              entity_type,
+              order='ID',
+              limit=None,
+              offset=0,
+              target=None,
+              excluded_target=None,
+              **filter_kwargs):
+        """
+        Query stored objects with the same filters as Parselmouth
+        getters, e.g. `query(NETWORK, 'line_item', orderId=ORDER_ID)`
+
+        @param network_code: str
+        @param entity_type: ParselmouthEntityTypes
+        @param order: str|None, PQL key to sort on (default=ID)
+        @param limit: int|None, number of results to return
+        @param offset: int, number of results to skip
+        @param target: ObjectModel|(str, str)|None, only return objects
+            whose targeting includes this target
+        @param excluded_target: ObjectModel|(str, str)|None, only return
+            objects whose targeting excludes this target
+        @param filter_kwargs: dict, PQL keyword arguments on which to
+            filter, on the fields of STORE_FILTER_COLUMN_MAP which the
+            objects of the entity type have, see STORE_ENTITY_COLUMNS.
+            Keywords can end with one of the suffixes in QUERY_OPERATORS.
+            Naive datetimes are taken to be in UTC.
+        @return: list(ObjectModel)
+        @raise ParselmouthException: on filters that can't be answered
+            from the stored objects
+        """
+        filters = ["network_code = ?", "entity_type = ?"]
+        params = [network_code, entity_type]
+
+        for key, val in filter_kwargs.items():
+            field, _, suffix = key.partition('__')
+            column = self._get_column(entity_type, field)
+            if not column or (suffix and suffix not in QUERY_OPERATORS):
+                raise ParselmouthException(
+                    "Cannot filter stored objects on: {0}".format(key)
+                )
+            column, column_params = column
+
+            if isinstance(val, list):
+                if suffix and suffix != 'eq':
+                    raise ParselmouthException(
+                        "Cannot use operator {0} with a list of values".format(
+                            suffix
+                        )
+                    )
+                filters.append("{0} IN ({1})".format(
+                    column, ", ".join("?" * len(val)),
+                ))
+                params += column_params + [_to_sql_value(v) for v in val]
+            else:
+                filters.append("{0} {1} ?".format(
+                    column, QUERY_OPERATORS[suffix or 'eq'],
+                ))
+                params += column_params + [_to_sql_value(val)]
+
+        for _target, excluded in [(target, 0), (excluded_target, 1)]:
+            if _target is None:
+                continue
+            if not isinstance(_target, tuple):
+                _target = get_target_key(_target)
+            filters.append(
+                "id IN (SELECT id FROM targets "
+                "WHERE network_code = ? AND entity_type = ? "
+                "AND target_type = ? AND target_id = ? AND excluded = ?)"
+            )
+            params += [network_code, entity_type, _target[0], _target[1], excluded]
+
+        order_clause, order_params = self._format_order(entity_type, order)
+        statement = "SELECT doc FROM objects WHERE {0}{1}".format(
+            " AND ".join(filters), order_clause,
+        )
+        params += order_params
+        if limit or offset:
+            statement += " LIMIT ? OFFSET ?"
+            params += [limit if limit else -1, offset]
+
+        return self._load(self._execute(statement, params))
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Parselmouth - Incremental Sync
+
+Keep a local store of campaigns, line items and creatives up to date
+without re-fetching a whole network. Each sync only queries objects
+modified since the last modification time seen for the network (the
+watermark), and reports which objects were added, changed or removed.
+
+Objects are never deleted by DFP, only archived. Archived campaigns and
+line items are removed from the store. Creatives cannot be archived so
+are never removed.
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+import logging
+
+# Parselmouth Imports
+from parselmouth.constants import ParselmouthEntityTypes
+from parselmouth.model import ObjectModel
+from parselmouth.store import MemoryStore
+
+
+LAST_MODIFIED_FILTER_KEY = 'lastModifiedDateTime__gte'
+"""
+str, filter keyword used to query objects modified since the watermark.
+Objects modified at the watermark itself are queried again, since
+other objects may have been modified within the same second after the
+previous sync; unmodified objects are not reported twice.
+"""
+
+ARCHIVED_FILTER_KEYS = {
+    ParselmouthEntityTypes.campaign: 'isArchived',
+    ParselmouthEntityTypes.line_item: 'isArchived',
+}
+"""
+dict, entity type -> filter keyword of the archived flag, for the
+entity types which can be archived
+"""
+
+
+class SyncResult(ObjectModel):
+    """
+    Container for the outcome of a sync
+    """
+
+    def __init__(self,
+                 added=None,
+                 changed=None,
+                 removed=None,
+                 watermark=None):
+        """
+        @param added: list(ObjectModel), objects not previously stored
+        @param changed: list(ObjectModel), new versions of stored
+            objects
+        @param removed: list(ObjectModel), previously stored versions
+            of the objects removed from the store
+        @param watermark: datetime|None, watermark after the sync
+        """
+        self.added = added or []
+        self.changed = changed or []
+        self.removed = removed or []
+        self.watermark = watermark
+
+
+class ParselmouthSync(object):
+    """
+    Incrementally sync delivery objects from an ad provider into a local
+    store
+    """
+
+    GETTER_FUNCTION_MAP = {
+        ParselmouthEntityTypes.campaign:
+            lambda c, **kwargs: c.get_campaigns(**kwargs),
+        ParselmouthEntityTypes.line_item:
+            lambda c, **kwargs: c.get_line_items(**kwargs),
+        ParselmouthEntityTypes.creative:
+            lambda c, **kwargs: c.get_creatives(**kwargs),
+    }
+    """
+    dict, associate to each entity type the Parselmouth getter function
+    """
+
+    def __init__(self, client, store=None, network_code=None):
+        """
+        @param client: parselmouth.Parselmouth
+        @param store: parselmouth.store.AbstractStore|None, defaults to
+            an in-memory store
+        @param network_code: str|None, network the objects belong to.
+            Defaults to the network of the client's configuration
+        """
+        self.client = client
+        self.store = store or MemoryStore()
+        if network_code is None:
+            network_code = client.provider_config.get_credentials_arguments()[
+                'network_code'
+            ]
+        self.network_code = network_code
+
+    def _get_objects(self, entity_type, **filter_kwargs):
+        """
+        @param entity_type: ParselmouthEntityTypes
+        @param filter_kwargs: dict, keyword arguments on which to filter
+            PQL results
+        @return: list(ObjectModel)
+        """
+        return self.GETTER_FUNCTION_MAP[entity_type](
+            self.client, **filter_kwargs
+        )
+
+    def sync(self, entity_type):
+        """
+        Fetch the objects modified since the last sync and merge them
+        into the store. The first sync of a network fetches every
+        object which isn't archived.
+
+        @param entity_type: ParselmouthEntityTypes
+        @return: SyncResult
+        """
+        assert entity_type in ParselmouthEntityTypes
+
+        watermark = self.store.get_watermark(self.network_code, entity_type)
+        filter_kwargs = {}
+        if watermark:
+            filter_kwargs[LAST_MODIFIED_FILTER_KEY] = watermark
+
+        archived_key = ARCHIVED_FILTER_KEYS.get(entity_type)
+        if archived_key:
+            filter_kwargs[archived_key] = 'false'
+        modified = self._get_objects(entity_type, **filter_kwargs)
+
+        # There is nothing to remove from a store that was never synced
+        archived = []
+        if archived_key and watermark:
+            filter_kwargs[archived_key] = 'true'
+            archived = self._get_objects(entity_type, **filter_kwargs)
+
+        stored = self.store.get_objects(
+            self.network_code,
+            entity_type,
+            [o.id for o in modified + archived],
+        )
+
+        result = SyncResult(watermark=watermark)
+        for obj in modified:
+            previous = stored.get(obj.id)
+            if previous is None:
+                result.added.append(obj)
+            elif previous != obj or previous.last_modified != obj.last_modified:
+                result.changed.append(obj)
+        result.removed = [stored[o.id] for o in archived if o.id in stored]
+
+        self.store.put_objects(
+            self.network_code, entity_type, result.added + result.changed,
+        )
+        self.store.remove_objects(
+            self.network_code, entity_type, [o.id for o in result.removed],
+        )
+
+        last_modified = [
+            o.last_modified for o in modified + archived if o.last_modified
+        ]
+        if watermark:
+            last_modified.append(watermark)
+        if last_modified:
+            result.watermark = max(last_modified)
+            self.store.set_watermark(
+                self.network_code, entity_type, result.watermark,
+            )
+
+        logging.info(
+            "Synced %s for network %s: %d added, %d changed, %d removed",
+            entity_type,
+            self.network_code,
+            len(result.added),
+            len(result.changed),
+            len(result.removed),
+        )
+        return result
@@ -19,7 +19,6 @@ from copy import deepcopy
 from parselmouth.exceptions import ParselmouthException
 from parselmouth.model import ObjectModel
 from parselmouth.utils.enum import Enum
-from parselmouth.utils.check import check_equal
 
 
 class AdUnit(ObjectModel):
@@ -223,6 +222,18 @@ class TargetingCriterion(object):
     def __repr__(self):
         return str(self)
 
+    def __getstate__(self):
+        """
+        Pickle criteria without their cached canonical form and hash,
+        see canonicalize
+
+        @return: dict
+        """
+        state = dict(self.__dict__)
+        state.pop('_canonical', None)
+        state.pop('_hash', None)
+        return state
+
     @classmethod
     def _add_criterion(cls, first, second, operator):
         """
@@ -346,7 +357,107 @@ class TargetingCriterion(object):
     def __eq__(self, other):
         if not isinstance(other, TargetingCriterion):
             return False
-        return check_equal(self._data, other._data)
+        if self is other:
+            return True
+        return self._get_canonical_key() == other._get_canonical_key()
+
+    def __hash__(self):
+        # Caches are set lazily, since criteria may be unpickled from
+        # before they were cached
+        if getattr(self, '_hash', None) is None:
+            self._hash = hash(self._get_canonical_key())
+        return self._hash
+
+    def _get_canonical(self):
+        """
+        Build (once) the canonical form of this criterion along with
+        its structural key. See canonicalize.
+
+        @return: (TargetingCriterion, tuple)
+        """
+        if getattr(self, '_canonical', None) is not None:
+            return self._canonical
+
+        operator, targets = self.get_data()
+        children = {}
+        for target in targets:
+            if not isinstance(target, TargetingCriterion):
+                children[target._get_canonical_key()] = target
+                continue
+
+            child, child_key = target._get_canonical()
+            if isinstance(child, TargetingCriterion):
+                child_op, child_targets = child.get_data()
+                # Squash nested groups with the same operator, as well as
+                # single target groups, into this group:
+                # AND: [AND: [1, 2], OR: [3]] ---> AND: [1, 2, 3]
+                # NOT: [OR: [1]] ---> NOT: [1]
+                is_nested = child_op == operator and \
+                    operator != self.OPERATOR.NOT
+                is_single = child_op != self.OPERATOR.NOT and \
+                    len(child_targets) == 1
+                if is_nested or is_single:
+                    children.update(zip(child_key[2], child_targets))
+                    continue
+            children[child_key] = child
+
+        # Sorting the de-duplicated keys gives an order independent form
+        keys = sorted(children)
+        if operator != self.OPERATOR.NOT and len(keys) == 1:
+            child = children[keys[0]]
+            if isinstance(child, TargetingCriterion):
+                # OR: [TargetingCriterion] ---> TargetingCriterion
+                self._canonical = (child, keys[0])
+                return self._canonical
+            # Single targets are always grouped with an OR
+            operator = self.OPERATOR.OR
+
+        key = (self.__class__.__name__, operator, tuple(keys))
+        canonical_targets = [children[k] for k in keys]
+        is_canonical = operator == self.get_data()[0] and \
+            len(canonical_targets) == len(targets) and \
+            all(c is t for c, t in zip(canonical_targets, targets))
+        if is_canonical:
+            canonical = self
+        else:
+            canonical = TargetingCriterion(canonical_targets, operator)
+            canonical._canonical = (canonical, key)
+
+        self._canonical = (canonical, key)
+        return self._canonical
+
+    def _get_canonical_key(self):
+        """
+        Get a hashable, sortable key describing the structure of this
+        criterion. Two criteria have the same key exactly when their
+        canonical forms are the same.
+
+        @return: tuple
+        """
+        return self._get_canonical()[1]
+
+    def canonicalize(self):
+        """
+        Get an equivalent criterion in canonical form:
+            * nested groups with the same operator are flattened
+                AND: [AND: [1, 2], 3] ---> AND: [1, 2, 3]
+            * groups with a single target are unwrapped, also within
+                a NOT
+                AND: [OR: [1], 2] ---> AND: [1, 2]
+                NOT: [OR: [1]] ---> NOT: [1]
+            * duplicate targets are removed
+            * targets are sorted by a stable key
+        The canonical form and its structural hash are computed once
+        and cached, so comparing and hashing criteria is close to
+        linear in the number of targets.
+
+        NOTE: Because of this caching, a criterion (and the targets
+            within it) must not be modified in place once it has been
+            compared or hashed.
+
+        @return: TargetingCriterion
+        """
+        return self._get_canonical()[0]
 
     def get_data(self):
         """
@@ -496,7 +607,7 @@ class TargetingData(ObjectModel):
         @return: dict
         """
         doc = {}
-        for _key, _value in vars(self).items():
+        for _key, _value in self._get_fields().items():
             if isinstance(_value, TargetingCriterion):
                 doc[_key] = _value.to_doc()
             else:
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Parselmouth - Targeting Index
+
+Inverted index from targeting objects to the line items that include
+or exclude them. This answers questions like "which line items target
+ad unit X, directly or through one of its parents" without walking the
+targeting of every line item.
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+from collections import defaultdict
+
+# Parselmouth Imports
+from parselmouth.delivery import LineItem
+from parselmouth.targeting import AdUnit
+from parselmouth.targeting import TargetingCriterion
+from parselmouth.tree_builder import TreeBuilder
+
+
+def get_target_key(target):
+    """
+    Key identifying a targeting object in the index. Ids are only unique
+    within a type of target, so the class name is part of the key.
+
+    @param target: ObjectModel
+    @return: (str, str)
+    """
+    return (target.__class__.__name__, target.id)
+
+
+def get_targeting_keys(targeting):
+    """
+    Get the keys of the targets included and excluded by line item
+    targeting, following the semantics of
+    TargetingCriterion.get_includes_and_excludes
+
+    @param targeting: TargetingData|None
+    @return: list((str, (str, str), bool)), (include|exclude, target
+        key, whether the targeting applies to the target's descendants),
+        once per key. A target included both with and without its
+        descendants applies to them.
+    """
+    criteria = [
+        _value for _value in
+        (targeting._get_fields().values() if targeting else [])
+        if isinstance(_value, TargetingCriterion)
+    ]
+
+    keys = []
+    # (include|exclude, target key) -> whether the targeting applies to
+    # the target's descendants
+    descendants_by_key = {}
+    for criterion in criteria:
+        # Work on target keys rather than on whole models, which are
+        # much more expensive to hash
+        includes = criterion._get_includes()
+        include_keys = set(get_target_key(t) for t in includes)
+        excludes = [
+            t for t in criterion.flatten()
+            if get_target_key(t) not in include_keys
+        ]
+        for posting_type, targets in [
+                ('include', includes), ('exclude', excludes)]:
+            for target in targets:
+                descendants = not isinstance(target, AdUnit) or \
+                    bool(target.include_descendants)
+                key = (posting_type, get_target_key(target))
+                if key not in descendants_by_key:
+                    keys.append(key)
+                    descendants_by_key[key] = descendants
+                else:
+                    descendants_by_key[key] |= descendants
+
+    return [
+        (posting_type, key, descendants_by_key[(posting_type, key)])
+        for posting_type, key in keys
+    ]
+
+
+class TargetingIndex(object):
+    """
+    Index mapping targeting objects to the ids of the line items that
+    include or exclude them, following the semantics of
+    TargetingCriterion.get_includes_and_excludes.
+
+    The index is updated incrementally through add_line_items and
+    remove_line_items.
+    """
+
+    def __init__(self, line_items=None, trees=None):
+        """
+        @param line_items: list(LineItem)|None, line items to index
+        @param trees: dict|None, ParselmouthTargetTypes -> NodeTree,
+            trees used to answer queries through parent targets.
+            See Parselmouth.construct_tree
+        """
+        self._line_items = {}
+        # line item id -> list((str, (str, str))), the (include|exclude,
+        # target key) pairs indexed for the line item
+        self._line_item_keys = {}
+        # include|exclude -> target key -> line item id -> bool, whether
+        # the target also applies to the descendants of the target
+        self._postings = {
+            'include': defaultdict(dict),
+            'exclude': defaultdict(dict),
+        }
+        # class name -> target id -> parent target id
+        self._parent_maps = defaultdict(dict)
+
+        for target_type, tree in (trees or {}).items():
+            cls_name = TreeBuilder.TARGET_CLASS_MAP[target_type].__name__
+            self._parent_maps[cls_name].update(tree.get_parent_map())
+
+        if line_items:
+            self.add_line_items(line_items)
+
+    def __len__(self):
+        return len(self._line_items)
+
+    def __contains__(self, line_item):
+        if isinstance(line_item, LineItem):
+            line_item = line_item.id
+        return line_item in self._line_items
+
+    def add_line_items(self, line_items):
+        """
+        Index line items. Line items that are already indexed are
+        re-indexed with their new targeting.
+
+        @param line_items: list(LineItem)
+        """
+        for line_item in line_items:
+            if line_item.id in self._line_items:
+                self.remove_line_items([line_item.id])
+
+            keys = []
+            for posting_type, key, descendants in \
+                    get_targeting_keys(line_item.targeting):
+                self._postings[posting_type][key][line_item.id] = descendants
+                keys.append((posting_type, key))
+
+            self._line_items[line_item.id] = line_item
+            self._line_item_keys[line_item.id] = keys
+
+    def remove_line_items(self, line_items):
+        """
+        Remove line items from the index
+
+        @param line_items: list(LineItem|str), line items or their ids
+        """
+        for line_item in line_items:
+            _id = line_item.id if isinstance(line_item, LineItem) else line_item
+            if _id not in self._line_items:
+                continue
+
+            for posting_type, key in self._line_item_keys.pop(_id):
+                postings = self._postings[posting_type]
+                postings[key].pop(_id, None)
+                if not postings[key]:
+                    del postings[key]
+            del self._line_items[_id]
+
+    def get_line_item(self, line_item_id):
+        """
+        @param line_item_id: str
+        @return: LineItem|None
+        """
+        return self._line_items.get(line_item_id)
+
+    def _get_ancestor_keys(self, key):
+        """
+        @param key: (str, str), target key
+        @return: list((str, str)), keys of the target's ancestors
+        """
+        cls_name, _id = key
+        parent_map = self._parent_maps.get(cls_name, {})
+        ancestors = []
+        seen = set([_id])
+        _id = parent_map.get(_id)
+        while _id is not None and _id not in seen:
+            seen.add(_id)
+            ancestors.append((cls_name, _id))
+            _id = parent_map.get(_id)
+        return ancestors
+
+    def get_line_item_ids(self, target, include_ancestors=False):
+        """
+        Get the ids of the line items including and excluding a target
+
+        @param target: ObjectModel|(str, str), targeting object or its
+            key (see get_target_key)
+        @param include_ancestors: bool, also count line items which
+            include or exclude a parent of the target, when that
+            targeting applies to descendants. This requires the tree
+            of the target's type to be given to the constructor.
+        @return: (set(str), set(str)), ids of the line items including
+            and excluding the target
+        """
+        key = target if isinstance(target, tuple) else get_target_key(target)
+        ancestor_keys = self._get_ancestor_keys(key) if include_ancestors else []
+
+        results = []
+        for posting_type in ['include', 'exclude']:
+            postings = self._postings[posting_type]
+            line_item_ids = set(postings.get(key, ()))
+            for ancestor_key in ancestor_keys:
+                for _id, descendants in postings.get(ancestor_key, {}).items():
+                    if descendants:
+                        line_item_ids.add(_id)
+            results.append(line_item_ids)
+
+        return results[0], results[1]
+
+    def get_line_items(self, target, include_ancestors=False):
+        """
+        Same as get_line_item_ids, returning LineItem objects
+
+        @param target: ObjectModel|(str, str)
+        @param include_ancestors: bool
+        @return: (list(LineItem), list(LineItem))
+        """
+        includes, excludes = self.get_line_item_ids(target, include_ancestors)
+        return (
+            [self._line_items[_id] for _id in includes],
+            [self._line_items[_id] for _id in excludes],
+        )
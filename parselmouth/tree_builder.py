@@ -145,6 +145,31 @@ class NodeTree(object):
 
         return descendants
 
+    def get_parent_map(self, key='id'):
+        """
+        Map the key field of every node in this tree to the key field
+        of its parent node. Nodes at the top of the tree map to None.
+
+        @param key: ParselmouthField, key to map on
+        @return: dict
+        """
+        parent_map = {}
+        # Walk the tree iteratively since ad unit and geography trees
+        # can be deep enough to hit the recursion limit
+        stack = [(self, None)]
+        while stack:
+            tree, parent_value = stack.pop()
+            if tree.node:
+                value = vars(tree.node)[key]
+                parent_map[value] = parent_value
+            else:
+                value = None
+
+            for branch in tree.children:
+                stack.append((branch, value))
+
+        return parent_map
+
     def filter_tree_by_key(self, key, filter_ids):
         """
         Filter a given tree to include branches that are either
@@ -295,30 +320,15 @@ class TreeBuilder(object):
             parents[node.parent_id].append(node)
             node_map[node.id] = node
 
-        # Construct tree by building trees at each maximal parent
+        # Construct tree by building trees at each maximal parent. Every
+        # node is the child of its parent id, so a parent id is maximal
+        # if it is not the id of a node.
         maximal_trees = []
         for pid in parents.keys():
-            # Determine if pid is a maximal parent
-            # By checking to see if pid is a child of any other id
-            maximal = True
-            for children in parents.values():
-                children_ids = [c.id for c in children]
-                # If pid is a child of another id, then flag as not maximal
-                if pid in children_ids:
-                    maximal = False
-                    break
-            # Create tree starting at this maximal parent
-            if maximal:
-                max_node = node_map.get(pid)
-                children = self._recursive_make_tree(
+            if pid not in node_map:
+                maximal_trees.extend(self._recursive_make_tree(
                     pid, parents, node_map,
-                )
-
-                if max_node:
-                    tree = NodeTree(max_node, children)
-                    maximal_trees.append(tree)
-                else:
-                    maximal_trees.extend(children)
+                ))
 
         return NodeTree(
             node=None,
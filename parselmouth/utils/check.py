@@ -11,10 +11,125 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+# Standard Library Imports
+from collections import defaultdict
+
+
+_UNKEYABLE = object()
+"""
+object, sentinel returned by _get_key for objects that cannot be hashed
+"""
+
+
+def _is_hashable(obj):
+    """
+    Check if an object can be hashed consistently with its __eq__.
+    Objects that define their own __eq__ but fall back on the identity
+    based object.__hash__ cannot.
+
+    @param obj
+    @return: bool
+    """
+    cls = type(obj)
+    if cls.__hash__ is None:
+        return False
+
+    if cls.__hash__ is object.__hash__:
+        for base in cls.__mro__[:-1]:
+            if '__eq__' in vars(base) or '__cmp__' in vars(base):
+                return False
+
+    try:
+        hash(obj)
+    except TypeError:
+        return False
+    return True
+
+
+def _get_key(obj):
+    """
+    Get a hashable key for an object such that two objects have equal
+    keys exactly when check_equal considers them equal. Lists are keyed
+    as multisets (frozensets of item key counts) so that item order does
+    not matter.
+
+    @param obj
+    @return: tuple|_UNKEYABLE
+    """
+    if isinstance(obj, dict):
+        items = []
+        for _key, _value in obj.items():
+            _value_key = _get_key(_value)
+            if _value_key is _UNKEYABLE:
+                return _UNKEYABLE
+            items.append((_key, _value_key))
+        return (type(obj), frozenset(items))
+
+    elif isinstance(obj, list):
+        counts = defaultdict(int)
+        for item in obj:
+            _item_key = _get_key(item)
+            if _item_key is _UNKEYABLE:
+                return _UNKEYABLE
+            counts[_item_key] += 1
+        return (type(obj), frozenset(counts.items()))
+
+    elif _is_hashable(obj):
+        return (type(obj), obj)
+
+    return _UNKEYABLE
+
+
+def _check_multiset_equal(list1, list2):
+    """
+    Check if two lists hold the same items with the same multiplicity,
+    regardless of order. Items are matched through their hashable keys;
+    only items that cannot be keyed are compared pairwise.
+
+    @param list1: list
+    @param list2: list
+    @return: bool
+    """
+    counts = defaultdict(int)
+    unkeyed1 = []
+    for item in list1:
+        _key = _get_key(item)
+        if _key is _UNKEYABLE:
+            unkeyed1.append(item)
+        else:
+            counts[_key] += 1
+
+    unkeyed2 = []
+    for item in list2:
+        _key = _get_key(item)
+        if _key is _UNKEYABLE:
+            unkeyed2.append(item)
+        elif counts.get(_key):
+            counts[_key] -= 1
+        else:
+            return False
+
+    # The lists are the same size, so if every keyed item of list2 was
+    # matched the leftover unkeyed items must be the same in number too
+    if len(unkeyed1) != len(unkeyed2):
+        return False
+
+    for item1 in unkeyed1:
+        for index, item2 in enumerate(unkeyed2):
+            if check_equal(item1, item2):
+                del unkeyed2[index]
+                break
+        else:
+            return False
+
+    return True
+
 
 def check_equal(obj1, obj2):
     """
-    Check if two objects are equivalent
+    Check if two objects are equivalent. Dictionaries are compared key
+    by key, and lists are compared as multisets: the order of their
+    items does not matter but the number of occurrences does.
 
     @param obj1
     @parma obj2
@@ -24,25 +139,18 @@ def check_equal(obj1, obj2):
         return False
 
     if isinstance(obj1, dict):
-        if sorted(obj1.keys()) != sorted(obj2.keys()):
+        if len(obj1) != len(obj2):
             return False
 
-        for _key in obj1.keys():
-            if not check_equal(obj1[_key], obj2[_key]):
+        for _key, _value in obj1.items():
+            if _key not in obj2 or not check_equal(_value, obj2[_key]):
                 return False
 
     elif isinstance(obj1, list):
         if len(obj1) != len(obj2):
             return False
 
-        for item1 in obj1:
-            is_match = False
-            for item2 in obj2:
-                if check_equal(item1, item2):
-                    is_match = True
-
-            if not is_match:
-                return False
+        return _check_multiset_equal(obj1, obj2)
     else:
         return obj1 == obj2
 
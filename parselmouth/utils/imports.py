@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Parselmouth utilities - Import Utilities
+"""
+
+# Future-proof
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# Standard Library Imports
+from importlib import import_module
+
+
+def import_string(path):
+    """
+    Import an object given its dotted path. Used to defer importing
+    adapter modules, which pull in heavy third party libraries, until
+    they are needed.
+
+    @param path: str, e.g. 'parselmouth.adapters.dfp.interface.DFPInterface'
+    @return: object
+    """
+    module_path, _, name = path.rpartition('.')
+    try:
+        return getattr(import_module(module_path), name)
+    except AttributeError:
+        raise ImportError(
+            "Module {0} does not define {1}".format(module_path, name)
+        )
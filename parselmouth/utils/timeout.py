@@ -2,7 +2,16 @@
 # -*- coding: utf-8 -*-
 
 """
-Parselmouth utilities
+Parselmouth utilities - Timeouts
+
+Timeouts are deadlines kept per thread. Code making network requests
+reads the time remaining before the deadline and gives it to the
+transport as a socket timeout, so a request running out of time fails
+in the thread which made it. Nothing is injected asynchronously into
+threads, so timeouts are safe to use from thread pools and cheap enough
+to wrap every request.
+
+Deadlines are not inherited by threads started within a Timeout.
 """
 
 # Future-proof
@@ -12,14 +21,95 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 # Standard Library Imports
-import signal
-
-# Third Party Library Imports
-import stopit
+import threading
+import time
 
 # Local Package Imports
 from parselmouth.exceptions import ParselmouthTimeout
 
 
-class Timeout(stopit.ThreadingTimeout):
-    pass
+_local = threading.local()
+
+
+def get_deadline():
+    """
+    @return: float|None, time at which the innermost Timeout of the
+        current thread expires, None outside of a Timeout
+    """
+    return getattr(_local, 'deadline', None)
+
+
+def get_remaining_time():
+    """
+    @return: float|None, number of seconds before the deadline of the
+        current thread, None outside of a Timeout
+    @raise ParselmouthTimeout: if the deadline has passed
+    """
+    deadline = get_deadline()
+    if deadline is None:
+        return None
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise ParselmouthTimeout(
+            "Deadline exceeded by {0:.1f}s".format(-remaining)
+        )
+    return remaining
+
+
+def check_deadline():
+    """
+    @raise ParselmouthTimeout: if the deadline of the current thread has
+        passed
+    """
+    get_remaining_time()
+
+
+class Timeout(object):
+    """
+    Context manager setting a deadline for the requests made within it.
+    Nested timeouts can only shorten the deadline.
+
+    Example:
+        with Timeout(60):
+            get_remaining_time()  # <= 60
+    """
+
+    def __init__(self, seconds):
+        """
+        @param seconds: float|None, None for no timeout
+        """
+        self.seconds = seconds
+        self.deadline = None
+        self._previous_deadline = None
+
+    def __repr__(self):
+        """
+        Human readable representation of this object
+
+        @return: str
+        """
+        return (
+            "{class_name}("
+                "seconds={seconds}"
+            ")"
+        ).format(
+            class_name=self.__class__.__name__,
+            seconds=self.seconds,
+        )
+
+    def __enter__(self):
+        self._previous_deadline = get_deadline()
+        deadline = None
+        if self.seconds is not None:
+            deadline = time.time() + self.seconds
+        if self._previous_deadline is not None and (
+                deadline is None or self._previous_deadline < deadline):
+            deadline = self._previous_deadline
+
+        self.deadline = deadline
+        _local.deadline = deadline
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _local.deadline = self._previous_deadline
+        return False
@@ -16,6 +16,8 @@ setup(
     install_requires=[
         'googleads==3.8.0',
         'pytz==2015.7',
-        'stopit==1.1.1',
     ],
+    extras_require={
+        'pacing': ['numpy'],
+    },
 )
@@ -0,0 +1,142 @@
+import subprocess
+import sys
+import time
+import unittest
+
+from parselmouth import Parselmouth
+from parselmouth import ParselmouthConfig
+from parselmouth import ParselmouthException
+from parselmouth import ParselmouthProviders
+from parselmouth.exceptions import ParselmouthNetworkError
+from parselmouth.retry import RetryPolicy
+
+
+CREDENTIALS = {
+    'client_id': 'id',
+    'client_secret': 'secret',
+    'refresh_token': 'token',
+    'application_name': 'app',
+    'network_code': '123',
+}
+
+
+class FakeInterface(object):
+
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.timezone_calls = 0
+        self.errors = []
+        self.advertiser_calls = 0
+        self.update_calls = 0
+        self.latency = 0
+        FakeInterface.instances.append(self)
+
+    def get_network_timezone(self):
+        self.timezone_calls += 1
+        if self.kwargs['network_code'] == 'bad':
+            raise ValueError('unknown network')
+        return 'America/New_York'
+
+    def get_advertisers(self):
+        self.advertiser_calls += 1
+        time.sleep(self.latency)
+        if self.errors:
+            raise self.errors.pop(0)
+        return []
+
+    def update_line_items(self, line_items):
+        self.update_calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+class FakeParselmouth(Parselmouth):
+
+    ProviderInterfaceMap = {
+        ParselmouthProviders.google_dfp_premium: __name__ + '.FakeInterface',
+    }
+
+
+class ParselmouthTest(unittest.TestCase):
+
+    def setUp(self):
+        FakeInterface.instances = []
+
+    def _get_client(self, lazy, **kwargs):
+        config = ParselmouthConfig(
+            ParselmouthProviders.google_dfp_premium,
+            **dict(CREDENTIALS, **kwargs)
+        )
+        return FakeParselmouth(config, lazy=lazy)
+
+    def test_eager(self):
+        client = self._get_client(lazy=False)
+        self.assertEqual(len(FakeInterface.instances), 1)
+        self.assertEqual(client.get_network_timezone(), 'America/New_York')
+        self.assertEqual(client.provider.timezone_calls, 1)
+
+        self.assertRaises(
+            ParselmouthException, self._get_client, False, network_code='bad',
+        )
+
+    def test_lazy(self):
+        client = self._get_client(lazy=True)
+        self.assertEqual(FakeInterface.instances, [])
+
+        self.assertEqual(client.get_advertisers(), [])
+        self.assertEqual(client.get_network_timezone(), 'America/New_York')
+        self.assertEqual(len(FakeInterface.instances), 1)
+        self.assertEqual(client.provider.timezone_calls, 1)
+        self.assertEqual(client.tree_builder.interface, client.provider)
+
+        # Bad configurations fail on first use
+        client = self._get_client(lazy=True, network_code='bad')
+        self.assertRaises(ParselmouthException, client.get_advertisers)
+
+    def test_retries(self):
+        client = self._get_client(lazy=False)
+        client.retry_policy = RetryPolicy(sleep=lambda seconds: None)
+
+        client.provider.errors = [ParselmouthNetworkError()]
+        self.assertEqual(client.get_advertisers(), [])
+
+        client.provider.errors = [ValueError()]
+        self.assertRaises(ValueError, client.get_advertisers)
+
+        # Updates may have taken effect when they fail
+        client.provider.errors = [ParselmouthNetworkError()]
+        self.assertRaises(ParselmouthNetworkError, client.update_line_items, [])
+        self.assertEqual(client.provider.update_calls, 1)
+
+    def test_retries_share_deadline(self):
+        client = self._get_client(lazy=False)
+        client.retry_policy = RetryPolicy(
+            max_attempts=10, base_delay=0, sleep=lambda seconds: None,
+        )
+        client._network_timeout = 0.1
+        client.provider.latency = 0.04
+        client.provider.errors = [ParselmouthNetworkError()] * 10
+
+        self.assertRaises(ParselmouthNetworkError, client.get_advertisers)
+        self.assertLessEqual(client.provider.advertiser_calls, 3)
+
+    def test_unknown_provider(self):
+        config = ParselmouthConfig(
+            ParselmouthProviders.google_dfp_small_business, **CREDENTIALS
+        )
+        self.assertRaises(ValueError, FakeParselmouth, config, lazy=True)
+
+    def test_import_is_light(self):
+        # Adapter dependencies are only imported when a client is used
+        modules = subprocess.check_output([
+            sys.executable, '-c',
+            'import sys, parselmouth; print(" ".join(sys.modules))',
+        ]).split()
+        for module in ['googleads', 'suds', 'yaml']:
+            self.assertNotIn(module, modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
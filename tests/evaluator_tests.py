@@ -0,0 +1,165 @@
+import unittest
+
+from parselmouth.delivery import LineItem
+from parselmouth.evaluator import ImpressionContext
+from parselmouth.evaluator import TargetingEvaluator
+from parselmouth.targeting import AdUnit
+from parselmouth.targeting import Custom
+from parselmouth.targeting import Geography
+from parselmouth.targeting import Placement
+from parselmouth.targeting import TargetingCriterion
+from parselmouth.targeting import TargetingData
+from parselmouth.targeting import Technology
+from parselmouth.tree_builder import TreeBuilder
+
+
+OR = TargetingCriterion.OPERATOR.OR
+AND = TargetingCriterion.OPERATOR.AND
+
+# home -> home/us -> home/us/mi
+ADUNIT_TREE = TreeBuilder(None, None).build_tree([
+    AdUnit(id='1', parent_id=None, name='home'),
+    AdUnit(id='2', parent_id='1', name='home/us'),
+    AdUnit(id='3', parent_id='2', name='home/us/mi'),
+    AdUnit(id='4', parent_id=None, name='sports'),
+])
+
+# usa -> michigan
+GEOGRAPHY_TREE = TreeBuilder(None, None).build_tree([
+    Geography(id='2840', parent_id=None, name='USA'),
+    Geography(id='21155', parent_id='2840', name='Michigan'),
+])
+
+HOME_LINE_ITEM = LineItem(
+    id='home',
+    targeting=TargetingData(
+        inventory=TargetingCriterion(AdUnit(id='1')),
+    ),
+)
+
+HOME_ONLY_LINE_ITEM = LineItem(
+    id='home_only',
+    targeting=TargetingData(
+        inventory=TargetingCriterion(AdUnit(id='1', include_descendants=False)),
+    ),
+)
+
+USA_NOT_MI_LINE_ITEM = LineItem(
+    id='usa_not_mi',
+    targeting=TargetingData(
+        inventory=TargetingCriterion(AdUnit(id='1')),
+        geography=TargetingCriterion(Geography(id='2840')) &
+            ~TargetingCriterion(Geography(id='21155')),
+    ),
+)
+
+CUSTOM_LINE_ITEM = LineItem(
+    id='custom',
+    targeting=TargetingData(
+        inventory=TargetingCriterion(Placement(id='p1')),
+        custom=TargetingCriterion([
+            TargetingCriterion([Custom(id='10'), Custom(id='11')], OR),
+            TargetingCriterion([Custom(id='20')], OR),
+        ], AND),
+    ),
+)
+
+TECHNOLOGY_LINE_ITEM = LineItem(
+    id='technology',
+    targeting=TargetingData(
+        inventory=TargetingCriterion(AdUnit(id='4')),
+        technology=TargetingCriterion([
+            Technology(id='500', type='browser'),
+            Technology(id='501', type='operating_system'),
+        ], OR),
+    ),
+)
+
+LINE_ITEMS = [
+    HOME_LINE_ITEM,
+    HOME_ONLY_LINE_ITEM,
+    USA_NOT_MI_LINE_ITEM,
+    CUSTOM_LINE_ITEM,
+    TECHNOLOGY_LINE_ITEM,
+    LineItem(id='untargeted'),
+]
+
+
+class TargetingEvaluatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.evaluator = TargetingEvaluator(
+            adunit_tree=ADUNIT_TREE,
+            geography_tree=GEOGRAPHY_TREE,
+            placements={'p1': ['2']},
+        )
+
+    def test_inventory(self):
+        home = ImpressionContext(adunit_id='1')
+        home_us_mi = ImpressionContext(adunit_id='3')
+
+        self.assertTrue(self.evaluator.matches(HOME_LINE_ITEM.targeting, home))
+        self.assertTrue(self.evaluator.matches(HOME_LINE_ITEM.targeting, home_us_mi))
+        self.assertTrue(self.evaluator.matches(HOME_ONLY_LINE_ITEM.targeting, home))
+        self.assertFalse(self.evaluator.matches(HOME_ONLY_LINE_ITEM.targeting, home_us_mi))
+
+    def test_geography(self):
+        targeting = USA_NOT_MI_LINE_ITEM.targeting
+        self.assertTrue(self.evaluator.matches(
+            targeting, ImpressionContext(adunit_id='1', geography_ids=['2840']),
+        ))
+        self.assertFalse(self.evaluator.matches(
+            targeting, ImpressionContext(adunit_id='1', geography_ids=['21155']),
+        ))
+        self.assertFalse(self.evaluator.matches(
+            targeting, ImpressionContext(adunit_id='1'),
+        ))
+
+    def test_custom(self):
+        targeting = CUSTOM_LINE_ITEM.targeting
+        self.assertTrue(self.evaluator.matches(
+            targeting, ImpressionContext(adunit_id='3', custom_ids=['11', '20']),
+        ))
+        self.assertFalse(self.evaluator.matches(
+            targeting, ImpressionContext(adunit_id='3', custom_ids=['11']),
+        ))
+        self.assertFalse(self.evaluator.matches(
+            targeting, ImpressionContext(adunit_id='1', custom_ids=['11', '20']),
+        ))
+
+    def test_technology(self):
+        # Different kinds of technology targeting must all match
+        targeting = TECHNOLOGY_LINE_ITEM.targeting
+        self.assertTrue(self.evaluator.matches(
+            targeting, ImpressionContext(adunit_id='4', technology_ids=['500', '501']),
+        ))
+        self.assertFalse(self.evaluator.matches(
+            targeting, ImpressionContext(adunit_id='4', technology_ids=['500']),
+        ))
+
+    def test_match_line_items(self):
+        impressions = [
+            ImpressionContext(adunit_id='3', geography_ids=['2840']),
+            ImpressionContext(adunit_id='2', custom_ids=['10', '20']),
+            ImpressionContext(adunit_id='4', technology_ids=['500']),
+        ]
+        results = self.evaluator.match_line_items(LINE_ITEMS, impressions)
+        self.assertEqual(
+            [[l.id for l in line_items] for line_items in results],
+            [
+                ['home', 'usa_not_mi', 'untargeted'],
+                ['home', 'custom', 'untargeted'],
+                ['untargeted'],
+            ],
+        )
+
+        # The batch API agrees with evaluating every pair
+        for impression, line_items in zip(impressions, results):
+            self.assertEqual(line_items, [
+                l for l in LINE_ITEMS
+                if self.evaluator.matches(l.targeting, impression)
+            ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import socket
+import unittest
+
+from parselmouth.metrics import Histogram
+from parselmouth.metrics import InMemoryCollector
+from parselmouth.metrics import MetricsRegistry
+from parselmouth.metrics import StatsdExporter
+from parselmouth.retry import RetryPolicy
+
+
+class MetricsRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = MetricsRegistry()
+        self.collector = InMemoryCollector()
+
+    def test_listeners(self):
+        reported = []
+
+        def listener(metric_type, name, value, tags):
+            reported.append((metric_type, name, value, tags))
+
+        self.assertFalse(self.metrics.enabled)
+        self.metrics.increment('calls')
+
+        self.metrics.add_listener(self.collector)
+        self.metrics.add_listener(listener)
+        self.assertTrue(self.metrics.enabled)
+        self.metrics.increment('calls', service='LineItemService')
+        self.metrics.increment('calls', 2, service='LineItemService')
+        with self.metrics.timer('call', service='LineItemService'):
+            pass
+
+        self.assertEqual(self.collector.get_count('calls'), 0)
+        self.assertEqual(
+            self.collector.get_count('calls', service='LineItemService'), 3,
+        )
+        self.assertEqual(
+            self.collector.get_histogram('call', service='LineItemService').count,
+            1,
+        )
+
+        self.metrics.remove_listener(listener)
+        self.metrics.increment('calls', service='LineItemService')
+        self.assertEqual(len(reported), 3)
+
+        # A failing listener does not fail the instrumented code
+        self.metrics.add_listener(lambda *args: 1 / 0)
+        self.metrics.increment('calls', service='LineItemService')
+        self.assertEqual(
+            self.collector.get_count('calls', service='LineItemService'), 5,
+        )
+
+    def test_timed(self):
+        self.metrics.add_listener(self.collector)
+
+        @self.metrics.timed('conversion')
+        def convert(value):
+            return value * 2
+
+        self.assertEqual(convert(2), 4)
+        histogram = self.collector.get_histogram('conversion', function='convert')
+        self.assertEqual(histogram.count, 1)
+
+    def test_histogram(self):
+        histogram = Histogram(max_samples=10, random=lambda: 0.99)
+        for value in range(1, 101):
+            histogram.add(value)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.mean, 50.5)
+        self.assertEqual((histogram.min, histogram.max), (1, 100))
+        # Only the first 10 values are sampled with this random function
+        self.assertEqual(histogram.percentile(50), 6)
+        self.assertEqual(histogram.to_doc()['p99'], 10)
+        self.assertIsNone(Histogram().percentile(50))
+
+    def test_retries(self):
+        self.metrics.add_listener(self.collector)
+        policy = RetryPolicy(sleep=lambda seconds: None, metrics=self.metrics)
+        errors = [socket.error(), socket.error()]
+
+        def flaky():
+            if errors:
+                raise errors.pop()
+            return 'ok'
+
+        self.assertEqual(
+            policy.run(flaky, tags={'service': 'LineItemService'}), 'ok',
+        )
+        self.assertEqual(
+            self.collector.get_count(
+                'retries', error='error', service='LineItemService',
+            ),
+            2,
+        )
+
+
+class StatsdExporterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.settimeout(5)
+        self.exporter = StatsdExporter(*self.listener.getsockname())
+
+    def tearDown(self):
+        self.exporter.close()
+        self.listener.close()
+
+    def test_export(self):
+        metrics = MetricsRegistry()
+        metrics.add_listener(self.exporter)
+
+        metrics.timing(
+            'dfp.request', 0.0351,
+            service='LineItemService', method='getLineItemsByStatement',
+        )
+        self.assertEqual(
+            self.listener.recv(1024),
+            b'parselmouth.dfp.request.getLineItemsByStatement.LineItemService:35|ms',
+        )
+
+        metrics.increment('dfp.records', 500, service='Line Item:Service')
+        self.assertEqual(
+            self.listener.recv(1024),
+            b'parselmouth.dfp.records.Line_Item_Service:500|c',
+        )
@@ -0,0 +1,80 @@
+import unittest
+from datetime import datetime
+
+from parselmouth.delivery import Creative
+from parselmouth.exceptions import ParselmouthException
+from parselmouth.targeting import AdUnit
+from parselmouth.targeting import Placement
+from parselmouth.targeting import TargetingCriterion
+
+
+class ObjectModelTest(unittest.TestCase):
+
+    def test_hash_is_content_based(self):
+        adunit1 = AdUnit(id='1', name='home')
+        adunit2 = AdUnit(id='1', name='home')
+        adunit3 = AdUnit(id='2', name='page')
+
+        self.assertEqual(hash(adunit1), hash(adunit2))
+        self.assertNotEqual(hash(adunit1), hash(adunit3))
+        self.assertEqual(len(set([adunit1, adunit2, adunit3])), 2)
+
+    def test_hash_ignores_ignored_comparable_keys(self):
+        creative1 = Creative(
+            id='1',
+            preview_url='http://a',
+            last_modified=datetime(2015, 1, 1),
+        )
+        creative2 = Creative(
+            id='1',
+            preview_url='http://b',
+            last_modified=datetime(2015, 2, 1),
+        )
+
+        self.assertEqual(creative1, creative2)
+        self.assertEqual(hash(creative1), hash(creative2))
+
+    def test_hash_with_unhashable_fields(self):
+        placement1 = Placement(id='1', adunits=[{'id': '1'}, {'id': '2'}])
+        placement2 = Placement(id='1', adunits=[{'id': '1'}, {'id': '2'}])
+
+        self.assertEqual(placement1, placement2)
+        self.assertEqual(hash(placement1), hash(placement2))
+
+    def test_eq_is_symmetric(self):
+        adunit = AdUnit(id='1')
+        placement = Placement(id='1')
+
+        self.assertNotEqual(adunit, placement)
+        self.assertNotEqual(placement, adunit)
+
+    def test_freeze(self):
+        adunit = AdUnit(id='1', name='home')
+        _hash = hash(adunit)
+
+        self.assertIs(adunit.freeze(), adunit)
+        self.assertTrue(adunit.is_frozen)
+        self.assertEqual(hash(adunit), _hash)
+
+        with self.assertRaises(ParselmouthException):
+            adunit.name = 'page'
+
+        # Bookkeeping attributes are not model fields
+        self.assertEqual(adunit, AdUnit(id='1', name='home'))
+        self.assertNotIn('_frozen', adunit.to_doc())
+        self.assertNotIn('_hash', adunit.to_doc())
+
+    def test_criterion_hash(self):
+        criterion1 = TargetingCriterion(
+            [AdUnit(id='1'), AdUnit(id='2')], TargetingCriterion.OPERATOR.OR,
+        )
+        criterion2 = TargetingCriterion(
+            [AdUnit(id='2'), AdUnit(id='1')], TargetingCriterion.OPERATOR.OR,
+        )
+
+        self.assertEqual(criterion1, criterion2)
+        self.assertEqual(hash(criterion1), hash(criterion2))
+
+
+if __name__ == "__main__":
+    unittest.main()
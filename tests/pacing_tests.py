@@ -0,0 +1,119 @@
+import math
+import unittest
+from datetime import datetime
+
+import pytz
+
+from parselmouth.delivery import DeliveryMeta
+from parselmouth.delivery import Goal
+from parselmouth.delivery import LineItem
+from parselmouth.delivery import Stats
+from parselmouth.pacing import DeliveryArrays
+from parselmouth.pacing import compute_pacing
+from parselmouth.pacing import np
+
+
+START = datetime(2015, 1, 1, tzinfo=pytz.utc)
+END = datetime(2015, 1, 11, tzinfo=pytz.utc)
+# Half way through the line items
+NOW = 1420502400
+
+
+def make_line_item(line_item_id,
+                   impressions,
+                   clicks=0,
+                   goal_type='LIFETIME',
+                   units=1000,
+                   start=START,
+                   end=END):
+    return LineItem(
+        id=line_item_id,
+        start=start,
+        end=end,
+        primary_goal=Goal(
+            goal_type=goal_type, unit_type='IMPRESSIONS', units=units,
+        ),
+        delivery=DeliveryMeta(
+            stats=Stats(impressions=impressions, clicks=clicks),
+            delivery_rate_type='EVENLY',
+            actual_delivery_percent=impressions / 10.0,
+            expected_delivery_percent=50,
+        ),
+    )
+
+
+LINE_ITEMS = [
+    make_line_item('1', 500, clicks=5),
+    make_line_item('2', 300),
+    make_line_item('3', 700),
+    make_line_item('4', 0, goal_type='DAILY'),
+    make_line_item('5', 100, start=datetime(2015, 2, 1, tzinfo=pytz.utc),
+                   end=datetime(2015, 2, 11, tzinfo=pytz.utc)),
+    make_line_item('6', 1200, end=datetime(2015, 1, 5, tzinfo=pytz.utc)),
+]
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class PacingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pacing = compute_pacing(
+            DeliveryArrays.from_line_items(LINE_ITEMS), now=NOW,
+        )
+
+    def test_pace_and_ctr(self):
+        # As computed by the models
+        self.assertEqual(
+            list(self.pacing.pace),
+            [line_item.delivery.pace for line_item in LINE_ITEMS],
+        )
+        self.assertEqual(
+            list(self.pacing.click_through_rate),
+            [line_item.stats.click_through_rate for line_item in LINE_ITEMS],
+        )
+
+    def test_projections(self):
+        self.assertEqual(self.pacing.get('1'), {
+            'pace': 1.0,
+            'projected_delivery': 1000.0,
+            'required_daily_rate': 100.0,
+            'under_delivering': False,
+            'over_delivering': False,
+            'click_through_rate': 0.01,
+        })
+        self.assertEqual(self.pacing.get(2)['projected_delivery'], 600.0)
+        self.assertEqual(self.pacing.get(2)['required_daily_rate'], 140.0)
+        self.assertEqual(self.pacing.get_under_delivering_ids(), ['2'])
+        self.assertEqual(self.pacing.get_over_delivering_ids(), ['3', '6'])
+
+        # Daily goals are not projected
+        self.assertTrue(math.isnan(self.pacing.get('4')['projected_delivery']))
+        # Not started: nothing to project from, all of the goal is left
+        self.assertTrue(math.isnan(self.pacing.get('5')['projected_delivery']))
+        self.assertEqual(self.pacing.get('5')['required_daily_rate'], 90.0)
+        # Ended
+        self.assertEqual(self.pacing.get('6')['projected_delivery'], 1200.0)
+        self.assertTrue(math.isnan(self.pacing.get('6')['required_daily_rate']))
+
+        self.assertIsNone(self.pacing.get('7'))
+        self.assertEqual(len(self.pacing.to_dict()), 6)
+
+    def test_report_rows(self):
+        rows = [
+            {'line_item_id': '2', 'ad_impressions': 800, 'ad_clicks': 8},
+            {'line_item_id': '8', 'ad_impressions': 10},
+        ]
+        pacing = compute_pacing(
+            DeliveryArrays.from_report_rows(rows, LINE_ITEMS), now=NOW,
+        )
+        self.assertEqual(pacing.ids, ['2', '8'])
+        self.assertEqual(pacing.get('2')['projected_delivery'], 1600.0)
+        self.assertEqual(pacing.get('2')['click_through_rate'], 0.01)
+        self.assertEqual(pacing.get_over_delivering_ids(), ['2'])
+        # Without a line item, only delivery is known
+        self.assertTrue(math.isnan(pacing.get('8')['required_daily_rate']))
+        self.assertTrue(math.isnan(pacing.get('8')['click_through_rate']))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import threading
+import time
+import unittest
+
+import pytz
+
+from parselmouth import ParselmouthConfig
+from parselmouth import ParselmouthProviders
+from parselmouth.pool import ParselmouthPool
+
+
+class FakeClient(object):
+
+    def __init__(self, network_code):
+        self.network_code = network_code
+        self.network_timezone = None
+        self.timezone_calls = 0
+
+    def get_network_timezone(self):
+        self.timezone_calls += 1
+        self.network_timezone = 'America/New_York'
+        return self.network_timezone
+
+
+class ParselmouthPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.created = []
+        self.pool = ParselmouthPool(
+            get_config=None,
+            max_concurrency=3,
+            max_network_concurrency=1,
+            idle_timeout=60,
+            client_factory=self._create_client,
+        )
+
+    def _create_client(self, network_code):
+        client = FakeClient(network_code)
+        self.created.append(client)
+        return client
+
+    def test_lazy_clients(self):
+        self.assertEqual(self.created, [])
+        with self.pool.session('1') as client:
+            self.assertEqual(client.network_code, '1')
+        with self.pool.session('1') as other:
+            self.assertIs(client, other)
+        self.assertEqual(len(self.created), 1)
+
+        self.assertEqual(self.pool.get_network_timezone('1'), 'America/New_York')
+        self.assertEqual(self.pool.get_network_timezone('1'), 'America/New_York')
+        self.assertEqual(client.timezone_calls, 1)
+
+    def test_evict_idle(self):
+        with self.pool.session('1'):
+            with self.pool.session('2'):
+                # Clients in use are never evicted
+                self.assertEqual(self.pool.evict_idle(now=time.time() + 120), [])
+            self.assertEqual(self.pool.evict_idle(now=time.time() + 120), ['2'])
+        self.assertEqual(self.pool.evict_idle(now=time.time() + 30), [])
+        self.assertEqual(self.pool.evict_idle(now=time.time() + 120), ['1'])
+
+        with self.pool.session('1'):
+            pass
+        self.assertEqual(len(self.created), 3)
+
+    def test_timezone_kept_after_eviction(self):
+        with self.pool.session('1') as client:
+            client.get_network_timezone()
+        self.assertEqual(self.pool.evict_idle(now=time.time() + 120), ['1'])
+        # Known from the session, without a new client
+        self.assertEqual(self.pool.get_network_timezone('1'), 'America/New_York')
+        self.assertEqual(len(self.created), 1)
+
+    def test_map(self):
+        lock = threading.Lock()
+        running = {}
+        max_running = {'total': 0}
+
+        def work(client):
+            with lock:
+                running[client.network_code] = running.get(client.network_code, 0) + 1
+                self.assertEqual(running[client.network_code], 1)
+                max_running['total'] = max(max_running['total'], sum(running.values()))
+            time.sleep(0.01)
+            with lock:
+                running[client.network_code] -= 1
+            if client.network_code == 'bad':
+                raise ValueError('bad network')
+            return client.network_code
+
+        network_codes = ['1', '2', '3', '4', '1', '2', 'bad']
+        results, errors = self.pool.map(work, network_codes)
+        self.assertEqual(results, {'1': '1', '2': '2', '3': '3', '4': '4'})
+        self.assertEqual(list(errors), ['bad'])
+        self.assertLessEqual(max_running['total'], 3)
+        self.assertEqual(len(self.created), 5)
+
+    def test_create_client(self):
+        def get_config(network_code):
+            return ParselmouthConfig(
+                ParselmouthProviders.google_dfp_premium,
+                client_id='id',
+                client_secret='secret',
+                refresh_token='token',
+                application_name='app',
+                network_code=network_code,
+            )
+
+        pool = ParselmouthPool(get_config=get_config)
+        timezone = pytz.timezone('America/New_York')
+        pool._timezones['1'] = timezone
+        client = pool.create_client('1')
+        # Lazy, and the timezone isn't fetched again
+        self.assertIsNone(client._provider)
+        self.assertIs(client.get_network_timezone(), timezone)
+        self.assertIs(client.provider.dfp_client.get_network_timezone(), timezone)
+
+        # Networks with the same credentials share an OAuth2 client
+        pool._timezones['2'] = timezone
+        other = pool.create_client('2')
+        self.assertIs(
+            other.provider.dfp_client.native_dfp_client.oauth2_client,
+            client.provider.dfp_client.native_dfp_client.oauth2_client,
+        )
+
+    def test_shared_oauth2_client(self):
+        credentials = {
+            'client_id': 'id',
+            'client_secret': 'secret',
+            'refresh_token': 'token',
+        }
+        first = self.pool._get_oauth2_client(dict(credentials, network_code='1'))
+        second = self.pool._get_oauth2_client(dict(credentials, network_code='2'))
+        other = self.pool._get_oauth2_client(dict(credentials, refresh_token='other'))
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import socket
+import unittest
+import urllib2
+
+from parselmouth.exceptions import ParselmouthException
+from parselmouth.exceptions import ParselmouthNetworkError
+from parselmouth.retry import RetryBudget
+from parselmouth.retry import RetryPolicy
+from parselmouth.retry import is_transient_error
+
+
+class FlakyFunction(object):
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return value
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sleeps = []
+
+    def _get_policy(self, **kwargs):
+        kwargs.setdefault('random', lambda: 0.5)
+        return RetryPolicy(sleep=self.sleeps.append, **kwargs)
+
+    def test_is_transient_error(self):
+        self.assertTrue(is_transient_error(socket.timeout()))
+        self.assertTrue(is_transient_error(ParselmouthNetworkError()))
+        self.assertTrue(is_transient_error(
+            urllib2.HTTPError('url', 503, 'Service Unavailable', {}, None)
+        ))
+        self.assertFalse(is_transient_error(
+            urllib2.HTTPError('url', 404, 'Not Found', {}, None)
+        ))
+        self.assertFalse(is_transient_error(ParselmouthException()))
+
+    def test_backoff(self):
+        policy = self._get_policy(max_attempts=5, base_delay=1, max_delay=5)
+        function = FlakyFunction([socket.error()] * 4)
+        self.assertEqual(policy.call(function, 'ok'), 'ok')
+        self.assertEqual(function.calls, 5)
+        # Doubling delays capped at max_delay, with jitter
+        self.assertEqual(self.sleeps, [0.5, 1, 2, 2.5])
+
+        policy = self._get_policy(jitter=False, base_delay=2)
+        self.assertEqual(policy.get_delay(3), 8)
+
+    def test_give_up(self):
+        policy = self._get_policy(max_attempts=3)
+        function = FlakyFunction([socket.error()] * 3)
+        self.assertRaises(socket.error, policy.call, function, 'ok')
+        self.assertEqual(function.calls, 3)
+
+        # Fatal errors are not retried
+        function = FlakyFunction([ValueError(), socket.error()])
+        self.assertRaises(ValueError, policy.call, function, 'ok')
+        self.assertEqual(function.calls, 1)
+
+    def test_budget(self):
+        clock = [0]
+        budget = RetryBudget(ratio=0, min_retries=1, window=10, clock=lambda: clock[0])
+        policy = self._get_policy(max_attempts=10, budget=budget)
+
+        function = FlakyFunction([socket.error()] * 3)
+        self.assertRaises(socket.error, policy.call, function, 'ok')
+        # Only min_retries retries are allowed without other requests
+        self.assertEqual(function.calls, 2)
+
+        # Retries are counted over a sliding window
+        clock[0] = 20
+        function = FlakyFunction([socket.error()])
+        self.assertEqual(policy.call(function, 'ok'), 'ok')
+
+
+if __name__ == "__main__":
+    unittest.main()
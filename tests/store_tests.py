@@ -0,0 +1,168 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+import pytz
+
+from parselmouth.constants import ParselmouthEntityTypes
+from parselmouth.delivery import Campaign
+from parselmouth.delivery import LineItem
+from parselmouth.exceptions import ParselmouthException
+from parselmouth.store import SQLiteStore
+from parselmouth.targeting import AdUnit
+from parselmouth.targeting import Custom
+from parselmouth.targeting import TargetingCriterion
+from parselmouth.targeting import TargetingData
+
+
+LINE_ITEM = ParselmouthEntityTypes.line_item
+
+LINE_ITEMS = [
+    LineItem(
+        id='9',
+        campaign_id='1',
+        status='DELIVERING',
+        start=datetime(2015, 1, 1, tzinfo=pytz.utc),
+        targeting=TargetingData(
+            inventory=TargetingCriterion(AdUnit(id='100')),
+            custom=~TargetingCriterion(Custom(id='100')),
+        ),
+    ),
+    LineItem(
+        id='10',
+        campaign_id='1',
+        status='PAUSED',
+        start=pytz.timezone('America/New_York').localize(datetime(2015, 2, 1)),
+        targeting=TargetingData(
+            inventory=TargetingCriterion(AdUnit(id='200')),
+        ),
+    ),
+    LineItem(
+        id='11',
+        campaign_id='2',
+        status='DELIVERING',
+        start=datetime(2015, 3, 1, tzinfo=pytz.utc),
+    ),
+]
+
+
+class SQLiteStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = SQLiteStore()
+        self.store.put_objects('1', LINE_ITEM, LINE_ITEMS)
+
+    def tearDown(self):
+        self.store.close()
+
+    def _query_ids(self, **kwargs):
+        return [l.id for l in self.store.query('1', LINE_ITEM, **kwargs)]
+
+    def test_get_objects(self):
+        objects = self.store.get_objects('1', LINE_ITEM)
+        self.assertEqual(sorted(objects), ['10', '11', '9'])
+        self.assertEqual(objects['9'], LINE_ITEMS[0])
+        self.assertEqual(objects['9'].targeting, LINE_ITEMS[0].targeting)
+
+        self.assertEqual(
+            sorted(self.store.get_objects('1', LINE_ITEM, ['9', '12'])), ['9'],
+        )
+        self.assertEqual(self.store.get_objects('2', LINE_ITEM), {})
+
+    def test_query(self):
+        self.assertEqual(self._query_ids(), ['9', '10', '11'])
+        self.assertEqual(self._query_ids(order='ID DESC', limit=2), ['11', '10'])
+        self.assertEqual(self._query_ids(limit=1, offset=1), ['10'])
+        self.assertEqual(self._query_ids(orderId=1), ['9', '10'])
+        self.assertEqual(self._query_ids(status="'DELIVERING'"), ['9', '11'])
+        self.assertEqual(
+            self._query_ids(status=['PAUSED', 'DELIVERING'], orderId=1),
+            ['9', '10'],
+        )
+        self.assertEqual(
+            self._query_ids(startDateTime__gt=datetime(2015, 1, 1)),
+            ['10', '11'],
+        )
+        self.assertEqual(
+            self._query_ids(startDateTime__lt=datetime(2015, 2, 1, 4)),
+            ['9'],
+        )
+        # Datetimes are compared in UTC
+        self.assertEqual(
+            self._query_ids(startDateTime__lte=datetime(2015, 2, 1, 5)),
+            ['9', '10'],
+        )
+
+        self.assertEqual(self._query_ids(target=AdUnit(id='100')), ['9'])
+        self.assertEqual(self._query_ids(target=('AdUnit', '200')), ['10'])
+        self.assertEqual(self._query_ids(target=Custom(id='100')), [])
+        self.assertEqual(self._query_ids(excluded_target=Custom(id='100')), ['9'])
+
+    def test_query_advertiser(self):
+        self.assertEqual(self._query_ids(advertiserId='77'), [])
+        self.store.put_objects('1', ParselmouthEntityTypes.campaign, [
+            Campaign(id='1', advertiser_id='77'),
+            Campaign(id='2', advertiser_id='78'),
+        ])
+        # Line items have the advertiser of their campaign
+        self.assertEqual(self._query_ids(advertiserId='77'), ['9', '10'])
+        self.assertEqual(
+            self._query_ids(advertiserId=['77', '78'], status='DELIVERING'),
+            ['9', '11'],
+        )
+        self.assertEqual(
+            self._query_ids(order='advertiserId DESC', limit=1), ['11'],
+        )
+
+        with self.assertRaises(ParselmouthException):
+            self._query_ids(name='Line Item')
+        with self.assertRaises(ParselmouthException):
+            self.store.query('1', ParselmouthEntityTypes.campaign, orderId=1)
+        with self.assertRaises(ParselmouthException):
+            self.store.query('1', ParselmouthEntityTypes.creative, status='ACTIVE')
+
+    def test_update(self):
+        moved = LineItem(
+            id='9',
+            campaign_id='3',
+            targeting=TargetingData(
+                inventory=TargetingCriterion(AdUnit(id='200')),
+            ),
+        )
+        self.store.put_objects('1', LINE_ITEM, [moved])
+        self.assertEqual(self._query_ids(orderId=3), ['9'])
+        self.assertEqual(self._query_ids(target=AdUnit(id='100')), [])
+        self.assertEqual(self._query_ids(target=AdUnit(id='200')), ['9', '10'])
+
+        self.store.remove_objects('1', LINE_ITEM, ['9', '10'])
+        self.assertEqual(self._query_ids(), ['11'])
+        self.assertEqual(self._query_ids(target=AdUnit(id='200')), [])
+
+    def test_persistence(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'store.db')
+            store = SQLiteStore(path)
+            watermark = datetime(2015, 1, 1, tzinfo=pytz.utc)
+            store.set_watermark('1', LINE_ITEM, watermark)
+            store.put_objects('1', ParselmouthEntityTypes.campaign, [
+                Campaign(id='1', advertiser_id='5'),
+            ])
+            store.close()
+
+            store = SQLiteStore(path)
+            self.assertEqual(store.get_watermark('1', LINE_ITEM), watermark)
+            self.assertEqual(store.get_watermark('2', LINE_ITEM), None)
+            self.assertEqual(
+                store.query('1', ParselmouthEntityTypes.campaign, advertiserId=5),
+                [Campaign(id='1', advertiser_id='5')],
+            )
+            store.close()
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
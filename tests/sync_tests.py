@@ -0,0 +1,111 @@
+import unittest
+from datetime import datetime
+
+from parselmouth.constants import ParselmouthEntityTypes
+from parselmouth.delivery import Creative
+from parselmouth.delivery import LineItem
+from parselmouth.store import MemoryStore
+from parselmouth.sync import ParselmouthSync
+
+
+class FakeClient(object):
+    """
+    Serves line items and creatives, applying the filters used by syncs
+    """
+
+    def __init__(self):
+        self.line_items = {}
+        self.archived = set()
+        self.creatives = {}
+        self.queries = []
+
+    def _filter(self, objects, filter_kwargs):
+        self.queries.append(filter_kwargs)
+        results = []
+        for obj in objects.values():
+            watermark = filter_kwargs.get('lastModifiedDateTime__gte')
+            if watermark and obj.last_modified < watermark:
+                continue
+            archived = filter_kwargs.get('isArchived')
+            if archived and (obj.id in self.archived) != (archived == 'true'):
+                continue
+            results.append(obj)
+        return results
+
+    def get_line_items(self, **filter_kwargs):
+        return self._filter(self.line_items, filter_kwargs)
+
+    def get_creatives(self, **filter_kwargs):
+        return self._filter(self.creatives, filter_kwargs)
+
+
+def make_line_item(_id, day, name=None):
+    return LineItem(
+        id=_id, name=name or _id, last_modified=datetime(2015, 1, day),
+    )
+
+
+class ParselmouthSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeClient()
+        self.store = MemoryStore()
+        self.sync = ParselmouthSync(self.client, self.store, network_code='1')
+
+    def test_sync_line_items(self):
+        for line_item in [make_line_item('a', 1), make_line_item('b', 2)]:
+            self.client.line_items[line_item.id] = line_item
+
+        result = self.sync.sync(ParselmouthEntityTypes.line_item)
+        self.assertEqual(set(l.id for l in result.added), set(['a', 'b']))
+        self.assertEqual(result.changed, [])
+        self.assertEqual(result.removed, [])
+        self.assertEqual(result.watermark, datetime(2015, 1, 2))
+        self.assertEqual(self.client.queries, [{'isArchived': 'false'}])
+
+        # Nothing changed since the last sync
+        result = self.sync.sync(ParselmouthEntityTypes.line_item)
+        self.assertEqual((result.added, result.changed, result.removed), ([], [], []))
+
+        # b is modified, c is created and a is archived
+        self.client.line_items['b'] = make_line_item('b', 3, name='new name')
+        self.client.line_items['c'] = make_line_item('c', 3)
+        self.client.line_items['a'] = make_line_item('a', 4)
+        self.client.archived.add('a')
+        del self.client.queries[:]
+
+        result = self.sync.sync(ParselmouthEntityTypes.line_item)
+        self.assertEqual([l.id for l in result.added], ['c'])
+        self.assertEqual([l.name for l in result.changed], ['new name'])
+        self.assertEqual(result.removed, [make_line_item('a', 1)])
+        self.assertEqual(result.watermark, datetime(2015, 1, 4))
+        self.assertEqual(self.client.queries, [
+            {'isArchived': 'false', 'lastModifiedDateTime__gte': datetime(2015, 1, 2)},
+            {'isArchived': 'true', 'lastModifiedDateTime__gte': datetime(2015, 1, 2)},
+        ])
+
+        stored = self.store.get_objects('1', ParselmouthEntityTypes.line_item)
+        self.assertEqual(sorted(stored), ['b', 'c'])
+        self.assertEqual(stored['b'].name, 'new name')
+        # Other networks are kept apart
+        self.assertEqual(
+            self.store.get_objects('2', ParselmouthEntityTypes.line_item), {},
+        )
+
+    def test_sync_creatives(self):
+        self.client.creatives['1'] = Creative(
+            id='1', name='creative', last_modified=datetime(2015, 1, 1),
+        )
+        result = self.sync.sync(ParselmouthEntityTypes.creative)
+        self.assertEqual([c.id for c in result.added], ['1'])
+
+        # Creatives cannot be archived
+        self.assertEqual(self.client.queries, [{}])
+        self.sync.sync(ParselmouthEntityTypes.creative)
+        self.assertEqual(self.client.queries[-1], {
+            'lastModifiedDateTime__gte': datetime(2015, 1, 1),
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
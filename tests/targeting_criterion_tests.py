@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 from parselmouth.targeting import TargetingCriterion
@@ -206,6 +207,73 @@ class TargetingCriterionTest(unittest.TestCase):
 
         self.assertRaises(ParselmouthException, (CRITERION1 & CRITERION5).remove_target, CRITERION5)
 
+    def test_canonicalize(self):
+        # Nested groups with the same operator are flattened
+        criterion = TargetingCriterion(
+            [CRITERION4, ADUNIT3], TargetingCriterion.OPERATOR.AND,
+        )
+        answer_criterion = TargetingCriterion(
+            [ADUNIT1, ADUNIT2, ADUNIT3], TargetingCriterion.OPERATOR.AND,
+        )
+        self.assertEqual(
+            criterion.canonicalize().get_data(),
+            answer_criterion.canonicalize().get_data(),
+        )
+
+        # Single target groups are unwrapped and targets are sorted
+        test_op, test_targets = (CRITERION2 & CRITERION1).canonicalize().get_data()
+        self.assertEqual(test_op, TargetingCriterion.OPERATOR.AND)
+        self.assertEqual(test_targets, [ADUNIT1, ADUNIT2])
+
+        # Duplicates are removed
+        test_op, test_targets = (CRITERION1 | CRITERION3).canonicalize().get_data()
+        self.assertEqual(test_op, TargetingCriterion.OPERATOR.OR)
+        self.assertEqual(test_targets, [ADUNIT1, ADUNIT2])
+
+        # NOT groups are never squashed into their parent
+        criterion = ~CRITERION3 & ~CRITERION5
+        test_op, test_targets = criterion.canonicalize().get_data()
+        self.assertEqual(test_op, TargetingCriterion.OPERATOR.AND)
+        self.assertEqual(test_targets, [~CRITERION3, ~CRITERION5])
+        self.assertNotEqual(~~CRITERION3, ~CRITERION3)
+
+        # Single target groups are unwrapped within NOT groups too
+        self.assertEqual(
+            ~CRITERION1, TargetingCriterion([ADUNIT1], TargetingCriterion.OPERATOR.NOT),
+        )
+
+        # Canonical criteria are their own canonical form
+        canonical = criterion.canonicalize()
+        self.assertIs(canonical.canonicalize(), canonical)
+
+    def test_eq_and_hash(self):
+        criterion1 = CRITERION3 & ~CRITERION5
+        criterion2 = ~TargetingCriterion(
+            [ADUNIT4, ADUNIT3], TargetingCriterion.OPERATOR.OR,
+        ) & TargetingCriterion(
+            [ADUNIT2, ADUNIT1, ADUNIT2], TargetingCriterion.OPERATOR.OR,
+        )
+        self.assertEqual(criterion1, criterion2)
+        self.assertEqual(hash(criterion1), hash(criterion2))
+
+        self.assertNotEqual(CRITERION3, CRITERION4)
+        self.assertNotEqual(CRITERION3, CRITERION5)
+        self.assertNotEqual(CRITERION1, ADUNIT1)
+        self.assertEqual(len(set([CRITERION1, CRITERION2, CRITERION1 | CRITERION1])), 2)
+
+    def test_pickle(self):
+        criterion = CRITERION3 & ~CRITERION5
+        hash(criterion)
+        unpickled = pickle.loads(pickle.dumps(criterion))
+        self.assertNotIn('_canonical', unpickled.__dict__)
+        self.assertEqual(unpickled, criterion)
+        self.assertEqual(hash(unpickled), hash(criterion))
+
+        # Criteria pickled before their caches existed
+        del unpickled.__dict__['_canonical']
+        del unpickled.__dict__['_hash']
+        self.assertEqual(unpickled, criterion)
+
     def test_to_doc(self):
         # Test to doc
         test_doc = CRITERION1.to_doc()
@@ -0,0 +1,151 @@
+import unittest
+
+from parselmouth.constants import ParselmouthTargetTypes
+from parselmouth.delivery import LineItem
+from parselmouth.targeting import AdUnit
+from parselmouth.targeting import Custom
+from parselmouth.targeting import Geography
+from parselmouth.targeting import TargetingCriterion
+from parselmouth.targeting import TargetingData
+from parselmouth.targeting_index import TargetingIndex
+from parselmouth.targeting_index import get_targeting_keys
+from parselmouth.tree_builder import TreeBuilder
+
+
+OR = TargetingCriterion.OPERATOR.OR
+
+# home -> home/us -> home/us/mi
+ADUNIT_TREE = TreeBuilder(None, None).build_tree([
+    AdUnit(id='1', parent_id=None, name='home'),
+    AdUnit(id='2', parent_id='1', name='home/us'),
+    AdUnit(id='3', parent_id='2', name='home/us/mi'),
+])
+
+# usa -> michigan
+GEOGRAPHY_TREE = TreeBuilder(None, None).build_tree([
+    Geography(id='2840', parent_id=None, name='USA'),
+    Geography(id='21155', parent_id='2840', name='Michigan'),
+])
+
+HOME_LINE_ITEM = LineItem(
+    id='home',
+    targeting=TargetingData(
+        inventory=TargetingCriterion(AdUnit(id='1')),
+        geography=TargetingCriterion(Geography(id='2840')) &
+            ~TargetingCriterion(Geography(id='21155')),
+    ),
+)
+
+HOME_ONLY_LINE_ITEM = LineItem(
+    id='home_only',
+    targeting=TargetingData(
+        inventory=TargetingCriterion(AdUnit(id='1', include_descendants=False)),
+        custom=TargetingCriterion([Custom(id='1'), Custom(id='2')], OR),
+    ),
+)
+
+MI_LINE_ITEM = LineItem(
+    id='mi',
+    targeting=TargetingData(
+        inventory=TargetingCriterion(AdUnit(id='3')),
+    ),
+)
+
+
+class TargetingIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TargetingIndex(
+            [HOME_LINE_ITEM, HOME_ONLY_LINE_ITEM, MI_LINE_ITEM],
+            trees={
+                ParselmouthTargetTypes.adunit: ADUNIT_TREE,
+                ParselmouthTargetTypes.geography: GEOGRAPHY_TREE,
+            },
+        )
+
+    def test_get_line_item_ids(self):
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(
+            self.index.get_line_item_ids(AdUnit(id='1')),
+            (set(['home', 'home_only']), set()),
+        )
+        self.assertEqual(
+            self.index.get_line_item_ids(Geography(id='21155')),
+            (set(), set(['home'])),
+        )
+        # Ids are only unique within a type of target
+        self.assertEqual(
+            self.index.get_line_item_ids(Custom(id='1')),
+            (set(['home_only']), set()),
+        )
+        self.assertEqual(
+            self.index.get_line_item_ids(('Custom', '2')),
+            (set(['home_only']), set()),
+        )
+        self.assertEqual(
+            self.index.get_line_item_ids(AdUnit(id='2')),
+            (set(), set()),
+        )
+
+    def test_include_ancestors(self):
+        self.assertEqual(
+            self.index.get_line_item_ids(AdUnit(id='3'), include_ancestors=True),
+            (set(['home', 'mi']), set()),
+        )
+        self.assertEqual(
+            self.index.get_line_item_ids(
+                Geography(id='21155'), include_ancestors=True,
+            ),
+            (set(['home']), set(['home'])),
+        )
+
+        includes, excludes = self.index.get_line_items(
+            AdUnit(id='2'), include_ancestors=True,
+        )
+        self.assertEqual(includes, [HOME_LINE_ITEM])
+        self.assertEqual(excludes, [])
+
+    def test_duplicate_targets(self):
+        targeting = TargetingData(
+            inventory=TargetingCriterion(
+                AdUnit(id='1', include_descendants=False),
+            ) | TargetingCriterion(AdUnit(id='1')),
+        )
+        self.assertEqual(
+            get_targeting_keys(targeting),
+            [('include', ('AdUnit', '1'), True)],
+        )
+
+    def test_update(self):
+        moved = LineItem(
+            id='mi',
+            targeting=TargetingData(
+                inventory=TargetingCriterion(AdUnit(id='2')),
+            ),
+        )
+        self.index.add_line_items([moved])
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.get_line_item('mi'), moved)
+        self.assertEqual(
+            self.index.get_line_item_ids(AdUnit(id='3')), (set(), set()),
+        )
+        self.assertEqual(
+            self.index.get_line_item_ids(AdUnit(id='2')),
+            (set(['mi']), set()),
+        )
+
+        self.index.remove_line_items([moved, 'home_only', 'unknown'])
+        self.assertEqual(len(self.index), 1)
+        self.assertNotIn('mi', self.index)
+        self.assertIn(HOME_LINE_ITEM, self.index)
+        self.assertEqual(
+            self.index.get_line_item_ids(AdUnit(id='1')),
+            (set(['home']), set()),
+        )
+        self.assertEqual(
+            self.index.get_line_item_ids(Custom(id='1')), (set(), set()),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
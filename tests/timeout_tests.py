@@ -0,0 +1,72 @@
+import threading
+import time
+import unittest
+
+from parselmouth.exceptions import ParselmouthTimeout
+from parselmouth.retry import RetryPolicy
+from parselmouth.utils.timeout import Timeout
+from parselmouth.utils.timeout import check_deadline
+from parselmouth.utils.timeout import get_deadline
+from parselmouth.utils.timeout import get_remaining_time
+
+
+class TimeoutTest(unittest.TestCase):
+
+    def test_nested(self):
+        self.assertIsNone(get_remaining_time())
+        with Timeout(10) as outer:
+            self.assertLessEqual(get_remaining_time(), 10)
+            with Timeout(100):
+                # Nested timeouts cannot extend the deadline
+                self.assertEqual(get_deadline(), outer.deadline)
+            with Timeout(1):
+                self.assertLessEqual(get_remaining_time(), 1)
+            with Timeout(None):
+                self.assertEqual(get_deadline(), outer.deadline)
+            self.assertEqual(get_deadline(), outer.deadline)
+        self.assertIsNone(get_deadline())
+
+    def test_expired(self):
+        with Timeout(0.01):
+            time.sleep(0.02)
+            self.assertRaises(ParselmouthTimeout, check_deadline)
+
+    def test_threads(self):
+        deadlines = {}
+
+        def worker(name, seconds):
+            with Timeout(seconds):
+                time.sleep(0.01)
+                deadlines[name] = get_remaining_time()
+
+        with Timeout(0.5):
+            threads = [
+                threading.Thread(target=worker, args=(i, i + 1))
+                for i in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertLessEqual(get_remaining_time(), 0.5)
+
+        # Each thread has its own deadline
+        for i in range(4):
+            self.assertGreater(deadlines[i], i + 0.5)
+            self.assertLessEqual(deadlines[i], i + 1)
+
+    def test_no_retry_past_deadline(self):
+        calls = []
+
+        def fail():
+            calls.append(1)
+            raise ParselmouthTimeout()
+
+        policy = RetryPolicy(base_delay=10, jitter=False, sleep=lambda s: None)
+        with Timeout(5):
+            self.assertRaises(ParselmouthTimeout, policy.call, fail)
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -423,6 +423,30 @@ class NodeTreeTest(unittest.TestCase):
 
         self.assertEqual(test4, answer4)
 
+    def test_get_parent_map(self):
+        self.assertEqual(EMPTY_TREE.get_parent_map(), {})
+
+        answer1 = {
+            '1': None,
+            '2': '1',
+            '3': '2',
+        }
+        self.assertEqual(NESTED_TREE.get_parent_map(), answer1)
+
+        answer2 = {
+            '1': None,
+            '2': '1',
+            '3': '1',
+        }
+        self.assertEqual(ANCESTOR_TREE.get_parent_map(), answer2)
+
+        answer3 = {
+            'home': None,
+            'home/us': 'home',
+            'home/uk': 'home',
+        }
+        self.assertEqual(ANCESTOR_TREE.get_parent_map('name'), answer3)
+
 
 if __name__ == "__main__":
     unittest.main()
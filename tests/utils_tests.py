@@ -1,8 +1,78 @@
+import random
 import unittest
 
 from parselmouth.utils.check import check_equal
 
 
+def _random_structure(rand, depth=0):
+    """
+    Build a random nested structure of dicts, lists and scalars
+    """
+    choice = rand.randint(0, 5 if depth < 3 else 2)
+    if choice == 0:
+        return rand.randint(0, 3)
+    elif choice == 1:
+        return rand.choice(['a', 'b', None, True, 1.5])
+    elif choice == 2:
+        return rand.choice([0, 1]) == 1
+    elif choice in [3, 4]:
+        return [
+            _random_structure(rand, depth + 1)
+            for _ in range(rand.randint(0, 4))
+        ]
+    else:
+        return dict(
+            (rand.choice('abcde'), _random_structure(rand, depth + 1))
+            for _ in range(rand.randint(0, 3))
+        )
+
+
+def _shuffled(rand, obj):
+    """
+    Deep copy of obj with every nested list shuffled
+    """
+    if isinstance(obj, dict):
+        return dict((k, _shuffled(rand, v)) for k, v in obj.items())
+    elif isinstance(obj, list):
+        items = [_shuffled(rand, v) for v in obj]
+        rand.shuffle(items)
+        return items
+    return obj
+
+
+def _reference_check_equal(obj1, obj2):
+    """
+    Slow but obviously correct multiset comparison
+    """
+    if type(obj1) != type(obj2):
+        return False
+    if isinstance(obj1, dict):
+        return sorted(obj1.keys()) == sorted(obj2.keys()) and all(
+            _reference_check_equal(obj1[k], obj2[k]) for k in obj1
+        )
+    elif isinstance(obj1, list):
+        remaining = list(obj2)
+        for item1 in obj1:
+            for index, item2 in enumerate(remaining):
+                if _reference_check_equal(item1, item2):
+                    del remaining[index]
+                    break
+            else:
+                return False
+        return not remaining
+    return obj1 == obj2
+
+
+class Unhashable(object):
+    __hash__ = None
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
 class UtilsTest(unittest.TestCase):
 
     def test_check_equal_null(self):
@@ -77,6 +147,56 @@ class UtilsTest(unittest.TestCase):
             ),
         )
 
+    def test_check_equal_duplicates(self):
+        self.assertFalse(
+           check_equal(['a', 'a', 'b'], ['a', 'b', 'b']),
+        )
+
+        self.assertTrue(
+           check_equal(['a', 'b', 'a'], ['a', 'a', 'b']),
+        )
+
+        self.assertFalse(
+           check_equal([{'a': 1}, {'a': 1}, {}], [{}, {}, {'a': 1}]),
+        )
+
+        self.assertFalse(
+           check_equal([1, True], [True, True]),
+        )
+
+    def test_check_equal_unhashable(self):
+        self.assertTrue(
+           check_equal(
+                [Unhashable(1), Unhashable(2), 3],
+                [3, Unhashable(2), Unhashable(1)],
+            ),
+        )
+
+        self.assertFalse(
+           check_equal(
+                [Unhashable(1), Unhashable(1), 3],
+                [3, Unhashable(2), Unhashable(1)],
+            ),
+        )
+
+    def test_check_equal_properties(self):
+        rand = random.Random(1234)
+        for _ in range(500):
+            obj1 = _random_structure(rand)
+            obj2 = _random_structure(rand)
+
+            # Reflexive and insensitive to list order
+            self.assertTrue(check_equal(obj1, obj1))
+            self.assertTrue(check_equal(obj1, _shuffled(rand, obj1)))
+
+            # Symmetric and in agreement with the reference
+            answer = _reference_check_equal(obj1, obj2)
+            self.assertEqual(check_equal(obj1, obj2), answer)
+            self.assertEqual(check_equal(obj2, obj1), answer)
+
+            # Appending an item always breaks equality
+            self.assertFalse(check_equal([obj1], [obj1, obj1]))
+
 
 if __name__ == "__main__":
     unittest.main()